@@ -13,6 +13,8 @@ import re
 import httpx
 from fastapi import Request
 
+from api.metrics import outbound_hooks
+
 
 logger = logging.getLogger(__name__)
 
@@ -119,7 +121,7 @@ async def _send_plausible_event(user_agent: str, client_ip: str, name: str, url:
         props: Event properties
     """
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        async with httpx.AsyncClient(timeout=5.0, event_hooks=outbound_hooks("plausible")) as client:
             await client.post(
                 PLAUSIBLE_ENDPOINT,
                 headers={"User-Agent": user_agent, "X-Forwarded-For": client_ip, "Content-Type": "application/json"},
@@ -14,6 +14,8 @@ from typing import Any, TypeVar, cast
 
 from cachetools import TTLCache
 
+from api.metrics import cache_event
+from core import timing
 from core.config import settings
 
 
@@ -45,6 +47,20 @@ class _LockPruningTTLCache(TTLCache):
         finally:
             _locks.pop(key, None)
 
+    def expire(self, time=None):
+        # TTLCache.expire removes entries via Cache.__delitem__, bypassing the hook above
+        expired = super().expire(time)
+        for key, _ in expired:
+            _locks.pop(key, None)
+            cache_event(key, "evict_ttl")
+        return expired
+
+    def popitem(self):
+        # Only called when the cache is full (least recently used entry)
+        key, value = super().popitem()
+        cache_event(key, "evict_size")
+        return key, value
+
 
 # Global cache instance. Stores `(value, monotonic_set_at)` tuples — folding
 # the timestamp into the entry keeps cache age + payload on a single lifecycle
@@ -96,7 +112,10 @@ def get_cache(key: str) -> Any | None:
     Returns:
         Cached value or None if not found.
     """
+    start = time.perf_counter()
     entry = _cache.get(key)
+    timing.add("cache", (time.perf_counter() - start) * 1000)
+    cache_event(key, "hit" if entry is not None else "miss")
     return entry[0] if entry is not None else None
 
 
@@ -182,7 +201,7 @@ def clear_spec_cache(spec_id: str) -> int:
     count += clear_cache_by_pattern("filter:")  # Filters might be affected
     count += clear_cache_by_pattern("stats")  # Stats might have changed
     count += clear_cache_by_pattern("sitemap")  # Sitemap includes spec URLs
-    count += clear_cache_by_pattern(f"seo:{spec_id}")  # SEO proxy pages for this spec
+    count += clear_cache_by_pattern("seo_pages")  # Pre-rendered SEO proxy pages include this spec
     count += clear_cache_by_pattern(f"og:{spec_id}")  # OG images for this spec
     return count
 
@@ -208,6 +227,7 @@ def clear_library_cache(library_id: str) -> int:
     count += clear_cache_by_pattern("filter:")  # Filters might be affected
     count += clear_cache_by_pattern("stats")  # Stats might have changed
     count += clear_cache_by_pattern("sitemap")  # Sitemap includes library URLs
+    count += clear_cache_by_pattern("seo_pages")  # Pre-rendered SEO proxy pages include library URLs
     return count
 
 
@@ -258,15 +278,16 @@ async def get_or_set_cache(
         if refresh_after is not None:
             age = cache_age(key)
             if age is not None and age > refresh_after:
+                cache_event(key, "stale")
                 _schedule_refresh(key, refresh_factory or factory)
         return cast(T, cached)
 
     # Cold miss — must await. Lock prevents stampede.
     async with _get_lock(key):
-        # Double-check after acquiring lock
-        cached = get_cache(key)
-        if cached is not None:
-            return cast(T, cached)
+        # Double-check after acquiring lock (not counted again as a hit/miss)
+        entry = _cache.get(key)
+        if entry is not None:
+            return cast(T, entry[0])
         result = await factory()
         set_cache(key, result)
         return result
@@ -293,12 +314,15 @@ async def _background_refresh(
     released lock before pop runs) only costs duplicated factory work, not
     correctness, since `set_cache` is last-write-wins.
     """
+    timing.detach()  # not part of the request that triggered the refresh
     try:
         async with lock:
             try:
                 result = await factory()
                 set_cache(key, result)
+                cache_event(key, "refresh")
             except Exception:
+                cache_event(key, "refresh_error")
                 logger.warning("Background cache refresh failed for key: %s", key, exc_info=True)
     finally:
         _locks.pop(refresh_key, None)
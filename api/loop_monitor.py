@@ -0,0 +1,147 @@
+"""
+Event-loop blocking detector.
+
+Anything synchronous on the loop (Pillow OG rendering, a sync DB call, a large
+Pydantic serialization, a regex over a big code blob) stalls every in-flight
+request of the worker. LoopBlockMonitor keeps a heartbeat task on the loop and a
+watchdog thread beside it: when the heartbeat is late by more than the threshold,
+the watchdog captures the loop thread's stack while the offending callback is
+still running. Once the loop recovers, the stall is logged with that stack, kept
+for GET /debug/loop and counted in ``anyplot_event_loop_blocks_total``.
+
+Opt-in via LOOP_MONITOR_ENABLED; costs a wake-up per interval on the loop and in
+the thread.
+"""
+
+import asyncio
+import contextlib
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from api.metrics import EVENT_LOOP_BLOCKS
+from core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class LoopStall:
+    """One detected stall: when it started, how long it lasted and the stack that was running."""
+
+    __slots__ = ("started_at", "duration_ms", "stack", "last_beat", "recovered")
+
+    def __init__(self, started_at: datetime, last_beat: float) -> None:
+        self.started_at = started_at
+        self.duration_ms = 0.0  # set once the loop runs again
+        self.stack: list[str] | None = None  # set by the watchdog once formatted
+        self.last_beat = last_beat  # monotonic time of the heartbeat before the stall
+        self.recovered: float | None = None  # monotonic time of the first heartbeat after it
+
+    def as_dict(self) -> dict:
+        return {
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration_ms, 1),
+            "stack": self.stack,
+        }
+
+
+class LoopBlockMonitor:
+    """Heartbeat task plus watchdog thread flagging loop stalls longer than *threshold_ms*."""
+
+    def __init__(self, threshold_ms: float, interval: float = 0.02, history: int = 50) -> None:
+        self.threshold = threshold_ms / 1000
+        self.interval = interval
+        self.stalls: deque[LoopStall] = deque(maxlen=history)
+        self.total = 0
+        self._beat = 0.0
+        self._loop_thread: int | None = None
+        self._pending: LoopStall | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        """Start monitoring the running loop (call from a coroutine on that loop)."""
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-block-monitor", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stop.set()
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def snapshot(self) -> list[dict]:
+        """Recorded stalls, most recent first."""
+        return [stall.as_dict() for stall in reversed(self.stalls)]
+
+    def clear(self) -> None:
+        self.stalls.clear()
+        self.total = 0
+
+    async def _heartbeat(self) -> None:
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                self._beat = now
+                pending = self._pending
+                if pending is not None and pending.recovered is None:
+                    pending.recovered = now
+                # Left pending until the watchdog has formatted its stack
+                if pending is not None and pending.stack is not None:
+                    self._pending = None
+                else:
+                    pending = None
+            if pending is not None:
+                self._finish(pending)
+            await asyncio.sleep(self.interval)
+
+    def _finish(self, stall: LoopStall) -> None:
+        # The next beat was due one interval after the last one before the stall
+        stall.duration_ms = max(stall.recovered - stall.last_beat - self.interval, 0.0) * 1000
+        self.stalls.append(stall)
+        self.total += 1
+        EVENT_LOOP_BLOCKS.inc()
+        logger.warning(
+            "Event loop blocked for %.0f ms; stack when detected:\n%s", stall.duration_ms, "".join(stall.stack)
+        )
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                late = time.monotonic() - self._beat - self.interval
+                if late < self.threshold or self._pending is not None:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread)
+                # The stall started when the next beat was due, *late* seconds ago
+                stall = self._pending = LoopStall(datetime.now(timezone.utc) - timedelta(seconds=late), self._beat)
+            # Formatting reads source lines; keep it outside the lock the heartbeat needs
+            stack = traceback.format_stack(frame) if frame is not None else []
+            del frame
+            with self._lock:
+                stall.stack = stack
+
+
+loop_monitor = LoopBlockMonitor(settings.loop_monitor_threshold_ms)
@@ -9,12 +9,13 @@ from dotenv import load_dotenv  # noqa: E402, I001
 
 load_dotenv()
 
+import asyncio  # noqa: E402
+import contextlib  # noqa: E402
 import logging  # noqa: E402
 from contextlib import asynccontextmanager  # noqa: E402
 
 from fastapi import FastAPI, HTTPException, Request, Response  # noqa: E402
 from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
-from starlette.middleware.gzip import GZipMiddleware  # noqa: E402
 
 from api.exceptions import (  # noqa: E402
     AnyplotException,
@@ -22,21 +23,30 @@ from api.exceptions import (  # noqa: E402
     generic_exception_handler,
     http_exception_handler,
 )
-from api.mcp.server import mcp_server  # noqa: E402
+from api.loop_monitor import loop_monitor  # noqa: E402
+from api.mcp.lazy import LazyMCPApp, close_mcp_engine  # noqa: E402
+from api.metrics import MetricsMiddleware, mark_worker_dead, monitor_event_loop_lag  # noqa: E402
 from api.routers import (  # noqa: E402
     debug_router,
     download_router,
+    export_router,
     health_router,
     insights_router,
     libraries_router,
+    metrics_router,
     og_images_router,
     plots_router,
     proxy_router,
+    search_router,
     seo_router,
     specs_router,
     stats_router,
 )
+from api.snapshot import load_catalog_snapshot, verify_catalog_snapshot  # noqa: E402
+from api.timing import ServerTimingMiddleware, TimedGZipMiddleware  # noqa: E402
+from core.config import settings  # noqa: E402
 from core.database import close_db, init_db, is_db_configured  # noqa: E402
+from core.timing import instrument_engines  # noqa: E402
 
 
 # Configure logging
@@ -44,8 +54,8 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(level
 logger = logging.getLogger(__name__)
 
 
-# Create MCP HTTP app (needed for lifespan integration)
-mcp_http_app = mcp_server.http_app(path="/")
+# MCP HTTP app, imported and started on the first /mcp request (keeps FastMCP out of cold start)
+mcp_http_app = LazyMCPApp()
 
 
 @asynccontextmanager
@@ -61,13 +71,32 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"Failed to initialize database: {e}")
 
-    # Initialize MCP server lifespan
-    async with mcp_http_app.lifespan(app):
-        logger.info("MCP server initialized")
-        yield
+    # Answer catalog requests from the sync job's snapshot; check it against the database in the background
+    snapshot = await load_catalog_snapshot()
+    snapshot_check = None
+    if snapshot is not None and is_db_configured():
+        snapshot_check = asyncio.create_task(verify_catalog_snapshot(snapshot))
 
-    # Cleanup database connection
+    lag_monitor = asyncio.create_task(monitor_event_loop_lag()) if settings.metrics_enabled else None
+    if settings.loop_monitor_enabled:
+        loop_monitor.start()
+
+    yield
+
+    # Cleanup MCP session manager and database connections
     logger.info("Shutting down anyplot API...")
+    if snapshot_check is not None:
+        snapshot_check.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await snapshot_check
+    await mcp_http_app.aclose()
+    await loop_monitor.stop()
+    if lag_monitor is not None:
+        lag_monitor.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await lag_monitor
+        mark_worker_dead()
+    await close_mcp_engine()
     await close_db()
 
 
@@ -91,7 +120,7 @@ app.add_exception_handler(Exception, generic_exception_handler)
 # This significantly reduces payload size for JSON API responses
 # (e.g., /plots/filter: 301KB -> ~40KB with gzip)
 # Note: GZip must be added before CORS so compression happens before CORS headers are added
-app.add_middleware(GZipMiddleware, minimum_size=500)
+app.add_middleware(TimedGZipMiddleware, minimum_size=500)
 
 # Configure CORS
 app.add_middleware(
@@ -129,13 +158,30 @@ async def add_cache_headers(request: Request, call_next):
     # Individual spec details (5 min cache, 1h stale-while-revalidate)
     elif path.startswith("/specs/"):
         response.headers["Cache-Control"] = "public, max-age=300, stale-while-revalidate=3600"
-    # Insights endpoints (5 min cache, 1h stale-while-revalidate)
-    elif path.startswith("/insights/"):
+    # Insights and search endpoints (5 min cache, 1h stale-while-revalidate)
+    elif path.startswith(("/insights/", "/search")):
         response.headers["Cache-Control"] = "public, max-age=300, stale-while-revalidate=3600"
+    # Catalog export — full stream per request, let CDNs absorb repeats (1h cache)
+    elif path.startswith("/export/"):
+        response.headers["Cache-Control"] = "public, max-age=3600"
+    # Sitemap shards — carry an ETag, so crawlers revalidate cheaply (1h cache)
+    elif path.startswith("/sitemaps/"):
+        response.headers["Cache-Control"] = "public, max-age=3600"
 
     return response
 
 
+# Per-request stage timing (Server-Timing header + /debug/timings percentiles).
+# Added last so it is the outermost user middleware and sees the whole request.
+if settings.server_timing_enabled:
+    instrument_engines()
+    app.add_middleware(ServerTimingMiddleware)
+
+# Prometheus request metrics (GET /metrics); outermost, so its duration covers all other middleware
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+
 # Mount MCP server for AI assistant integration
 app.mount("/mcp", mcp_http_app)
 
@@ -146,11 +192,14 @@ app.include_router(specs_router)
 app.include_router(libraries_router)
 app.include_router(plots_router)
 app.include_router(insights_router)
+app.include_router(search_router)
 app.include_router(download_router)
+app.include_router(export_router)
 app.include_router(seo_router)
 app.include_router(og_images_router)
 app.include_router(proxy_router)
 app.include_router(debug_router)
+app.include_router(metrics_router)
 
 
 # ASGI middleware to handle /mcp without trailing slash
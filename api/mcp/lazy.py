@@ -0,0 +1,100 @@
+"""
+Deferred loading of the MCP server.
+
+FastMCP and the MCP SDK take about as long to import as the rest of the API
+together. The app mounts LazyMCPApp at /mcp instead, which imports
+api.mcp.server and starts its session manager on the first MCP request, so a
+cold start only pays for them when an MCP client actually connects. The pool
+helpers below read the server module only once it is loaded: before that no
+MCP engine can exist.
+"""
+
+import asyncio
+import sys
+from typing import Any
+
+from core import timing
+
+
+_SERVER_MODULE = "api.mcp.server"
+
+
+def get_mcp_pool_stats(replica: bool = False) -> dict[str, Any]:
+    """MCP pool status (see api.mcp.server.get_mcp_pool_stats); empty while the server is not loaded."""
+    server = sys.modules.get(_SERVER_MODULE)
+    return server.get_mcp_pool_stats(replica=replica) if server is not None else {}
+
+
+async def close_mcp_engine() -> None:
+    """Dispose the MCP pools, if the server was loaded."""
+    server = sys.modules.get(_SERVER_MODULE)
+    if server is not None:
+        await server.close_mcp_engine()
+
+
+class LazyMCPApp:
+    """ASGI app that builds the FastMCP HTTP app on its first request.
+
+    The FastMCP app needs its lifespan (the streamable-HTTP session manager)
+    running while it serves. A mounted app gets no lifespan events, so the
+    lifespan runs in a background task started with the app and stopped by
+    aclose() from the API's shutdown.
+    """
+
+    def __init__(self) -> None:
+        self._app: Any = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+        self._stop: asyncio.Event | None = None
+        self._lock: asyncio.Lock | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._app is not None
+
+    async def __call__(self, scope, receive, send) -> None:
+        app = self._app if self._loop is asyncio.get_running_loop() else None
+        if app is None:
+            app = await self._start()
+        await app(scope, receive, send)
+
+    async def _start(self) -> Any:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            # First use, or a new event loop (test clients): anything bound to the old loop is gone
+            self._app, self._task, self._loop, self._lock = None, None, loop, asyncio.Lock()
+        async with self._lock:
+            if self._app is not None:
+                return self._app
+
+            from api.mcp.server import mcp_server
+
+            http_app = mcp_server.http_app(path="/")
+            ready, stop = asyncio.Event(), asyncio.Event()
+
+            async def run() -> None:
+                # Session tasks spawned under the lifespan inherit this context; without this, their
+                # DB spans would land in the Server-Timing of the request that started the server
+                timing.detach()
+                async with http_app.lifespan(http_app):
+                    ready.set()
+                    await stop.wait()
+
+            task = asyncio.create_task(run(), name="mcp-lifespan")
+            waiter = asyncio.create_task(ready.wait())
+            await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            if not ready.is_set():
+                waiter.cancel()
+                task.result()  # re-raise the startup error
+                raise RuntimeError("MCP server lifespan exited during startup")
+            self._app, self._task, self._stop = http_app, task, stop
+            return http_app
+
+    async def aclose(self) -> None:
+        """Stop the session manager (no-op when MCP was never used on this loop)."""
+        task, stop = self._task, self._stop
+        self._app, self._task, self._stop = None, None, None
+        if task is None or stop is None or task.get_loop() is not asyncio.get_running_loop():
+            return
+        stop.set()
+        await task
@@ -5,45 +5,57 @@ Provides tools for AI assistants to search plot specifications and fetch impleme
 """
 
 import os
-from typing import Any
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
 
 from fastmcp import FastMCP
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
+from api.cache import cache_key, get_or_set_cache
 from api.schemas import ImplementationResponse, SpecDetailResponse, SpecListItem
+from api.search import get_spec_index, spec_search_hits
+from core.config import settings
 from core.database import ImplRepository, LibraryRepository, SpecRepository, is_db_configured
+from core.database.connection import (
+    create_async_db_engine,
+    create_async_read_engine,
+    create_session_factory,
+    get_pool_status,
+)
 
 
+T = TypeVar("T")
+
 # Website URL for linking to anyplot.ai
 ANYPLOT_WEBSITE_URL = "https://anyplot.ai"
 
-# MCP-specific database engine (created lazily)
-# This is separate from FastAPI's engine to avoid greenlet context issues
-_mcp_engine = None
-_mcp_session_factory = None
+# MCP-specific database engine (created lazily, disposed by the app lifespan).
+# A dedicated small pool keeps MCP traffic from starving FastAPI's pool; tool
+# calls run as tasks on the same event loop, so pooled connections are safe to
+# share between them. With DATABASE_READ_URL, reads go to a second small pool
+# on the replica (same routing as the API sessions).
+_mcp_engine: AsyncEngine | None = None
+_mcp_read_engine: AsyncEngine | None = None
+_mcp_session_factory: async_sessionmaker | None = None
 
 
-def _get_mcp_engine():
-    """Create a dedicated engine for MCP handlers."""
-    global _mcp_engine, _mcp_session_factory
+def _get_mcp_engine() -> AsyncEngine:
+    """Create the pooled engine(s) for MCP handlers (sized by settings.mcp_db_pool_size)."""
+    global _mcp_engine, _mcp_read_engine, _mcp_session_factory
 
     if _mcp_engine is not None:
         return _mcp_engine
 
-    database_url = os.getenv("DATABASE_URL", "")
-    if not database_url:
-        raise ValueError("DATABASE_URL not configured")
-
-    # Ensure async driver
-    if database_url.startswith("postgresql://"):
-        database_url = database_url.replace("postgresql://", "postgresql+asyncpg://")
-    elif database_url.startswith("postgres://"):
-        database_url = database_url.replace("postgres://", "postgresql+asyncpg://")
-
-    # Use NullPool for MCP to avoid connection state issues across requests
-    _mcp_engine = create_async_engine(database_url, poolclass=NullPool)
-    _mcp_session_factory = async_sessionmaker(_mcp_engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        _mcp_engine = create_async_db_engine(
+            "mcp", pool_size=settings.mcp_db_pool_size, max_overflow=settings.mcp_db_max_overflow
+        )
+    except RuntimeError as e:
+        raise ValueError("Database not configured. Check DATABASE_URL or INSTANCE_CONNECTION_NAME.") from e
+    _mcp_read_engine = create_async_read_engine(
+        "mcp-read", pool_size=settings.mcp_db_pool_size, max_overflow=settings.mcp_db_max_overflow
+    )
+    _mcp_session_factory = create_session_factory(_mcp_engine, _mcp_read_engine)
 
     return _mcp_engine
 
@@ -52,9 +64,7 @@ async def get_mcp_db_session() -> AsyncSession:
     """
     Get database session for MCP handlers.
 
-    Uses a dedicated engine to avoid greenlet context issues
-    that occur when Streamable HTTP transport runs in a different
-    async context than FastAPI's main event loop.
+    Callers must close the session to return its connection to the pool.
     """
     _get_mcp_engine()  # Ensure engine is created
 
@@ -64,6 +74,62 @@ async def get_mcp_db_session() -> AsyncSession:
     return _mcp_session_factory()
 
 
+def get_mcp_pool_stats(replica: bool = False) -> dict[str, Any]:
+    """MCP pool status and checkout telemetry (see core.database.connection.get_pool_status).
+
+    Args:
+        replica: Report the read-replica pool instead of the primary one
+    """
+    mcp_engine = _mcp_read_engine if replica else _mcp_engine
+    return get_pool_status(mcp_engine) if mcp_engine is not None else {}
+
+
+async def close_mcp_engine() -> None:
+    """Dispose the MCP pools (called on application shutdown)."""
+    global _mcp_engine, _mcp_read_engine, _mcp_session_factory
+
+    if _mcp_read_engine is not None:
+        await _mcp_read_engine.dispose()
+        _mcp_read_engine = None
+
+    if _mcp_engine is not None:
+        await _mcp_engine.dispose()
+        _mcp_engine = None
+        _mcp_session_factory = None
+
+
+async def _cached(key: str, build: Callable[[AsyncSession], Awaitable[T]]) -> T:
+    """
+    Serve a tool result from the shared API cache, building it on a miss.
+
+    Uses the same cache (and the same stampede lock / stale-while-revalidate
+    refresh) as the REST routers, so the sync job's cache invalidation clears
+    MCP results too. A database session is only opened on a miss; errors such
+    as "spec not found" are not cached.
+    """
+
+    async def _fetch() -> T:
+        session = await get_mcp_db_session()
+        try:
+            return await build(session)
+        finally:
+            await session.close()
+
+    return await get_or_set_cache(key, _fetch, refresh_after=settings.cache_refresh_after, refresh_factory=_fetch)
+
+
+def _tag_search_key(
+    filters: dict[str, list[str]], impl_filters: dict[str, list[str]], libraries: list[str] | None, limit: int
+) -> str:
+    """Cache key for search_specs_by_tags, independent of the order filter values were given in."""
+    parts = [
+        f"{category}={','.join(sorted(values))}" for category, values in sorted({**filters, **impl_filters}.items())
+    ]
+    if libraries:
+        parts.append(f"library={','.join(sorted(libraries))}")
+    return cache_key("mcp", "tags", *parts, f"limit={limit}")
+
+
 # Enable stateless HTTP mode via environment variable (recommended approach)
 # This allows horizontal scaling without session affinity
 os.environ.setdefault("FASTMCP_STATELESS_HTTP", "true")
@@ -87,28 +153,23 @@ async def list_specs(limit: int = 100, offset: int = 0) -> list[dict[str, Any]]:
     if not is_db_configured():
         raise ValueError("Database not configured. Check DATABASE_URL or INSTANCE_CONNECTION_NAME.")
 
-    session = await get_mcp_db_session()
-    try:
+    async def _build(session: AsyncSession) -> list[dict[str, Any]]:
         repo = SpecRepository(session)
-        # `impl.code is not None` below requires the code column on every impl
-        # of every spec in the page — use the eager-loaded variant.
-        specs = await repo.get_all_with_code()
-
-        # Apply pagination
-        paginated_specs = specs[offset : offset + limit]
+        # Pagination runs in SQL; code stays deferred (counts use impl.has_code)
+        specs = await repo.get_page(limit=limit, offset=offset)
 
         # Convert to SpecListItem format
         result = []
-        for spec in paginated_specs:
-            impl_count = len([impl for impl in spec.impls if impl.code is not None])
+        for spec in specs:
+            impl_count = sum(1 for impl in spec.impls if impl.has_code)
             item = SpecListItem(
                 id=spec.id, title=spec.title, description=spec.description, tags=spec.tags, library_count=impl_count
             )
             result.append({**item.model_dump(), "website_url": f"{ANYPLOT_WEBSITE_URL}/python/{spec.id}"})
 
         return result
-    finally:
-        await session.close()
+
+    return await _cached(cache_key("mcp", "list_specs", f"limit={limit}", f"offset={offset}"), _build)
 
 
 @mcp_server.tool()
@@ -142,6 +203,9 @@ async def search_specs_by_tags(
         - dataprep: Data preparation techniques (normalization, aggregation, etc.)
         - styling: Visual styling approaches (publication-ready, minimal, etc.)
 
+    Multiple values within a category match any (OR); multiple categories must
+    all match (AND). Impl-level filters must hold for a single implementation.
+
     Args:
         plot_type: Filter by plot type tags
         data_type: Filter by data type tags
@@ -161,82 +225,74 @@ async def search_specs_by_tags(
     if not is_db_configured():
         raise ValueError("Database not configured. Check DATABASE_URL or INSTANCE_CONNECTION_NAME.")
 
-    session = await get_mcp_db_session()
-    try:
+    # Build filter dict (spec-level tags)
+    filters: dict[str, list[str]] = {}
+    if plot_type:
+        filters["plot_type"] = plot_type
+    if data_type:
+        filters["data_type"] = data_type
+    if domain:
+        filters["domain"] = domain
+    if features:
+        filters["features"] = features
+
+    # Impl-level tags
+    impl_filters: dict[str, list[str]] = {}
+    if dependencies:
+        impl_filters["dependencies"] = dependencies
+    if techniques:
+        impl_filters["techniques"] = techniques
+    if patterns:
+        impl_filters["patterns"] = patterns
+    if dataprep:
+        impl_filters["dataprep"] = dataprep
+    if styling:
+        impl_filters["styling"] = styling
+
+    async def _build(session: AsyncSession) -> list[dict[str, Any]]:
         repo = SpecRepository(session)
-
-        # Build filter dict (spec-level tags)
-        filters: dict[str, list[str]] = {}
-        if plot_type:
-            filters["plot_type"] = plot_type
-        if data_type:
-            filters["data_type"] = data_type
-        if domain:
-            filters["domain"] = domain
-        if features:
-            filters["features"] = features
-
-        # Flatten filter values into a single tag list for repository search
-        tag_values: list[str] = [tag for tags in filters.values() for tag in tags]
-
-        # Search by spec-level tags. The fallback path (no tag filter) still
-        # iterates spec.impls below and reads impl.code, so use the
-        # eager-loaded variant — `search_by_tags` already undefers code.
-        specs = await repo.search_by_tags(tag_values) if tag_values else await repo.get_all_with_code()
-
-        # Apply impl-level filtering if needed
-        if library or dependencies or techniques or patterns or dataprep or styling:
-            filtered_specs = []
-            for spec in specs:
-                # Check if spec has implementations matching impl-level filters
-                matching_impls = []
-                for impl in spec.impls:
-                    if impl.code is None:
-                        continue
-
-                    # Filter by library
-                    if library and impl.library.id not in library:
-                        continue
-
-                    # Filter by impl tags
-                    if dependencies and not any(
-                        dep in (impl.impl_tags.get("dependencies", []) or []) for dep in dependencies
-                    ):
-                        continue
-                    if techniques and not any(
-                        tech in (impl.impl_tags.get("techniques", []) or []) for tech in techniques
-                    ):
-                        continue
-                    if patterns and not any(pat in (impl.impl_tags.get("patterns", []) or []) for pat in patterns):
-                        continue
-                    if dataprep and not any(dp in (impl.impl_tags.get("dataprep", []) or []) for dp in dataprep):
-                        continue
-                    if styling and not any(style in (impl.impl_tags.get("styling", []) or []) for style in styling):
-                        continue
-
-                    matching_impls.append(impl)
-
-                # Include spec if it has matching implementations
-                if matching_impls:
-                    filtered_specs.append(spec)
-
-            specs = filtered_specs
-
-        # Apply limit
-        specs = specs[:limit]
+        # All filters (spec tags, impl tags, library) and the limit run in SQL
+        specs = await repo.search_by_tags(filters, impl_tags=impl_filters, libraries=library, limit=limit)
 
         # Convert to SpecListItem format
         result = []
         for spec in specs:
-            impl_count = len([impl for impl in spec.impls if impl.code is not None])
+            impl_count = sum(1 for impl in spec.impls if impl.has_code)
             item = SpecListItem(
                 id=spec.id, title=spec.title, description=spec.description, tags=spec.tags, library_count=impl_count
             )
             result.append({**item.model_dump(), "website_url": f"{ANYPLOT_WEBSITE_URL}/python/{spec.id}"})
 
         return result
-    finally:
-        await session.close()
+
+    return await _cached(_tag_search_key(filters, impl_filters, library, limit), _build)
+
+
+@mcp_server.tool()
+async def search_specs(query: str, limit: int = 20) -> list[dict[str, Any]]:
+    """
+    Search plot specifications with a natural-language query.
+
+    Matches against spec titles, descriptions, applications and tags, ranked by
+    relevance. Use this for free-text requests ("show correlation between
+    variables"); use search_specs_by_tags for exact tag filters.
+
+    Args:
+        query: Free-text search query
+        limit: Maximum number of specs to return (default: 20)
+
+    Returns:
+        List of matching specs with id, title, description and relevance score, best first
+    """
+    if not is_db_configured():
+        raise ValueError("Database not configured. Check DATABASE_URL or INSTANCE_CONNECTION_NAME.")
+
+    # The index is cached process-wide; a session is only opened (on the MCP pool) to build it
+    index = await get_spec_index(open_session=get_mcp_db_session)
+    return [
+        {**hit, "website_url": f"{ANYPLOT_WEBSITE_URL}/python/{hit['id']}"}
+        for hit in spec_search_hits(index, query, limit)
+    ]
 
 
 @mcp_server.tool()
@@ -260,8 +316,7 @@ async def get_spec_detail(spec_id: str) -> dict[str, Any]:
     if not is_db_configured():
         raise ValueError("Database not configured. Check DATABASE_URL or INSTANCE_CONNECTION_NAME.")
 
-    session = await get_mcp_db_session()
-    try:
+    async def _build(session: AsyncSession) -> dict[str, Any]:
         repo = SpecRepository(session)
         # get_by_id_with_code eager-loads Impl.code so the loop below can read
         # it without triggering a deferred-column lazy load (MissingGreenlet
@@ -324,8 +379,8 @@ async def get_spec_detail(spec_id: str) -> dict[str, Any]:
         )
 
         return {**response.model_dump(), "website_url": f"{ANYPLOT_WEBSITE_URL}/python/{spec_id}"}
-    finally:
-        await session.close()
+
+    return await _cached(cache_key("mcp", "spec", spec_id), _build)
 
 
 @mcp_server.tool()
@@ -352,8 +407,7 @@ async def get_implementation(spec_id: str, library: str) -> dict[str, Any]:
     if not is_db_configured():
         raise ValueError("Database not configured. Check DATABASE_URL or INSTANCE_CONNECTION_NAME.")
 
-    session = await get_mcp_db_session()
-    try:
+    async def _build(session: AsyncSession) -> dict[str, Any]:
         spec_repo = SpecRepository(session)
         library_repo = LibraryRepository(session)
         impl_repo = ImplRepository(session)
@@ -404,8 +458,8 @@ async def get_implementation(spec_id: str, library: str) -> dict[str, Any]:
             **response.model_dump(),
             "website_url": f"{ANYPLOT_WEBSITE_URL}/{spec_id}/{impl.library.language}/{library}",
         }
-    finally:
-        await session.close()
+
+    return await _cached(cache_key("mcp", "impl", spec_id, library), _build)
 
 
 @mcp_server.tool()
@@ -419,8 +473,7 @@ async def list_libraries() -> list[dict[str, Any]]:
     if not is_db_configured():
         raise ValueError("Database not configured. Check DATABASE_URL or INSTANCE_CONNECTION_NAME.")
 
-    session = await get_mcp_db_session()
-    try:
+    async def _build(session: AsyncSession) -> list[dict[str, Any]]:
         repo = LibraryRepository(session)
         libraries = await repo.get_all()
 
@@ -429,8 +482,8 @@ async def list_libraries() -> list[dict[str, Any]]:
             result.append({"id": lib.id, "name": lib.name, "description": lib.description})
 
         return result
-    finally:
-        await session.close()
+
+    return await _cached(cache_key("mcp", "libraries"), _build)
 
 
 @mcp_server.tool()
@@ -473,8 +526,7 @@ async def get_tag_values(category: str) -> list[str]:
     if not is_db_configured():
         raise ValueError("Database not configured. Check DATABASE_URL or INSTANCE_CONNECTION_NAME.")
 
-    session = await get_mcp_db_session()
-    try:
+    async def _build(session: AsyncSession) -> list[str]:
         repo = SpecRepository(session)
         specs = await repo.get_all()
 
@@ -498,5 +550,5 @@ async def get_tag_values(category: str) -> list[str]:
                             values.update(tag_list)
 
         return sorted(values)
-    finally:
-        await session.close()
+
+    return await _cached(cache_key("mcp", "tag_values", category), _build)
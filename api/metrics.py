@@ -0,0 +1,235 @@
+"""
+Prometheus metrics for the API, exposed by GET /metrics (OpenMetrics or text format).
+
+Series (all prefixed ``anyplot_``):
+  - ``http_requests_total`` / ``http_request_duration_seconds``: per method, route
+    template and status (recorded by MetricsMiddleware)
+  - ``cache_events_total``: hit, miss, stale, refresh, refresh_error, evict_ttl and
+    evict_size per cache namespace (the key's first segment, e.g. ``spec``, ``filter``)
+  - ``db_pool_*``: checked-out / size gauges and checkout, wait, timeout and connect
+    error counters per pool (api, read, mcp, mcp_read)
+  - ``og_render_seconds``: OG image rendering per kind (home, branded, collage)
+  - ``outbound_request_duration_seconds``: httpx calls per target (gcs, plausible)
+  - ``event_loop_lag_seconds``: how late a periodic asyncio sleep wakes up
+  - ``event_loop_blocks_total``: stalls flagged by the opt-in api.loop_monitor
+
+With several uvicorn workers set PROMETHEUS_MULTIPROC_DIR to an empty directory
+before the workers start (prometheus_client reads it at import): every worker then
+writes its samples to mmapped files there and /metrics aggregates all of them, no
+matter which worker answers the scrape.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any
+
+import httpx
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+from prometheus_client.exposition import choose_encoder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.database import connection
+from core.database.connection import get_pool_status
+
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+HTTP_REQUESTS = Counter(
+    "anyplot_http_requests", "HTTP requests by route template and status", ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "anyplot_http_request_duration_seconds",
+    "HTTP request duration (until the last body chunk is sent)",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+CACHE_EVENTS = Counter("anyplot_cache_events", "Response cache events by key namespace", ["namespace", "event"])
+DB_POOL_CHECKED_OUT = Gauge(
+    "anyplot_db_pool_checked_out", "Connections currently checked out", ["pool"], multiprocess_mode="livesum"
+)
+DB_POOL_SIZE = Gauge("anyplot_db_pool_size", "Persistent pool size", ["pool"], multiprocess_mode="livesum")
+DB_POOL_CHECKOUTS = Counter("anyplot_db_pool_checkouts", "Successful connection checkouts", ["pool"])
+DB_POOL_CHECKOUT_WAIT = Counter(
+    "anyplot_db_pool_checkout_wait_seconds", "Time spent waiting for checkouts (incl. connect)", ["pool"]
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter("anyplot_db_pool_checkout_timeouts", "Checkouts that timed out", ["pool"])
+DB_POOL_CONNECT_ERRORS = Counter("anyplot_db_pool_connect_errors", "Failed connection attempts", ["pool"])
+OG_RENDER_DURATION = Histogram(
+    "anyplot_og_render_seconds",
+    "OG image rendering time",
+    ["kind"],
+    buckets=(0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+OUTBOUND_REQUEST_DURATION = Histogram(
+    "anyplot_outbound_request_duration_seconds",
+    "Outbound HTTP call duration (until the response headers arrive)",
+    ["target", "status"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+EVENT_LOOP_LAG = Histogram(
+    "anyplot_event_loop_lag_seconds",
+    "Delay of a periodic asyncio sleep beyond its interval",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+EVENT_LOOP_BLOCKS = Counter(
+    "anyplot_event_loop_blocks", "Loop stalls longer than LOOP_MONITOR_THRESHOLD_MS (see api/loop_monitor.py)"
+)
+
+
+# ---------------------------------------------------------------------------
+# Exposition
+# ---------------------------------------------------------------------------
+
+
+def render_metrics(accept: str | None) -> tuple[bytes, str]:
+    """Encode all metrics for a scrape; returns (body, content type) negotiated from *accept*."""
+    sample_pools()
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    encoder, content_type = choose_encoder(accept or "")
+    return encoder(registry), content_type
+
+
+def mark_worker_dead() -> None:
+    """Drop this worker's live gauges from the multiprocess files (call on shutdown)."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+# ---------------------------------------------------------------------------
+# Requests
+# ---------------------------------------------------------------------------
+
+
+class MetricsMiddleware:
+    """Count and time every HTTP request per route template and status."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = "500"  # if the app raises before starting a response
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Route template (not the raw path) so IDs do not explode the number of series
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUESTS.labels(scope["method"], route, status).inc()
+            HTTP_REQUEST_DURATION.labels(scope["method"], route).observe(time.perf_counter() - start)
+            sample_pools(max_age=1.0)
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+
+def cache_event(key: str, event: str) -> None:
+    """Count a cache *event* for the namespace of *key* (``spec:scatter-basic`` -> ``spec``)."""
+    CACHE_EVENTS.labels(key.split(":", 1)[0], event).inc()
+
+
+# ---------------------------------------------------------------------------
+# Connection pools
+# ---------------------------------------------------------------------------
+
+_pool_samples: dict[str, dict[str, Any]] = {}
+_last_pool_sample = 0.0
+
+
+def _record_pool(name: str, status: dict[str, Any]) -> None:
+    if not status:
+        return
+    DB_POOL_CHECKED_OUT.labels(name).set(status["checked_out"])
+    DB_POOL_SIZE.labels(name).set(status["size"])
+    if "checkouts" not in status:
+        return
+    # PoolMetrics keeps running totals; add what happened since the last sample
+    previous = _pool_samples.get(name, {})
+    wait_total = status["checkout_ms_avg"] * status["checkouts"] / 1000
+    previous_wait = previous.get("checkout_ms_avg", 0.0) * previous.get("checkouts", 0) / 1000
+    for counter, field in (
+        (DB_POOL_CHECKOUTS, "checkouts"),
+        (DB_POOL_CHECKOUT_TIMEOUTS, "checkout_timeouts"),
+        (DB_POOL_CONNECT_ERRORS, "connect_errors"),
+    ):
+        delta = status[field] - previous.get(field, 0)
+        if delta > 0:
+            counter.labels(name).inc(delta)
+    if wait_total > previous_wait:
+        DB_POOL_CHECKOUT_WAIT.labels(name).inc(wait_total - previous_wait)
+    _pool_samples[name] = status
+
+
+def sample_pools(max_age: float = 0.0) -> None:
+    """Copy the pool status of all engines into the db_pool_* series.
+
+    Called at every scrape and, at most once per *max_age* seconds, after
+    requests, so workers that do not answer the scrape still report fresh values.
+    """
+    global _last_pool_sample
+    now = time.monotonic()
+    if now - _last_pool_sample < max_age:
+        return
+    _last_pool_sample = now
+
+    from api.mcp.lazy import get_mcp_pool_stats  # never loads the MCP server for a scrape
+
+    for name, engine in (("api", connection.engine), ("read", connection.read_engine)):
+        if engine is not None:
+            _record_pool(name, get_pool_status(engine))
+    _record_pool("mcp", get_mcp_pool_stats())
+    _record_pool("mcp_read", get_mcp_pool_stats(replica=True))
+
+
+# ---------------------------------------------------------------------------
+# Outbound HTTP
+# ---------------------------------------------------------------------------
+
+
+def outbound_hooks(target: str) -> dict[str, list]:
+    """httpx ``event_hooks`` that time every request of a client as *target*.
+
+    Example:
+        >>> httpx.AsyncClient(timeout=5.0, event_hooks=outbound_hooks("plausible"))
+    """
+
+    async def on_request(request: httpx.Request) -> None:
+        request.extensions["metrics_start"] = time.perf_counter()
+
+    async def on_response(response: httpx.Response) -> None:
+        start = response.request.extensions.get("metrics_start")
+        if start is not None:
+            OUTBOUND_REQUEST_DURATION.labels(target, str(response.status_code)).observe(time.perf_counter() - start)
+
+    return {"request": [on_request], "response": [on_response]}
+
+
+# ---------------------------------------------------------------------------
+# Event loop lag
+# ---------------------------------------------------------------------------
+
+
+async def monitor_event_loop_lag(interval: float = 0.5) -> None:
+    """Sleep *interval* seconds in a loop and record how late each wake-up is (run as a task)."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(loop.time() - start - interval, 0.0))
@@ -2,23 +2,34 @@
 
 from __future__ import annotations
 
+import asyncio
 import secrets
 import time
 from collections import Counter
 from datetime import datetime, timedelta, timezone
 from functools import lru_cache
+from typing import TYPE_CHECKING
 
-import jwt as pyjwt
-from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api import profiler
 from api.cache import clear_cache, get_cache_stats
 from api.dependencies import require_db
+from api.loop_monitor import loop_monitor
+from api.mcp.lazy import get_mcp_pool_stats
+from api.timing import rolling_timings
 from core.config import settings
 from core.constants import SUPPORTED_LIBRARIES
-from core.database import SpecRepository
+from core.database import SpecRepository, connection
+from core.database.connection import get_pool_status
+
+
+if TYPE_CHECKING:
+    import jwt as pyjwt
 
 
 router = APIRouter(prefix="/debug", tags=["debug"])
@@ -34,6 +45,8 @@ def _jwks_client() -> pyjwt.PyJWKClient | None:
     """
     if not settings.cf_access_team_domain:
         return None
+    import jwt as pyjwt  # only needed once the JWT path is configured
+
     return pyjwt.PyJWKClient(f"https://{settings.cf_access_team_domain}/cdn-cgi/access/certs")
 
 
@@ -46,6 +59,8 @@ def _verify_cf_access_jwt(token: str) -> str | None:
     client = _jwks_client()
     if client is None or not settings.cf_access_aud:
         return None
+    import jwt as pyjwt
+
     try:
         signing_key = client.get_signing_key_from_jwt(token)
         claims = pyjwt.decode(
@@ -473,6 +488,115 @@ async def ping(db: AsyncSession = Depends(require_db)) -> PingResponse:
     )
 
 
+class PoolStatsResponse(BaseModel):
+    """Connection pool snapshots for the FastAPI and MCP engines (see get_pool_status).
+
+    `read` and `mcp_read` are the read-replica pools (empty without DATABASE_READ_URL).
+    """
+
+    api: dict[str, float]
+    mcp: dict[str, float]
+    read: dict[str, float] = {}
+    mcp_read: dict[str, float] = {}
+
+
+@router.get("/pools", response_model=PoolStatsResponse, dependencies=[Depends(require_admin)])
+async def pool_stats() -> PoolStatsResponse:
+    """Report pool occupancy, checkout latency, timeouts and connect errors (no DB round-trip).
+
+    `checked_out` at `size + max_overflow`, a growing `checkout_ms_max` or any
+    `checkout_timeouts` mean requests are queueing for connections and the pool
+    (DB_POOL_SIZE / DB_MAX_OVERFLOW) is too small for the instance's concurrency.
+    """
+    return PoolStatsResponse(
+        api=get_pool_status(connection.engine) if connection.engine is not None else {},
+        mcp=get_mcp_pool_stats(),
+        read=get_pool_status(connection.read_engine) if connection.read_engine is not None else {},
+        mcp_read=get_mcp_pool_stats(replica=True),
+    )
+
+
+class TimingStatsResponse(BaseModel):
+    """Rolling request-stage latencies per route (see api/timing.py).
+
+    `routes` maps "METHOD /route/{template}" to the total request `count` since
+    startup and, per stage (cache, db, orm, app, gzip, total), the p50/p95/p99/max
+    in milliseconds over the route's last `window` requests.
+    """
+
+    enabled: bool
+    window: int
+    routes: dict[str, dict]
+
+
+@router.get("/timings", response_model=TimingStatsResponse, dependencies=[Depends(require_admin)])
+async def timing_stats() -> TimingStatsResponse:
+    """Report per-route, per-stage latency percentiles (no DB round-trip)."""
+    return TimingStatsResponse(
+        enabled=settings.server_timing_enabled, window=rolling_timings.window, routes=rolling_timings.snapshot()
+    )
+
+
+class LoopStallItem(BaseModel):
+    started_at: str
+    duration_ms: float
+    stack: list[str]
+
+
+class LoopMonitorResponse(BaseModel):
+    """Event-loop stalls caught by the loop monitor (see api/loop_monitor.py).
+
+    `total` counts stalls since startup; `stalls` holds the most recent ones,
+    newest first, each with the loop thread's stack when it was detected.
+    """
+
+    enabled: bool
+    threshold_ms: float
+    total: int
+    stalls: list[LoopStallItem]
+
+
+@router.get("/loop", response_model=LoopMonitorResponse, dependencies=[Depends(require_admin)])
+async def loop_stalls() -> LoopMonitorResponse:
+    """Report recent event-loop stalls longer than LOOP_MONITOR_THRESHOLD_MS."""
+    return LoopMonitorResponse(
+        enabled=loop_monitor.running,
+        threshold_ms=loop_monitor.threshold * 1000,
+        total=loop_monitor.total,
+        stalls=[LoopStallItem(**stall) for stall in loop_monitor.snapshot()],
+    )
+
+
+# One capture at a time per worker: concurrent samplers would profile each other
+_profile_lock = asyncio.Lock()
+
+
+@router.get("/profile", dependencies=[Depends(require_admin)])
+async def capture_profile(
+    seconds: float = Query(default=10.0, ge=0.1, le=60.0, description="Capture duration"),
+    interval_ms: float = Query(default=5.0, ge=1.0, le=100.0, description="Sampling interval"),
+    format: str = Query(default="collapsed", pattern="^(collapsed|speedscope)$"),
+) -> Response:
+    """Sample the stacks of all threads of this worker for *seconds* (see api/profiler.py).
+
+    `collapsed` returns `thread;frame;...;frame count` lines for flamegraph.pl or
+    speedscope; `speedscope` returns a speedscope JSON file (one profile per thread).
+    The sampler runs in a worker thread, so requests keep being served (and
+    profiled) meanwhile. Returns 409 while another capture is running.
+    """
+    if _profile_lock.locked():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile capture is already running")
+    async with _profile_lock:
+        counts = await asyncio.to_thread(profiler.sample, seconds, interval_ms / 1000)
+
+    if format == "speedscope":
+        return JSONResponse(
+            profiler.to_speedscope(counts, interval_ms / 1000),
+            headers={"Content-Disposition": 'attachment; filename="anyplot-api.speedscope.json"'},
+        )
+    return PlainTextResponse(profiler.to_collapsed(counts))
+
+
 class CacheInvalidateResponse(BaseModel):
     cleared: int
     maxsize: int
@@ -484,7 +608,9 @@ async def invalidate_cache(x_cache_token: str | None = Header(default=None)) ->
     """Flush the in-memory response cache.
 
     Called by sync-postgres at the end of a successful sync so clients see
-    fresh data without waiting for TTL expiry. Requires the shared token
+    fresh data without waiting for TTL expiry. With a read replica, reads go
+    to the primary for DB_READ_PRIMARY_WINDOW seconds afterwards so the cache
+    is not refilled from a replica that has not caught up yet. Requires the shared token
     `CACHE_INVALIDATE_TOKEN` in the `X-Cache-Token` header; returns 503 if
     no token is configured on the server.
     """
@@ -496,6 +622,7 @@ async def invalidate_cache(x_cache_token: str | None = Header(default=None)) ->
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid cache token")
 
     stats_before = get_cache_stats()
+    connection.route_reads_to_primary()
     clear_cache()
     return CacheInvalidateResponse(
         cleared=stats_before["size"], maxsize=stats_before["maxsize"], ttl=stats_before["ttl"]
@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.dependencies import require_db
 from api.exceptions import raise_external_service_error, raise_not_found
+from api.metrics import outbound_hooks
 from core.database import SpecRepository
 
 
@@ -36,7 +37,7 @@ async def download_image(spec_id: str, library: str, db: AsyncSession = Depends(
     # Explicit timeout — without it a slow GCS response hangs the request
     # indefinitely. Other handlers in this router tree use 10-30s; pick
     # 15s for image downloads.
-    async with httpx.AsyncClient(timeout=15.0) as client:
+    async with httpx.AsyncClient(timeout=15.0, event_hooks=outbound_hooks("gcs")) as client:
         try:
             response = await client.get(impl.preview_url)
             response.raise_for_status()
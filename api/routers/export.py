@@ -0,0 +1,31 @@
+"""Catalog export endpoints."""
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.dependencies import require_db
+from core.export import iter_catalog_ndjson
+
+
+router = APIRouter(tags=["export"])
+
+
+@router.get("/export/catalog.ndjson")
+async def export_catalog(
+    code: bool = Query(default=False, description="Include each implementation's source code"),
+    db: AsyncSession = Depends(require_db),
+) -> StreamingResponse:
+    """
+    Stream the full catalog as NDJSON: each spec line is followed by its impl lines.
+
+    Rows are read through a server-side cursor and written as they arrive, so
+    server memory stays flat regardless of catalog size; GZipMiddleware
+    compresses the stream on the fly. The request's DB session stays open
+    until the body is fully sent.
+    """
+    return StreamingResponse(
+        iter_catalog_ndjson(db, include_code=code),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="anyplot-catalog.ndjson"'},
+    )
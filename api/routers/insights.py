@@ -9,6 +9,7 @@ Public analytics and discovery features that leverage aggregated database data:
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import random
 from collections import Counter, defaultdict
@@ -20,6 +21,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.cache import cache_key, get_or_set_cache
 from api.dependencies import require_db
+from core.config import settings
 from core.constants import SUPPORTED_LIBRARIES
 from core.database import ImplRepository, Spec, SpecRepository
 from core.database.connection import get_db_context
@@ -466,90 +468,170 @@ def _collect_impl_tags(spec: Spec, library: str | None = None) -> set[str]:
     return tags
 
 
-async def _build_related(
-    repo: SpecRepository, spec_id: str, limit: int, mode: str, library: str | None = None
+# Neighbour lists keep twice the largest accepted `limit`, which is exactly the
+# candidate pool the jittered selection below draws from.
+RELATED_MAX_LIMIT = 24
+_RELATED_POOL_SIZE = RELATED_MAX_LIMIT * 2
+
+
+class RelatedIndex:
+    """Precomputed tag-similarity neighbours for every (spec, mode, library) variant.
+
+    Tags are interned into a sorted vocabulary so each spec becomes an int
+    bitset; Jaccard similarity is then two popcounts. Neighbour lists are
+    ranked once per catalog refresh, so a related lookup is an O(K) read.
+
+    Attributes:
+        tag_values: Tag value (without category) for each vocabulary id.
+        libraries: Library ids that have their own full-mode variant.
+        previews: spec_id -> title + best-quality preview fields.
+        neighbours: (spec_id, mode, library) -> [(other_id, similarity, shared_bits)],
+            sorted by similarity descending and truncated to the pool size.
+    """
+
+    def __init__(
+        self,
+        tag_values: list[str],
+        libraries: frozenset[str],
+        previews: dict[str, dict],
+        neighbours: dict[tuple[str, str, str], list[tuple[str, float, int]]],
+    ):
+        self.tag_values = tag_values
+        self.libraries = libraries
+        self.previews = previews
+        self.neighbours = neighbours
+
+    def variant(self, mode: str, library: str | None) -> tuple[str, str]:
+        """Map request params to the precomputed variant that answers them.
+
+        Full mode with a library that has no impls collects spec tags only,
+        which is identical to spec mode.
+        """
+        if mode != "full":
+            return ("spec", "")
+        if library and library not in self.libraries:
+            return ("spec", "")
+        return ("full", library or "")
+
+    def shared_tags(self, bits: int) -> list[str]:
+        """Decode a shared-tag bitset; ids are assigned in sorted tag order."""
+        values = []
+        while bits:
+            low = bits & -bits
+            values.append(self.tag_values[low.bit_length() - 1])
+            bits ^= low
+        return values
+
+
+def _rank_neighbours(bitsets: list[tuple[str, int]]) -> dict[str, list[tuple[str, float, int]]]:
+    """Rank every spec against all others by Jaccard similarity of tag bitsets."""
+    sizes = [bits.bit_count() for _, bits in bitsets]
+    ranked: dict[str, list[tuple[str, float, int]]] = {}
+    for i, (spec_id, target) in enumerate(bitsets):
+        if not target:
+            continue
+        target_size = sizes[i]
+        scored: list[tuple[str, float, int]] = []
+        for j, (other_id, other) in enumerate(bitsets):
+            if i == j or not other:
+                continue
+            shared = target & other
+            if not shared:
+                continue
+            inter = shared.bit_count()
+            scored.append((other_id, inter / (target_size + sizes[j] - inter), shared))
+        scored.sort(key=lambda x: x[1], reverse=True)
+        ranked[spec_id] = scored[:_RELATED_POOL_SIZE]
+    return ranked
+
+
+def _build_related_index(all_specs: list[Spec]) -> RelatedIndex:
+    """Build the related-plots index from the full spec list (one pass per variant)."""
+    libraries = frozenset(impl.library_id for spec in all_specs for impl in spec.impls)
+
+    variants: dict[tuple[str, str], dict[str, set[str]]] = {
+        ("spec", ""): {spec.id: _flatten_tags(spec.tags) for spec in all_specs},
+        ("full", ""): {spec.id: _collect_impl_tags(spec) for spec in all_specs},
+    }
+    for lib in sorted(libraries):
+        variants[("full", lib)] = {spec.id: _collect_impl_tags(spec, lib) for spec in all_specs}
+
+    vocabulary = sorted({tag for tag_sets in variants.values() for tags in tag_sets.values() for tag in tags})
+    tag_ids = {tag: i for i, tag in enumerate(vocabulary)}
+
+    neighbours: dict[tuple[str, str, str], list[tuple[str, float, int]]] = {}
+    for (mode, lib), tag_sets in variants.items():
+        bitsets = [(spec.id, sum(1 << tag_ids[t] for t in tag_sets[spec.id])) for spec in all_specs]
+        for spec_id, ranked in _rank_neighbours(bitsets).items():
+            neighbours[(spec_id, mode, lib)] = ranked
+
+    previews: dict[str, dict] = {}
+    for spec in all_specs:
+        impls_with_preview = [i for i in spec.impls if i.preview_url]
+        best_impl = max(impls_with_preview, key=lambda i: i.quality_score or 0) if impls_with_preview else None
+        previews[spec.id] = {
+            "title": spec.title,
+            "preview_url": best_impl.preview_url if best_impl else None,
+            "preview_url_light": best_impl.preview_url_light if best_impl else None,
+            "preview_url_dark": best_impl.preview_url_dark if best_impl else None,
+            "library_id": best_impl.library_id if best_impl else None,
+            "language": best_impl.library.language if best_impl and best_impl.library else None,
+        }
+
+    return RelatedIndex(
+        tag_values=[tag.split(":", 1)[1] for tag in vocabulary],
+        libraries=libraries,
+        previews=previews,
+        neighbours=neighbours,
+    )
+
+
+async def _load_related_index(repo: SpecRepository) -> RelatedIndex:
+    """Load the specs, then build the index in a worker thread (~1 s at catalog size; it would stall the loop)."""
+    return await asyncio.to_thread(_build_related_index, await repo.get_all())
+
+
+async def _refresh_related_index() -> RelatedIndex:
+    """Standalone factory for background refresh."""
+    async with get_db_context() as db:
+        return await _load_related_index(SpecRepository(db))
+
+
+def _lookup_related(
+    index: RelatedIndex, spec_id: str, limit: int, mode: str, library: str | None = None
 ) -> RelatedSpecsResponse:
-    """Find related specs using Jaccard similarity on tags.
+    """Find related specs from the precomputed index.
 
     mode="spec": only spec-level tags (for overview page)
     mode="full": spec + impl tags for the given library (for impl detail page)
     """
-    all_specs = await repo.get_all()
+    scored = index.neighbours.get((spec_id, *index.variant(mode, library)), [])
 
-    # Find target spec
-    target = None
-    for s in all_specs:
-        if s.id == spec_id:
-            target = s
-            break
-    if target is None:
-        return RelatedSpecsResponse(related=[])
-
-    # Build target tags based on mode
-    if mode == "full":
-        target_tags = _collect_impl_tags(target, library)
-    else:
-        target_tags = _flatten_tags(target.tags)
-    if not target_tags:
-        return RelatedSpecsResponse(related=[])
-
-    # Compute similarity for all other specs
-    scored: list[tuple[float, list[str], Spec]] = []
-    for spec in all_specs:
-        if spec.id == spec_id:
-            continue
-        # For other specs: use same library's impl_tags if available, else best match
-        if mode == "full":
-            other_tags = _collect_impl_tags(spec, library)
-        else:
-            other_tags = _flatten_tags(spec.tags)
-        if not other_tags:
-            continue
-        intersection = target_tags & other_tags
-        union = target_tags | other_tags
-        similarity = len(intersection) / len(union) if union else 0
-        if similarity > 0:
-            shared = [t.split(":", 1)[1] for t in sorted(intersection)]
-            scored.append((similarity, shared, spec))
-
-    # Sort by similarity desc, then shuffle within same-score groups for variety
-    scored.sort(key=lambda x: x[0], reverse=True)
     # Take top candidates (2x limit) and shuffle lightly to add variety
     top_pool = scored[: limit * 2]
     if len(top_pool) > limit:
-        # Group by rounded similarity, shuffle within groups
         seed = int(hashlib.md5(spec_id.encode()).hexdigest(), 16) % (2**32)  # noqa: S324
         rng = random.Random(seed)
         rng.shuffle(top_pool)
         # Re-sort but with jitter: high similarity still wins, just not deterministic order
-        top_pool.sort(key=lambda x: x[0] + rng.uniform(0, 0.05), reverse=True)
-
-    # Build response with best-quality preview per spec
-    related: list[RelatedSpecItem] = []
-    for similarity, shared_tags, spec in top_pool[:limit]:
-        impls_with_preview = [i for i in spec.impls if i.preview_url]
-        best_impl = max(impls_with_preview, key=lambda i: i.quality_score or 0) if impls_with_preview else None
-        related.append(
-            RelatedSpecItem(
-                id=spec.id,
-                title=spec.title,
-                preview_url=best_impl.preview_url if best_impl else None,
-                preview_url_light=best_impl.preview_url_light if best_impl else None,
-                preview_url_dark=best_impl.preview_url_dark if best_impl else None,
-                library_id=best_impl.library_id if best_impl else None,
-                language=(best_impl.library.language if best_impl and best_impl.library else None),
-                similarity=round(similarity, 3),
-                shared_tags=shared_tags,
-            )
+        top_pool.sort(key=lambda x: x[1] + rng.uniform(0, 0.05), reverse=True)
+
+    related = [
+        RelatedSpecItem(
+            id=other_id,
+            **index.previews[other_id],
+            similarity=round(similarity, 3),
+            shared_tags=index.shared_tags(shared_bits),
         )
-
+        for other_id, similarity, shared_bits in top_pool[:limit]
+    ]
     return RelatedSpecsResponse(related=related)
 
 
 @router.get("/related/{spec_id}", response_model=RelatedSpecsResponse)
 async def get_related_specs(
     spec_id: str,
-    limit: int = Query(default=6, ge=1, le=24),
+    limit: int = Query(default=6, ge=1, le=RELATED_MAX_LIMIT),
     mode: str = Query(default="spec", pattern="^(spec|full)$"),
     library: str | None = Query(default=None),
     db: AsyncSession = Depends(require_db),
@@ -563,7 +645,13 @@ async def get_related_specs(
     """
     repo = SpecRepository(db)
 
-    async def _fetch() -> RelatedSpecsResponse:
-        return await _build_related(repo, spec_id, limit, mode, library)
+    async def _fetch() -> RelatedIndex:
+        return await _load_related_index(repo)
 
-    return await get_or_set_cache(cache_key("insights", "related", spec_id, str(limit), mode, library or ""), _fetch)
+    index = await get_or_set_cache(
+        cache_key("insights", "related_index"),
+        _fetch,
+        refresh_after=settings.cache_refresh_after,
+        refresh_factory=_refresh_related_index,
+    )
+    return _lookup_related(index, spec_id, limit, mode, library)
@@ -8,7 +8,7 @@ from api.dependencies import optional_db, require_db
 from api.exceptions import raise_not_found
 from core.config import settings
 from core.constants import LIBRARIES_METADATA, SUPPORTED_LIBRARIES
-from core.database import LibraryRepository, SpecRepository
+from core.database import ImplRepository, LibraryRepository
 from core.database.connection import get_db_context
 from core.utils import strip_noqa_comments
 
@@ -16,24 +16,28 @@ from core.utils import strip_noqa_comments
 router = APIRouter(tags=["libraries"])
 
 
+def _libraries_payload(libraries: list) -> dict:
+    """Response body of GET /libraries (also built from the catalog snapshot, see api/snapshot.py)."""
+    return {
+        "libraries": [
+            {
+                "id": lib.id,
+                "name": lib.name,
+                "language": lib.language,
+                "version": lib.version,
+                "documentation_url": lib.documentation_url,
+                "description": lib.description,
+            }
+            for lib in libraries
+        ]
+    }
+
+
 async def _refresh_libraries() -> dict:
     """Standalone factory for background refresh (creates own DB session)."""
     async with get_db_context() as db:
         repo = LibraryRepository(db)
-        libraries = await repo.get_all()
-        return {
-            "libraries": [
-                {
-                    "id": lib.id,
-                    "name": lib.name,
-                    "language": lib.language,
-                    "version": lib.version,
-                    "documentation_url": lib.documentation_url,
-                    "description": lib.description,
-                }
-                for lib in libraries
-            ]
-        }
+        return _libraries_payload(await repo.get_all())
 
 
 @router.get("/libraries")
@@ -48,20 +52,7 @@ async def get_libraries(db: AsyncSession | None = Depends(optional_db)):
 
     async def _fetch() -> dict:
         repo = LibraryRepository(db)
-        libraries = await repo.get_all()
-        return {
-            "libraries": [
-                {
-                    "id": lib.id,
-                    "name": lib.name,
-                    "language": lib.language,
-                    "version": lib.version,
-                    "documentation_url": lib.documentation_url,
-                    "description": lib.description,
-                }
-                for lib in libraries
-            ]
-        }
+        return _libraries_payload(await repo.get_all())
 
     return await get_or_set_cache(
         cache_key("libraries"), _fetch, refresh_after=settings.cache_refresh_after, refresh_factory=_refresh_libraries
@@ -89,22 +80,21 @@ async def get_library_images(library_id: str, db: AsyncSession = Depends(require
     if cached:
         return cached
 
-    repo = SpecRepository(db)
-    specs = await repo.get_all_with_code()
+    # Only this library's implementations load code — not the whole column
+    impls = await ImplRepository(db).get_by_library_with_code(library_id)
 
     images = []
-    for spec in specs:
-        for impl in spec.impls:
-            if impl.library_id == library_id and impl.preview_url:
-                images.append(
-                    {
-                        "spec_id": spec.id,
-                        "library": impl.library_id,
-                        "url": impl.preview_url,
-                        "html": impl.preview_html,
-                        "code": strip_noqa_comments(impl.code),
-                    }
-                )
+    for impl in impls:
+        if impl.preview_url:
+            images.append(
+                {
+                    "spec_id": impl.spec_id,
+                    "library": impl.library_id,
+                    "url": impl.preview_url,
+                    "html": impl.preview_html,
+                    "code": strip_noqa_comments(impl.code),
+                }
+            )
 
     result = {"library": library_id, "images": images}
     set_cache(key, result)
@@ -0,0 +1,34 @@
+"""Prometheus metrics endpoint."""
+
+import secrets
+
+from fastapi import APIRouter, Header, HTTPException, Response, status
+
+from api.metrics import render_metrics
+from core.config import settings
+
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics(
+    authorization: str | None = Header(default=None), accept: str | None = Header(default=None)
+) -> Response:
+    """
+    Prometheus scrape target (OpenMetrics if the scraper asks for it, else text format).
+
+    Requires `METRICS_TOKEN` as a bearer token (`authorization` in the Prometheus
+    scrape config); returns 503 if no token is configured on the server. With
+    PROMETHEUS_MULTIPROC_DIR set, the samples of all workers are aggregated.
+    """
+    expected = settings.metrics_token
+    if not settings.metrics_enabled or not expected:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Metrics not configured")
+    scheme, _, token = (authorization or "").partition(" ")
+    # Constant-time compare to avoid byte-by-byte token recovery via timing.
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token, expected):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+
+    body, content_type = render_metrics(accept)
+    return Response(content=body, media_type=content_type)
@@ -4,18 +4,23 @@ import asyncio
 import logging
 from io import BytesIO
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import httpx
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import Response
-from PIL import Image
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.analytics import track_og_image
 from api.cache import cache_key, get_cache, set_cache
 from api.dependencies import optional_db
+from api.metrics import OG_RENDER_DURATION, outbound_hooks
 from core.database import SpecRepository
-from core.images import create_branded_og_image, create_home_og_image, create_og_collage
+
+
+# Pillow and the renderers load on the first OG request, not at API startup
+if TYPE_CHECKING:
+    from PIL import Image
 
 
 logger = logging.getLogger(__name__)
@@ -46,7 +51,10 @@ def _get_static_og_image() -> bytes:
         return _STATIC_OG_IMAGE
 
     try:
-        result = create_home_og_image(theme="light")
+        from core.images import create_home_og_image
+
+        with OG_RENDER_DURATION.labels("home").time():
+            result = create_home_og_image(theme="light")
         rendered = result if isinstance(result, bytes) else _image_to_bytes(result)
         _STATIC_OG_IMAGE = rendered  # only memoize successful dynamic output
         return rendered
@@ -64,7 +72,7 @@ def _get_static_og_image() -> bytes:
             raise HTTPException(status_code=500, detail="Static OG image not available") from exc
 
 
-def _image_to_bytes(img: Image.Image) -> bytes:
+def _image_to_bytes(img: "Image.Image") -> bytes:
     """Convert a PIL Image to PNG bytes (only used by the static-fallback branch)."""
     buf = BytesIO()
     img.save(buf, "PNG", optimize=True)
@@ -107,7 +115,9 @@ def _get_http_client() -> httpx.AsyncClient:
     global _http_client
     if _http_client is None or _http_client.is_closed:
         _http_client = httpx.AsyncClient(
-            timeout=30.0, limits=httpx.Limits(max_connections=10, max_keepalive_connections=5)
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+            event_hooks=outbound_hooks("gcs"),
         )
     return _http_client
 
@@ -168,7 +178,10 @@ async def get_branded_impl_image(
         image_bytes = await _fetch_image(impl.preview_url)
 
         # Create branded image
-        branded_bytes = create_branded_og_image(image_bytes, spec_id=spec_id, library=library)
+        from core.images import create_branded_og_image
+
+        with OG_RENDER_DURATION.labels("branded").time():
+            branded_bytes = create_branded_og_image(image_bytes, spec_id=spec_id, library=library)
 
         # Cache the result
         set_cache(key, branded_bytes)
@@ -226,7 +239,10 @@ async def get_spec_collage_image(
         labels = [impl.library_id for impl in selected_impls]
 
         # Create collage
-        collage_bytes = create_og_collage(images, labels=labels, spec_id=spec_id)
+        from core.images import create_og_collage
+
+        with OG_RENDER_DURATION.labels("collage").time():
+            collage_bytes = create_og_collage(images, labels=labels, spec_id=spec_id)
 
         # Cache the result
         set_cache(key, collage_bytes)
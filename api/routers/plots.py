@@ -1,5 +1,8 @@
 """Filter endpoint for plots."""
 
+import base64
+import itertools
+import json
 import logging
 from collections.abc import Callable
 
@@ -9,7 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.cache import get_or_set_cache
 from api.dependencies import require_db
-from api.exceptions import DatabaseQueryError
+from api.exceptions import DatabaseQueryError, raise_validation_error
 from api.schemas import FilteredPlotsResponse
 from core.database import SpecRepository
 
@@ -19,6 +22,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["plots"])
 
+# Numbers each filter catalog build; derived cache keys carry it (see get_filtered_plots)
+_catalog_generations = itertools.count(1)
+
 
 # =============================================================================
 # Filter Category Extractors - Unified dispatch pattern for filter logic
@@ -378,12 +384,62 @@ def _filter_images(
     ]
 
 
-@router.get("/plots/filter", response_model=FilteredPlotsResponse)
+# Response sections selectable via `fields=` (total/offset/limit/nextCursor are always included)
+FILTER_FIELDS = ("images", "counts", "globalCounts", "orCounts", "specTitles")
+
+
+def _parse_fields(fields: str | None) -> set[str]:
+    """Parse the `fields=` projection; None or empty means every section."""
+    if not fields:
+        return set(FILTER_FIELDS)
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(FILTER_FIELDS)
+    if unknown:
+        raise_validation_error(f"unknown fields: {', '.join(sorted(unknown))} (allowed: {', '.join(FILTER_FIELDS)})")
+    return requested
+
+
+def _encode_cursor(cache_k: str, offset: int) -> str:
+    """Opaque cursor: the next offset bound to the filter it was issued for."""
+    raw = json.dumps({"k": cache_k, "o": offset}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, cache_k: str) -> int:
+    """Return the offset stored in *cursor*; rejects malformed cursors and cursors from another filter."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        offset = data["o"]
+        key = data["k"]
+    except (ValueError, TypeError, KeyError):
+        raise_validation_error("invalid cursor")
+    if key != cache_k or type(offset) is not int or offset < 0:  # not isinstance: rejects true/false
+        raise_validation_error("cursor does not belong to this filter")
+    return offset
+
+
+def _build_filter_catalog(all_specs: list) -> dict:
+    """Filter-independent data shared by every filter combination (one DB load, cached once)."""
+    spec_lookup = _build_spec_lookup(all_specs)
+    return {
+        "generation": next(_catalog_generations),
+        "spec_lookup": spec_lookup,
+        "impl_lookup": _build_impl_lookup(all_specs),
+        "all_images": _collect_all_images(all_specs),
+        "spec_id_to_tags": {spec_id: spec_data["tags"] for spec_id, spec_data in spec_lookup.items()},
+        "global_counts": _calculate_global_counts(all_specs),
+        "spec_titles": {spec_id: data["spec"].title for spec_id, data in spec_lookup.items() if data["spec"].title},
+    }
+
+
+@router.get("/plots/filter", response_model=FilteredPlotsResponse, response_model_exclude_unset=True)
 async def get_filtered_plots(
     request: Request,
     db: AsyncSession = Depends(require_db),
     limit: int | None = Query(None, ge=1),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="Opaque `nextCursor` from a previous page (replaces offset)"),
+    fields: str | None = Query(None, description=f"Comma-separated sections to return: {', '.join(FILTER_FIELDS)}"),
 ):
     """
     Get filtered plot images with counts for all filter categories.
@@ -406,56 +462,76 @@ async def get_filtered_plots(
     - prep: Impl dataprep filter (kde, binning, etc.)
     - style: Impl styling filter (minimal-chrome, etc.)
 
+    Pagination: `limit` plus either `offset` or `cursor`. Paged responses carry
+    `nextCursor` while more images remain. Infinite scroll should request the
+    follow-up pages with `fields=images`, so the facet counts are neither
+    recomputed nor re-sent.
+
+    Each section has its own cache entry (catalog, filtered images, counts,
+    orCounts), so a request only computes the sections it asks for. The
+    per-filter entries are keyed by the catalog's generation: after the
+    catalog is rebuilt, they are recomputed from it together, so one response
+    never mixes images and counts from different catalog loads.
+
     Returns:
         FilteredPlotsResponse with images, counts, and orCounts per group
     """
     # Parse query parameters
     filter_groups = _parse_filter_groups(request)
     cache_k = _build_cache_key(filter_groups)
+    sections = _parse_fields(fields)
+    if cursor is not None:
+        offset = _decode_cursor(cursor, cache_k)
 
-    async def _fetch_filtered() -> FilteredPlotsResponse:
+    # get_or_set_cache provides stampede lock (no refresh_after — too many filter key variants)
+    async def _fetch_catalog() -> dict:
         try:
             repo = SpecRepository(db)
             all_specs = await repo.get_all()
         except SQLAlchemyError as e:
             logger.error("Database query failed in get_filtered_plots: %s", e)
             raise DatabaseQueryError("fetch_specs", str(e)) from e
+        return _build_filter_catalog(all_specs)
 
-        spec_lookup = _build_spec_lookup(all_specs)
-        impl_lookup = _build_impl_lookup(all_specs)
-        all_images = _collect_all_images(all_specs)
-        spec_id_to_tags = {spec_id: spec_data["tags"] for spec_id, spec_data in spec_lookup.items()}
+    catalog = await get_or_set_cache("filter:catalog", _fetch_catalog)
+    derived_k = f"{cache_k}:{catalog['generation']}"
 
-        filtered_images = _filter_images(all_images, filter_groups, spec_lookup, impl_lookup)
+    async def _fetch_images() -> list[dict]:
+        return _filter_images(catalog["all_images"], filter_groups, catalog["spec_lookup"], catalog["impl_lookup"])
 
-        global_counts = _calculate_global_counts(all_specs)
-        counts = _calculate_contextual_counts(filtered_images, spec_id_to_tags, impl_lookup)
-        or_counts = _calculate_or_counts(filter_groups, all_images, spec_id_to_tags, spec_lookup, impl_lookup)
+    filtered_images = await get_or_set_cache(f"{derived_k}:images", _fetch_images)
+    total = len(filtered_images)
 
-        spec_titles = {spec_id: data["spec"].title for spec_id, data in spec_lookup.items() if data["spec"].title}
+    result: dict = {"total": total, "offset": offset, "limit": limit, "nextCursor": None}
+    if limit and offset + limit < total:
+        result["nextCursor"] = _encode_cursor(cache_k, offset + limit)
 
-        return FilteredPlotsResponse(
-            total=len(filtered_images),
-            images=filtered_images,
-            counts=counts,
-            globalCounts=global_counts,
-            orCounts=or_counts,
-            specTitles=spec_titles,
-        )
+    if "images" in sections:
+        result["images"] = filtered_images[offset : offset + limit] if limit else filtered_images[offset:]
 
-    # get_or_set_cache provides stampede lock (no refresh_after — too many filter key variants)
-    cached = await get_or_set_cache(cache_k, _fetch_filtered)
-
-    # Apply pagination on top of (possibly cached) result
-    paginated = cached.images[offset : offset + limit] if limit else cached.images[offset:]
-
-    return FilteredPlotsResponse(
-        total=cached.total,
-        images=paginated,
-        counts=cached.counts,
-        globalCounts=cached.globalCounts,
-        orCounts=cached.orCounts,
-        specTitles=cached.specTitles,
-        offset=offset,
-        limit=limit,
-    )
+    if "counts" in sections:
+
+        async def _fetch_counts() -> dict:
+            return _calculate_contextual_counts(filtered_images, catalog["spec_id_to_tags"], catalog["impl_lookup"])
+
+        result["counts"] = await get_or_set_cache(f"{derived_k}:counts", _fetch_counts)
+
+    if "orCounts" in sections:
+
+        async def _fetch_or_counts() -> list[dict]:
+            return _calculate_or_counts(
+                filter_groups,
+                catalog["all_images"],
+                catalog["spec_id_to_tags"],
+                catalog["spec_lookup"],
+                catalog["impl_lookup"],
+            )
+
+        result["orCounts"] = await get_or_set_cache(f"{derived_k}:or", _fetch_or_counts)
+
+    if "globalCounts" in sections:
+        result["globalCounts"] = catalog["global_counts"]
+    if "specTitles" in sections:
+        result["specTitles"] = catalog["spec_titles"]
+
+    return FilteredPlotsResponse(**result)
@@ -8,6 +8,8 @@ import httpx
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import HTMLResponse
 
+from api.metrics import outbound_hooks
+
 
 logger = logging.getLogger(__name__)
 
@@ -171,7 +173,7 @@ async def proxy_html(url: str, origin: str | None = None):
         target_origin = origin
 
     # Fetch the HTML with shorter timeout
-    async with httpx.AsyncClient(timeout=10.0) as client:
+    async with httpx.AsyncClient(timeout=10.0, event_hooks=outbound_hooks("gcs")) as client:
         try:
             response = await client.get(safe_url)
             response.raise_for_status()
@@ -0,0 +1,48 @@
+"""Search endpoints."""
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.dependencies import require_db
+from api.schemas import CodeSearchHit, CodeSearchResponse, SpecSearchHit, SpecSearchResponse
+from api.search import code_search_hits, get_code_index, get_spec_index, spec_search_hits
+
+
+router = APIRouter(tags=["search"])
+
+
+@router.get("/search", response_model=SpecSearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: AsyncSession = Depends(require_db),
+) -> SpecSearchResponse:
+    """
+    Natural-language search over spec titles, descriptions, applications and tags.
+
+    Example: `/search?q=show correlation between variables`. Results are ranked
+    by BM25 relevance against the in-process spec index.
+    """
+    index = await get_spec_index(db)
+    hits = [SpecSearchHit(**hit) for hit in spec_search_hits(index, q, limit)]
+    return SpecSearchResponse(query=q, total=len(hits), results=hits)
+
+
+@router.get("/search/code", response_model=CodeSearchResponse)
+async def search_code(
+    q: str = Query(..., min_length=1, max_length=200),
+    library: str | None = Query(default=None),
+    tag: list[str] | None = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=50),
+    db: AsyncSession = Depends(require_db),
+) -> CodeSearchResponse:
+    """
+    Full-text search over implementation source code.
+
+    Example: `/search/code?q=twinx&library=matplotlib`. Repeat `tag` to require
+    several tag values (spec or impl level). Each hit carries a snippet of the
+    best-matching lines with query terms wrapped in `<mark>`.
+    """
+    index = await get_code_index(db)
+    hits = await code_search_hits(db, index, q, limit, library=library, tags=tag)
+    return CodeSearchResponse(query=q, total=len(hits), results=[CodeSearchHit(**hit) for hit in hits])
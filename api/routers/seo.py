@@ -1,5 +1,8 @@
 """SEO endpoints (sitemap, bot-optimized pages)."""
 
+import asyncio
+import gzip
+import hashlib
 import html
 import re
 from datetime import datetime
@@ -9,8 +12,9 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import HTMLResponse, RedirectResponse, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.cache import cache_key, get_cache, get_or_set_cache, set_cache
+from api.cache import cache_key, get_or_set_cache
 from api.dependencies import optional_db
+from api.exceptions import raise_not_found
 from core.config import settings
 from core.database import SpecRepository
 from core.database.connection import get_db_context
@@ -29,6 +33,34 @@ def _lastmod(dt: datetime | None) -> str:
     return f"<lastmod>{dt.strftime('%Y-%m-%d')}</lastmod>" if dt else ""
 
 
+_SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+_STATIC_PAGES = ["", "plots", "specs", "libraries", "map", "palette", "about", "mcp", "legal", "stats"]
+
+
+def _spec_url_lines(spec) -> list[str]:
+    """Sitemap <url> lines for one spec: its hub page and each implementation page."""
+    if not spec.impls:
+        return []
+    spec_id = html.escape(spec.id)
+    lines = [f"  <url><loc>https://anyplot.ai/{spec_id}</loc>{_lastmod(spec.updated)}</url>"]
+    for impl in spec.impls:
+        if not impl.library:
+            continue
+        language_esc = html.escape(impl.library.language)
+        library_id = html.escape(impl.library_id)
+        lines.append(
+            f"  <url><loc>https://anyplot.ai/{spec_id}/{language_esc}/{library_id}</loc>{_lastmod(impl.updated)}</url>"
+        )
+    return lines
+
+
+def _urlset(url_lines: list[str]) -> str:
+    return "\n".join(
+        ['<?xml version="1.0" encoding="UTF-8"?>', f'<urlset xmlns="{_SITEMAP_NS}">', *url_lines, "</urlset>"]
+    )
+
+
 def _build_sitemap_xml(specs: list) -> str:
     """Build sitemap XML string from specs.
 
@@ -40,41 +72,120 @@ def _build_sitemap_xml(specs: list) -> str:
     is served as /{spec_id}?language={language} (filtered hub, same canonical),
     so listing it would create duplicate-content entries for Google.
     """
-    xml_lines = [
-        '<?xml version="1.0" encoding="UTF-8"?>',
-        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
-        "  <url><loc>https://anyplot.ai/</loc></url>",
-        "  <url><loc>https://anyplot.ai/plots</loc></url>",
-        "  <url><loc>https://anyplot.ai/specs</loc></url>",
-        "  <url><loc>https://anyplot.ai/libraries</loc></url>",
-        "  <url><loc>https://anyplot.ai/map</loc></url>",
-        "  <url><loc>https://anyplot.ai/palette</loc></url>",
-        "  <url><loc>https://anyplot.ai/about</loc></url>",
-        "  <url><loc>https://anyplot.ai/mcp</loc></url>",
-        "  <url><loc>https://anyplot.ai/legal</loc></url>",
-        "  <url><loc>https://anyplot.ai/stats</loc></url>",
-    ]
+    lines = [f"  <url><loc>https://anyplot.ai/{page}</loc></url>" for page in _STATIC_PAGES]
+    for spec in specs:
+        lines.extend(_spec_url_lines(spec))
+    return _urlset(lines)
+
+
+_STATIC_SITEMAP = _build_sitemap_xml([])
+
+
+# =============================================================================
+# Sharded sitemap
+# /sitemap.xml is a <sitemapindex> pointing at precompressed shards under
+# /sitemaps/: "static" (top-level pages) plus one "specs-{c}" shard per first
+# character of the spec ID. Each shard keeps a fingerprint of its member specs
+# and is only re-rendered and re-compressed when that fingerprint changes, so
+# an index rebuild after a sync touches just the shards whose specs changed.
+# A shard stays far below the 50,000-URL / 50 MB per-file limit; if one ever
+# grows too large, lengthen the prefix in _shard_name.
+# =============================================================================
+
+
+class PrecompressedPage:
+    """A rendered document stored gzip-compressed, with a strong ETag over its uncompressed bytes."""
+
+    __slots__ = ("gzipped", "etag")
+
+    def __init__(self, content: str) -> None:
+        data = content.encode("utf-8")
+        # mtime=0 keeps the bytes (and so the ETag) stable across re-renders
+        self.gzipped = gzip.compress(data, compresslevel=9, mtime=0)
+        self.etag = f'"{hashlib.sha256(data).hexdigest()}"'
+
+    def body(self) -> bytes:
+        """Uncompressed bytes, for clients that do not accept gzip."""
+        return gzip.decompress(self.gzipped)
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match", "")
+    return etag in if_none_match or if_none_match.strip() == "*"
+
+
+class SitemapShard(PrecompressedPage):
+    """One precompressed sitemap shard served at /sitemaps/{name}.xml.gz."""
+
+    __slots__ = ("name", "fingerprint", "lastmod")
+
+    def __init__(self, name: str, fingerprint: str, xml: str, lastmod: datetime | None = None) -> None:
+        super().__init__(xml)
+        self.name = name
+        self.fingerprint = fingerprint
+        self.lastmod = lastmod
 
+
+def _shard_name(spec_id: str) -> str:
+    return f"specs-{spec_id[0]}"
+
+
+def _shard_fingerprint(specs: list) -> str:
+    """Digest of everything a shard's XML depends on (IDs, languages, update times)."""
+    digest = hashlib.sha256()
     for spec in specs:
-        if not spec.impls:
-            continue
-        spec_id = html.escape(spec.id)
-        xml_lines.append(f"  <url><loc>https://anyplot.ai/{spec_id}</loc>{_lastmod(spec.updated)}</url>")
-        for impl in spec.impls:
-            if not impl.library:
-                continue
-            language_esc = html.escape(impl.library.language)
-            library_id = html.escape(impl.library_id)
-            xml_lines.append(
-                f"  <url><loc>https://anyplot.ai/{spec_id}/{language_esc}/{library_id}</loc>"
-                f"{_lastmod(impl.updated)}</url>"
-            )
+        digest.update(f"{spec.id}|{spec.updated}".encode())
+        for impl in sorted(spec.impls, key=lambda i: i.library_id):
+            language = impl.library.language if impl.library else ""
+            digest.update(f"|{impl.library_id}|{language}|{impl.updated}".encode())
+        digest.update(b"\n")
+    return digest.hexdigest()
 
-    xml_lines.append("</urlset>")
-    return "\n".join(xml_lines)
 
+def _shard_lastmod(specs: list) -> datetime | None:
+    times = [dt for spec in specs for dt in (spec.updated, *(impl.updated for impl in spec.impls)) if dt]
+    return max(times, default=None)
 
-_STATIC_SITEMAP = _build_sitemap_xml([])
+
+_STATIC_SHARD = SitemapShard("static", "", _STATIC_SITEMAP)
+
+# Current shards by name; replaced wholesale by _update_sitemap_shards
+_sitemap_shards: dict[str, SitemapShard] = {_STATIC_SHARD.name: _STATIC_SHARD}
+
+
+def _build_sitemap_index(shards: list[SitemapShard]) -> str:
+    lines = [
+        f"  <sitemap><loc>https://anyplot.ai/sitemaps/{shard.name}.xml.gz</loc>{_lastmod(shard.lastmod)}</sitemap>"
+        for shard in shards
+    ]
+    return "\n".join(
+        ['<?xml version="1.0" encoding="UTF-8"?>', f'<sitemapindex xmlns="{_SITEMAP_NS}">', *lines, "</sitemapindex>"]
+    )
+
+
+def _update_sitemap_shards(specs: list) -> str:
+    """Regenerate the shards whose member specs changed and return the sitemap index XML.
+
+    Unchanged shards (same fingerprint) are reused as-is, shards whose specs
+    all disappeared are dropped.
+    """
+    groups: dict[str, list] = {}
+    for spec in sorted(specs, key=lambda s: s.id):
+        if spec.impls:
+            groups.setdefault(_shard_name(spec.id), []).append(spec)
+
+    shards = {_STATIC_SHARD.name: _STATIC_SHARD}
+    for name, members in groups.items():
+        fingerprint = _shard_fingerprint(members)
+        shard = _sitemap_shards.get(name)
+        if shard is None or shard.fingerprint != fingerprint:
+            xml = _urlset([line for spec in members for line in _spec_url_lines(spec)])
+            shard = SitemapShard(name, fingerprint, xml, _shard_lastmod(members))
+        shards[name] = shard
+
+    _sitemap_shards.clear()
+    _sitemap_shards.update(shards)
+    return _build_sitemap_index(list(shards.values()))
 
 
 async def _refresh_sitemap() -> str:
@@ -82,7 +193,20 @@ async def _refresh_sitemap() -> str:
     async with get_db_context() as db:
         repo = SpecRepository(db)
         specs = await repo.get_all()
-    return _build_sitemap_xml(specs)
+    return _update_sitemap_shards(specs)
+
+
+async def _get_sitemap_index(db: AsyncSession) -> str:
+    """Cached sitemap index; building it (re)populates the shards."""
+
+    async def _fetch() -> str:
+        repo = SpecRepository(db)
+        specs = await repo.get_all()
+        return _update_sitemap_shards(specs)
+
+    return await get_or_set_cache(
+        cache_key("sitemap_xml"), _fetch, refresh_after=settings.cache_refresh_after, refresh_factory=_refresh_sitemap
+    )
 
 
 # Minimal HTML template for social media bots (meta tags are what matters)
@@ -113,6 +237,96 @@ DEFAULT_PLOTS_IMAGE = "https://api.anyplot.ai/og/plots.png"
 DEFAULT_DESCRIPTION = "library-agnostic, ai-powered plotting."
 
 
+# =============================================================================
+# Pre-rendered bot pages
+# Every spec hub and implementation page is rendered once per catalog load
+# (cache fill, e.g. after a sync invalidated the cache) into a BotPageStore of
+# gzip bytes. Crawler waves across thousands of distinct URLs are then served
+# from memory without touching the database, and unknown spec IDs are rejected
+# by a set lookup.
+# =============================================================================
+
+
+def _render_spec_hub(spec) -> str:
+    has_previews = any(i.preview_url for i in spec.impls)
+    image = f"https://api.anyplot.ai/og/{spec.id}.png" if has_previews else DEFAULT_HOME_IMAGE
+    return BOT_HTML_TEMPLATE.format(
+        title=f"{html.escape(spec.title)} | anyplot.ai",
+        description=html.escape(spec.description or DEFAULT_DESCRIPTION),
+        image=html.escape(image, quote=True),
+        url=f"https://anyplot.ai/{html.escape(spec.id)}",
+    )
+
+
+def _render_spec_implementation(
+    spec_id: str, title: str, description: str | None, language: str, library: str, has_preview: bool
+) -> str:
+    image = f"https://api.anyplot.ai/og/{spec_id}/{language}/{library}.png" if has_preview else DEFAULT_HOME_IMAGE
+    return BOT_HTML_TEMPLATE.format(
+        title=f"{html.escape(title)} - {html.escape(library)} | anyplot.ai",
+        description=html.escape(description or DEFAULT_DESCRIPTION),
+        image=html.escape(image, quote=True),
+        url=f"https://anyplot.ai/{html.escape(spec_id)}/{html.escape(language)}/{html.escape(library)}",
+    )
+
+
+class BotPageStore:
+    """Pre-rendered bot pages keyed by path ("scatter-basic", "scatter-basic/python/matplotlib")."""
+
+    __slots__ = ("pages", "specs")
+
+    def __init__(self, specs: list) -> None:
+        self.pages: dict[str, PrecompressedPage] = {}
+        # spec_id -> (title, description): the set of known IDs, plus what an
+        # implementation URL without a stored page needs to be rendered
+        self.specs: dict[str, tuple[str, str | None]] = {}
+        for spec in specs:
+            self.specs[spec.id] = (spec.title, spec.description)
+            self.pages[spec.id] = PrecompressedPage(_render_spec_hub(spec))
+            for impl in spec.impls:
+                if not impl.library:
+                    continue
+                language = impl.library.language
+                self.pages[f"{spec.id}/{language}/{impl.library_id}"] = PrecompressedPage(
+                    _render_spec_implementation(
+                        spec.id, spec.title, spec.description, language, impl.library_id, bool(impl.preview_url)
+                    )
+                )
+
+
+async def _build_bot_pages(specs: list) -> BotPageStore:
+    """Render and gzip every page in a worker thread; on the event loop it would stall every request."""
+    return await asyncio.to_thread(BotPageStore, specs)
+
+
+async def _refresh_bot_pages() -> BotPageStore:
+    """Standalone factory for background bot page refresh (creates own DB session)."""
+    async with get_db_context() as db:
+        specs = await SpecRepository(db).get_all()
+    return await _build_bot_pages(specs)
+
+
+async def _get_bot_pages(db: AsyncSession) -> BotPageStore:
+    async def _fetch() -> BotPageStore:
+        return await _build_bot_pages(await SpecRepository(db).get_all())
+
+    return await get_or_set_cache(
+        cache_key("seo_pages"), _fetch, refresh_after=settings.cache_refresh_after, refresh_factory=_refresh_bot_pages
+    )
+
+
+def _bot_page_response(request: Request, page: PrecompressedPage) -> Response:
+    """Serve a stored page: 304 on a matching If-None-Match, the gzip bytes as-is if accepted."""
+    headers = {"ETag": page.etag, "Vary": "Accept-Encoding"}
+    if _not_modified(request, page.etag):
+        return Response(status_code=304, headers=headers)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        # Content-Encoding set here makes GZipMiddleware pass the bytes through untouched
+        headers["Content-Encoding"] = "gzip"
+        return HTMLResponse(page.gzipped, headers=headers)
+    return HTMLResponse(page.body(), headers=headers)
+
+
 @router.get("/robots.txt")
 async def get_robots():
     """
@@ -127,24 +341,40 @@ async def get_robots():
 @router.get("/sitemap.xml")
 async def get_sitemap(db: AsyncSession | None = Depends(optional_db)):
     """
-    Generate dynamic XML sitemap for SEO.
+    Sitemap index for SEO.
 
-    Includes root, plots/specs pages, and all specs with implementations.
+    Lists the precompressed shards under /sitemaps/. Without a database, serves
+    a plain sitemap of the top-level pages instead.
     """
     if db is None:
         return Response(content=_STATIC_SITEMAP, media_type="application/xml")
 
-    async def _fetch() -> str:
-        repo = SpecRepository(db)
-        specs = await repo.get_all()
-        return _build_sitemap_xml(specs)
-
-    xml = await get_or_set_cache(
-        cache_key("sitemap_xml"), _fetch, refresh_after=settings.cache_refresh_after, refresh_factory=_refresh_sitemap
-    )
+    xml = await _get_sitemap_index(db)
     return Response(content=xml, media_type="application/xml")
 
 
+@router.get("/sitemaps/{name}.xml.gz")
+async def get_sitemap_shard(name: str, request: Request, db: AsyncSession | None = Depends(optional_db)):
+    """
+    One gzip-compressed sitemap shard, with an ETag for conditional requests.
+
+    Served as application/gzip (not Content-Encoding), so GZipMiddleware and
+    proxies leave the stored bytes alone.
+    """
+    if db is not None:
+        # Builds the shards on a cold instance; a cache hit otherwise
+        await _get_sitemap_index(db)
+
+    shard = _sitemap_shards.get(name)
+    if shard is None:
+        raise_not_found("Sitemap", name)
+
+    headers = {"ETag": shard.etag}
+    if _not_modified(request, shard.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=shard.gzipped, media_type="application/gzip", headers=headers)
+
+
 # =============================================================================
 # Bot SEO Proxy Endpoints
 # These endpoints serve HTML with correct meta tags for social media bots.
@@ -295,8 +525,8 @@ async def seo_stats():
 
 
 @router.get("/seo-proxy/{spec_id}")
-async def seo_spec_hub(spec_id: str, db: AsyncSession | None = Depends(optional_db)):
-    """Bot-optimized cross-language spec hub."""
+async def seo_spec_hub(spec_id: str, request: Request, db: AsyncSession | None = Depends(optional_db)):
+    """Bot-optimized cross-language spec hub (pre-rendered, see BotPageStore)."""
     if db is None:
         return HTMLResponse(
             BOT_HTML_TEMPLATE.format(
@@ -307,27 +537,11 @@ async def seo_spec_hub(spec_id: str, db: AsyncSession | None = Depends(optional_
             )
         )
 
-    key = cache_key("seo", spec_id)
-    cached = get_cache(key)
-    if cached:
-        return HTMLResponse(cached)
-
-    repo = SpecRepository(db)
-    spec = await repo.get_by_id(spec_id)
-    if not spec:
+    store = await _get_bot_pages(db)
+    page = store.pages.get(spec_id)
+    if page is None:
         raise HTTPException(status_code=404, detail="Spec not found")
-
-    has_previews = any(i.preview_url for i in spec.impls)
-    image = f"https://api.anyplot.ai/og/{spec_id}.png" if has_previews else DEFAULT_HOME_IMAGE
-
-    result = BOT_HTML_TEMPLATE.format(
-        title=f"{html.escape(spec.title)} | anyplot.ai",
-        description=html.escape(spec.description or DEFAULT_DESCRIPTION),
-        image=html.escape(image, quote=True),
-        url=f"https://anyplot.ai/{html.escape(spec_id)}",
-    )
-    set_cache(key, result)
-    return HTMLResponse(result)
+    return _bot_page_response(request, page)
 
 
 @router.get("/seo-proxy/{spec_id}/{language}")
@@ -360,9 +574,9 @@ async def seo_spec_language(spec_id: str, language: str):
 
 @router.get("/seo-proxy/{spec_id}/{language}/{library}")
 async def seo_spec_implementation(
-    spec_id: str, language: str, library: str, db: AsyncSession | None = Depends(optional_db)
+    spec_id: str, language: str, library: str, request: Request, db: AsyncSession | None = Depends(optional_db)
 ):
-    """Bot-optimized implementation detail."""
+    """Bot-optimized implementation detail (pre-rendered, see BotPageStore)."""
     if db is None:
         return HTMLResponse(
             BOT_HTML_TEMPLATE.format(
@@ -373,30 +587,14 @@ async def seo_spec_implementation(
             )
         )
 
-    key = cache_key("seo", spec_id, language, library)
-    cached = get_cache(key)
-    if cached:
-        return HTMLResponse(cached)
-
-    repo = SpecRepository(db)
-    spec = await repo.get_by_id(spec_id)
-    if not spec:
+    store = await _get_bot_pages(db)
+    spec = store.specs.get(spec_id)
+    if spec is None:
         raise HTTPException(status_code=404, detail="Spec not found")
 
-    impl = next(
-        (i for i in spec.impls if i.library_id == library and i.library and i.library.language == language), None
-    )
-    image = (
-        f"https://api.anyplot.ai/og/{spec_id}/{language}/{library}.png"
-        if impl and impl.preview_url
-        else DEFAULT_HOME_IMAGE
-    )
-
-    result = BOT_HTML_TEMPLATE.format(
-        title=f"{html.escape(spec.title)} - {html.escape(library)} | anyplot.ai",
-        description=html.escape(spec.description or DEFAULT_DESCRIPTION),
-        image=html.escape(image, quote=True),
-        url=f"https://anyplot.ai/{html.escape(spec_id)}/{html.escape(language)}/{html.escape(library)}",
-    )
-    set_cache(key, result)
-    return HTMLResponse(result)
+    page = store.pages.get(f"{spec_id}/{language}/{library}")
+    if page is None:
+        # Known spec, no such implementation: same page with the default image
+        title, description = spec
+        return HTMLResponse(_render_spec_implementation(spec_id, title, description, language, library, False))
+    return _bot_page_response(request, page)
@@ -1,24 +1,32 @@
 """Spec endpoints."""
 
-from fastapi import APIRouter, Depends
+import asyncio
+import logging
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.cache import cache_key, get_or_set_cache
+from api.cache import cache_age, cache_key, get_cache, get_or_set_cache, set_cache
 from api.dependencies import require_db
-from api.exceptions import raise_not_found
-from api.schemas import ImplementationResponse, SpecDetailResponse, SpecListItem, SpecMapItem
+from api.exceptions import raise_not_found, raise_validation_error
+from api.schemas import ImplementationResponse, SpecBatchResponse, SpecDetailResponse, SpecListItem, SpecMapItem
+from core.code_store import CodeBlob, CodeStore
 from core.config import settings
-from core.database import ImplRepository, SpecRepository
+from core.database import ImplRepository, Spec, SpecRepository
 from core.database.connection import get_db_context
-from core.utils import strip_noqa_comments
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(tags=["specs"])
 
+# Upper bound for /specs/batch — roughly two screens of gallery cards
+MAX_BATCH_SPECS = 50
 
-async def _build_specs_list(db: AsyncSession) -> list[SpecListItem]:
-    repo = SpecRepository(db)
-    specs = await repo.get_all()
+
+def _specs_list_items(specs: list) -> list[SpecListItem]:
+    """GET /specs items (also built from the catalog snapshot, see api/snapshot.py)."""
     return [
         SpecListItem(
             id=spec.id, title=spec.title, description=spec.description, tags=spec.tags, library_count=len(spec.impls)
@@ -28,6 +36,11 @@ async def _build_specs_list(db: AsyncSession) -> list[SpecListItem]:
     ]
 
 
+async def _build_specs_list(db: AsyncSession) -> list[SpecListItem]:
+    repo = SpecRepository(db)
+    return _specs_list_items(await repo.get_all())
+
+
 async def _build_specs_map(db: AsyncSession) -> list[SpecMapItem]:
     """One row per spec with its best-rated impl image + spec/impl tag bag for the /map page.
 
@@ -71,6 +84,11 @@ async def _build_spec_detail(db: AsyncSession, spec_id: str) -> SpecDetailRespon
     if not spec.impls:
         raise_not_found("Spec with implementations", spec_id)
 
+    return _spec_detail(spec)
+
+
+def _spec_detail(spec: Spec) -> SpecDetailResponse:
+    """Convert a Spec loaded by get_by_id/get_by_ids into its detail response."""
     impls = [
         ImplementationResponse(
             library_id=impl.library_id,
@@ -116,14 +134,50 @@ async def _build_spec_detail(db: AsyncSession, spec_id: str) -> SpecDetailRespon
     )
 
 
-async def _build_impl_code(db: AsyncSession, spec_id: str, library: str) -> dict:
+async def _get_code_store() -> CodeStore | None:
+    """The sync job's code blob store (manifest cached; blobs read on demand), or None if not configured.
+
+    The store is usually a mounted bucket, so the manifest and blobs are read in a worker thread.
+    """
+    if not settings.code_store_dir:
+        return None
+
+    async def _load() -> CodeStore:
+        try:
+            return await asyncio.to_thread(CodeStore.load, Path(settings.code_store_dir))
+        except (OSError, ValueError):
+            logger.warning("Failed to load code store from %s, using DB", settings.code_store_dir, exc_info=True)
+            return CodeStore(Path(settings.code_store_dir))
+
+    return await get_or_set_cache(cache_key("code_store"), _load)
+
+
+async def _build_impl_code(db: AsyncSession, spec_id: str, library: str) -> CodeBlob:
+    store = await _get_code_store()
+    blob = await asyncio.to_thread(store.get, spec_id, library) if store else None
+    if blob is not None:
+        return blob
+
     repo = ImplRepository(db)
     impl = await repo.get_code(spec_id, library)
 
     if not impl or not impl.code:
         raise_not_found("Implementation code", f"{spec_id}/{library}")
 
-    return {"spec_id": spec_id, "library": library, "code": strip_noqa_comments(impl.code)}
+    return CodeBlob.from_code(spec_id, library, impl.code)
+
+
+def _code_response(request: Request, blob: CodeBlob) -> Response:
+    """Serve a code blob: 304 on a matching If-None-Match, the stored gzip bytes if accepted."""
+    headers = {"ETag": blob.etag, "Vary": "Accept-Encoding"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if blob.etag in if_none_match or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        # Content-Encoding set here makes GZipMiddleware pass the bytes through untouched
+        headers["Content-Encoding"] = "gzip"
+        return Response(blob.gzipped, media_type="application/json", headers=headers)
+    return Response(blob.body(), media_type="application/json", headers=headers)
 
 
 async def _build_spec_images(db: AsyncSession, spec_id: str) -> dict:
@@ -178,6 +232,48 @@ async def get_specs_map(db: AsyncSession = Depends(require_db)):
     )
 
 
+@router.get("/specs/batch", response_model=SpecBatchResponse)
+async def get_specs_batch(
+    ids: str = Query(..., min_length=1, description="Comma-separated spec IDs"), db: AsyncSession = Depends(require_db)
+):
+    """Get the details of several specs at once (same items as /specs/{spec_id}).
+
+    Shares the per-spec cache entries with /specs/{spec_id}: cached specs are
+    served from the cache and all misses (or stale entries) are loaded in a
+    single query, then cached individually. Unknown specs and specs without
+    implementations are listed in `missing`.
+
+    NOTE: must stay declared before /specs/{spec_id} so the path-parameter route doesn't capture "batch".
+    """
+    spec_ids = list(dict.fromkeys(spec_id.strip() for spec_id in ids.split(",") if spec_id.strip()))
+    if not spec_ids:
+        raise_validation_error("ids must contain at least one spec ID")
+    if len(spec_ids) > MAX_BATCH_SPECS:
+        raise_validation_error(f"at most {MAX_BATCH_SPECS} spec IDs per request, got {len(spec_ids)}")
+
+    details: dict[str, SpecDetailResponse] = {}
+    to_load: list[str] = []
+    for spec_id in spec_ids:
+        key = cache_key("spec", spec_id)
+        cached = get_cache(key)
+        age = cache_age(key)
+        if cached is not None and age is not None and age <= settings.cache_refresh_after:
+            details[spec_id] = cached
+        else:
+            to_load.append(spec_id)
+
+    if to_load:
+        for spec in await SpecRepository(db).get_by_ids(to_load):
+            if spec.impls:
+                details[spec.id] = _spec_detail(spec)
+                set_cache(cache_key("spec", spec.id), details[spec.id])
+
+    return SpecBatchResponse(
+        specs=[details[spec_id] for spec_id in spec_ids if spec_id in details],
+        missing=[spec_id for spec_id in spec_ids if spec_id not in details],
+    )
+
+
 @router.get("/specs/{spec_id}", response_model=SpecDetailResponse)
 async def get_spec(spec_id: str, db: AsyncSession = Depends(require_db)):
     """Get detailed spec information including all implementations."""
@@ -195,22 +291,27 @@ async def get_spec(spec_id: str, db: AsyncSession = Depends(require_db)):
 
 
 @router.get("/specs/{spec_id}/{library}/code")
-async def get_impl_code(spec_id: str, library: str, db: AsyncSession = Depends(require_db)):
-    """Get implementation code for a specific spec + library (code field deferred in main query)."""
+async def get_impl_code(spec_id: str, library: str, request: Request, db: AsyncSession = Depends(require_db)):
+    """Get implementation code for a specific spec + library (code field deferred in main query).
 
-    async def _fetch() -> dict:
+    Served from the code blob store when available, as precompressed gzip with a
+    content-hash ETag; revalidation with If-None-Match returns 304.
+    """
+
+    async def _fetch() -> CodeBlob:
         return await _build_impl_code(db, spec_id, library)
 
-    async def _refresh() -> dict:
+    async def _refresh() -> CodeBlob:
         async with get_db_context() as fresh_db:
             return await _build_impl_code(fresh_db, spec_id, library)
 
-    return await get_or_set_cache(
+    blob = await get_or_set_cache(
         cache_key("impl_code", spec_id, library),
         _fetch,
         refresh_after=settings.cache_refresh_after,
         refresh_factory=_refresh,
     )
+    return _code_response(request, blob)
 
 
 @router.get("/specs/{spec_id}/images")
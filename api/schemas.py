@@ -59,6 +59,13 @@ class SpecDetailResponse(BaseModel):
     implementations: list[ImplementationResponse] = []
 
 
+class SpecBatchResponse(BaseModel):
+    """Response for /specs/batch: found specs in request order plus the IDs that were not found."""
+
+    specs: list[SpecDetailResponse] = []
+    missing: list[str] = []
+
+
 class SpecListItem(BaseModel):
     """Spec list item with summary info."""
 
@@ -85,6 +92,40 @@ class SpecMapItem(BaseModel):
     impl_tags: dict[str, list[str]] | None = None
 
 
+class SpecSearchHit(BaseModel):
+    """A single spec search result."""
+
+    id: str
+    title: str
+    description: str | None = None
+    score: float
+
+
+class SpecSearchResponse(BaseModel):
+    """Response for the spec search endpoint."""
+
+    query: str
+    total: int
+    results: list[SpecSearchHit]
+
+
+class CodeSearchHit(BaseModel):
+    """A single implementation code search result."""
+
+    spec_id: str
+    library: str
+    score: float
+    snippet: str  # HTML-escaped code excerpt, matches wrapped in <mark>
+
+
+class CodeSearchResponse(BaseModel):
+    """Response for the code search endpoint."""
+
+    query: str
+    total: int
+    results: list[CodeSearchHit]
+
+
 class ImageResponse(BaseModel):
     """Image/plot response for grid display."""
 
@@ -120,16 +161,20 @@ class FilterCountsResponse(BaseModel):
 
 
 class FilteredPlotsResponse(BaseModel):
-    """Response for filtered plots endpoint."""
+    """Response for filtered plots endpoint.
+
+    The section fields are optional because `fields=` can leave them out of the response.
+    """
 
     total: int
-    images: list[dict[str, Any]]  # Image dicts with spec_id, library, url, etc.
-    counts: dict[str, dict[str, int]]  # Category -> value -> count
-    globalCounts: dict[str, dict[str, int]]  # Same structure for global counts
-    orCounts: list[dict[str, int]]  # Per-group OR counts
-    specTitles: dict[str, str] = {}  # Mapping spec_id -> title for search/tooltips
+    images: list[dict[str, Any]] | None = None  # Image dicts with spec_id, library, url, etc.
+    counts: dict[str, dict[str, int]] | None = None  # Category -> value -> count
+    globalCounts: dict[str, dict[str, int]] | None = None  # Same structure for global counts
+    orCounts: list[dict[str, int]] | None = None  # Per-group OR counts
+    specTitles: dict[str, str] | None = {}  # Mapping spec_id -> title for search/tooltips
     offset: int = 0
     limit: int | None = None
+    nextCursor: str | None = None  # Opaque cursor for the next page (null on the last page or without limit)
 
 
 class LibraryInfo(BaseModel):
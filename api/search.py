@@ -0,0 +1,205 @@
+"""
+Search index access for anyplot API.
+
+Resolves the in-process search indexes (core.search): the spec index shared
+by the /search router and the MCP `search_specs` tool, and the code index
+behind /search/code. Prefers the indexes persisted by the sync job (instant,
+no DB); falls back to building them from the database. Either way they live
+in the response cache; stale-while-revalidate refreshes reload the persisted
+file (republished by every sync) and rebuild from the database only when it
+is missing. Loading and building run in a worker thread so a cold fill never
+blocks the event loop.
+
+Queries never load the code column wholesale: the code index holds only
+postings, and snippets are cut from code fetched for the returned hits.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from functools import partial
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.cache import cache_key, get_or_set_cache
+from core.config import settings
+from core.database import ImplRepository, SpecRepository
+from core.database.connection import get_db_context
+from core.search import SearchIndex, build_code_index, build_spec_index, flatten_tags, highlight_snippet
+
+
+logger = logging.getLogger(__name__)
+
+# Opens a session on a specific pool (e.g. the MCP pool); the caller closes it
+SessionOpener = Callable[[], Awaitable[AsyncSession]]
+
+SPEC_INDEX_FILE = "specs.json"
+CODE_INDEX_FILE = "code.json"
+
+
+async def _load_persisted_index(filename: str, tokenizer: str = "text") -> SearchIndex | None:
+    """Load an index written by the sync job, or None if unavailable or built with another tokenizer."""
+    if not settings.search_index_dir:
+        return None
+    path = Path(settings.search_index_dir) / filename
+    try:
+        index = await asyncio.to_thread(SearchIndex.load, path)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError):
+        logger.warning("Failed to load persisted search index %s, rebuilding from DB", path, exc_info=True)
+        return None
+    if index.tokenizer != tokenizer:
+        logger.info("Persisted search index %s predates the %r tokenizer, rebuilding from DB", path, tokenizer)
+        return None
+    return index
+
+
+async def _build_spec_index_from_db(db: AsyncSession) -> SearchIndex:
+    """Index every spec that has at least one implementation (mirrors /specs)."""
+    specs = await SpecRepository(db).get_all()
+    return await asyncio.to_thread(
+        build_spec_index,
+        [
+            {
+                "id": spec.id,
+                "title": spec.title,
+                "description": spec.description,
+                "applications": spec.applications,
+                "data": spec.data,
+                "notes": spec.notes,
+                "tags": spec.tags,
+            }
+            for spec in specs
+            if spec.impls
+        ],
+    )
+
+
+async def _refresh_spec_index(open_session: SessionOpener | None = None) -> SearchIndex:
+    """Standalone factory for fills and background refresh: persisted file first, then the DB.
+
+    The DB build uses its own session, from *open_session* if given.
+    """
+    index = await _load_persisted_index(SPEC_INDEX_FILE)
+    if index is not None:
+        return index
+    if open_session is None:
+        async with get_db_context() as db:
+            return await _build_spec_index_from_db(db)
+    db = await open_session()
+    try:
+        return await _build_spec_index_from_db(db)
+    finally:
+        await db.close()
+
+
+async def get_spec_index(db: AsyncSession | None = None, open_session: SessionOpener | None = None) -> SearchIndex:
+    """Get the spec search index (cached; persisted file first, then DB).
+
+    Without *db*, a session is opened only if the index has to be built, from
+    *open_session* when given (the MCP server passes its own pool) and from the
+    API pool otherwise. Background refreshes use the same source.
+    """
+    refresh = partial(_refresh_spec_index, open_session)
+
+    async def _fetch() -> SearchIndex:
+        if db is None:
+            return await refresh()
+        index = await _load_persisted_index(SPEC_INDEX_FILE)
+        return index if index is not None else await _build_spec_index_from_db(db)
+
+    return await get_or_set_cache(
+        cache_key("search", "specs"), _fetch, refresh_after=settings.cache_refresh_after, refresh_factory=refresh
+    )
+
+
+def spec_search_hits(index: SearchIndex, query: str, limit: int) -> list[dict]:
+    """Run *query* against the spec index and return hit dicts (id, title, description, score)."""
+    return [
+        {"id": doc_id, **index.meta.get(doc_id, {}), "score": round(score, 4)}
+        for doc_id, score in index.search(query, limit=limit)
+    ]
+
+
+async def _build_code_index_from_db(db: AsyncSession) -> SearchIndex:
+    """Index the code of every implementation, tagged with its spec and impl tag values."""
+    specs = await SpecRepository(db).get_all()
+    impl_tags = {
+        (spec.id, impl.library_id): flatten_tags(spec.tags, impl.impl_tags) for spec in specs for impl in spec.impls
+    }
+    documents = await ImplRepository(db).get_code_documents()
+    return await asyncio.to_thread(
+        build_code_index,
+        [
+            {"spec_id": spec_id, "library_id": library_id, "code": code, "tags": impl_tags.get((spec_id, library_id))}
+            for spec_id, library_id, code in documents
+        ],
+    )
+
+
+async def _refresh_code_index() -> SearchIndex:
+    """Standalone factory for background refresh: persisted file first, then the DB (own session)."""
+    index = await _load_persisted_index(CODE_INDEX_FILE, tokenizer="code")
+    if index is not None:
+        return index
+    async with get_db_context() as db:
+        return await _build_code_index_from_db(db)
+
+
+async def get_code_index(db: AsyncSession) -> SearchIndex:
+    """Get the implementation code search index (cached; persisted file first, then DB)."""
+
+    async def _fetch() -> SearchIndex:
+        index = await _load_persisted_index(CODE_INDEX_FILE, tokenizer="code")
+        return index if index is not None else await _build_code_index_from_db(db)
+
+    return await get_or_set_cache(
+        cache_key("search", "code"),
+        _fetch,
+        refresh_after=settings.cache_refresh_after,
+        refresh_factory=_refresh_code_index,
+    )
+
+
+async def code_search_hits(
+    db: AsyncSession,
+    index: SearchIndex,
+    query: str,
+    limit: int,
+    library: str | None = None,
+    tags: list[str] | None = None,
+) -> list[dict]:
+    """Run *query* against the code index and return hit dicts with highlighted snippets.
+
+    Args:
+        db: Database session, used to fetch code for the returned hits only
+        index: Code index from get_code_index
+        query: Free-text query, e.g. "twinx" or "go.Sankey"
+        limit: Maximum number of hits
+        library: Only return implementations of this library
+        tags: Only return implementations carrying all of these tag values
+
+    Returns:
+        List of dicts (spec_id, library, score, snippet), best first
+    """
+    required = set(tags or [])
+
+    def _matches(meta: dict) -> bool:
+        if library and meta.get("library") != library:
+            return False
+        return required.issubset(meta.get("tags", ()))
+
+    hits = index.search(query, limit=limit, where=_matches if library or required else None)
+    keys = [(index.meta[doc_id]["spec_id"], index.meta[doc_id]["library"]) for doc_id, _ in hits]
+    codes = await ImplRepository(db).get_codes(keys)
+    return [
+        {
+            "spec_id": spec_id,
+            "library": library_id,
+            "score": round(score, 4),
+            "snippet": highlight_snippet(codes.get((spec_id, library_id), ""), query),
+        }
+        for (spec_id, library_id), (_, score) in zip(keys, hits, strict=True)
+    ]
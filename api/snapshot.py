@@ -0,0 +1,81 @@
+"""
+Catalog snapshot warm-up for new API instances.
+
+Without it, every new instance starts with an empty response cache. Its first
+/specs and /plots/filter requests then load the whole catalog from Postgres,
+so a scale-out burst turns into a burst of full-table reads. With
+CATALOG_SNAPSHOT_PATH set, the lifespan loads the snapshot written by the sync
+job (core.snapshot) and fills the cache entries behind /specs, /plots/filter
+and /libraries from it before the first request.
+
+A background task then compares the snapshot's fingerprint with the database
+in a single aggregate query. If the catalog has changed since the snapshot was
+taken, the response cache is cleared: everything cached so far may derive from
+the stale snapshot. Entries are then rebuilt from the database on their next
+request. If the database cannot be reached, the instance keeps serving the
+snapshot until the entries expire.
+"""
+
+import asyncio
+import logging
+from pathlib import Path
+
+from api.cache import cache_key, clear_cache, set_cache
+from api.routers.libraries import _libraries_payload
+from api.routers.plots import _build_filter_catalog
+from api.routers.specs import _specs_list_items
+from core.config import settings
+from core.database.connection import get_db_context
+from core.snapshot import CatalogSnapshot, fingerprint, fingerprint_query
+
+
+logger = logging.getLogger(__name__)
+
+
+def warm_cache(snapshot: CatalogSnapshot) -> None:
+    """Fill the catalog-wide cache entries from *snapshot*, as their DB factories would."""
+    set_cache(cache_key("specs_list"), _specs_list_items(snapshot.specs))
+    set_cache("filter:catalog", _build_filter_catalog(snapshot.specs))
+    set_cache(cache_key("libraries"), _libraries_payload(snapshot.libraries))
+
+
+async def load_catalog_snapshot() -> CatalogSnapshot | None:
+    """Load the configured snapshot and warm the cache from it; None when unset or unreadable."""
+    if not settings.catalog_snapshot_path:
+        return None
+    path = Path(settings.catalog_snapshot_path)
+    try:
+        snapshot = await asyncio.to_thread(CatalogSnapshot.load, path)
+    except FileNotFoundError:
+        logger.info("No catalog snapshot at %s, building the catalog from the database", path)
+        return None
+    except Exception:  # any unreadable snapshot: the database is the fallback, never a failed boot
+        logger.warning(
+            "Failed to load catalog snapshot %s, building the catalog from the database", path, exc_info=True
+        )
+        return None
+    warm_cache(snapshot)
+    logger.info(
+        "Serving catalog snapshot from %s (%d specs)",
+        snapshot.created.isoformat(timespec="seconds"),
+        len(snapshot.specs),
+    )
+    return snapshot
+
+
+async def verify_catalog_snapshot(snapshot: CatalogSnapshot) -> bool:
+    """Compare *snapshot* with the database; clears the cache and returns False if it is stale."""
+    try:
+        async with get_db_context() as db:
+            current = fingerprint((await db.execute(fingerprint_query())).one())
+    except Exception:
+        logger.warning("Could not verify the catalog snapshot, keeping it until the cache expires", exc_info=True)
+        return True
+    if current == snapshot.fingerprint:
+        logger.info("Catalog snapshot is current")
+        return True
+    logger.info(
+        "Catalog snapshot is stale (snapshot %s, database %s), clearing the cache", snapshot.fingerprint, current
+    )
+    clear_cache()
+    return False
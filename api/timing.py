@@ -0,0 +1,156 @@
+"""
+Request stage timing: Server-Timing header and rolling per-route percentiles.
+
+ServerTimingMiddleware opens a core.timing dict for each request. The stages
+filled in along the way (cache lookups in api.cache, SQL and ORM time from the
+instrumented engines and RoutingSession, compression in TimedGZipMiddleware)
+are sent back as
+
+    Server-Timing: cache;dur=0.02, db;dur=3.41, orm;dur=1.18, app;dur=2.07, gzip;dur=0.35, total;dur=7.03
+
+``app`` is whatever no other stage covers: dependency resolution, the
+router's Python transforms, Pydantic serialization and middleware. Every
+finished request also feeds RollingTimings, served by GET /debug/timings.
+Recording costs a few dict operations per request, so it stays on in
+production (SERVER_TIMING_ENABLED).
+"""
+
+import math
+import time
+from collections import deque
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core import timing
+from core.config import settings
+
+
+STAGES = ("cache", "db", "orm", "app", "gzip", "total")
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending, non-empty list."""
+    return ordered[min(len(ordered) - 1, max(math.ceil(q / 100 * len(ordered)) - 1, 0))]
+
+
+class RollingTimings:
+    """Last *window* samples per route and stage; percentiles are computed on read."""
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self._samples: dict[str, dict[str, deque[float]]] = {}
+        self._counts: dict[str, int] = {}
+
+    def record(self, route: str, stages: dict[str, float]) -> None:
+        per_stage = self._samples.get(route)
+        if per_stage is None:
+            per_stage = self._samples[route] = {stage: deque(maxlen=self.window) for stage in STAGES}
+        self._counts[route] = self._counts.get(route, 0) + 1
+        for stage in STAGES:
+            per_stage[stage].append(stages.get(stage, 0.0))
+
+    def snapshot(self) -> dict[str, dict]:
+        """Per route: total request count and p50/p95/p99/max (ms) of each stage over the window.
+
+        Example:
+            >>> rolling_timings.snapshot()
+            {"GET /specs/{spec_id}": {"count": 812, "stages": {"db": {"p50": 1.2, "p95": 4.8, ...}, ...}}}
+        """
+        result = {}
+        for route, per_stage in self._samples.items():
+            stages = {}
+            for stage, samples in per_stage.items():
+                ordered = sorted(samples)
+                stages[stage] = {f"p{q}": round(_percentile(ordered, q), 2) for q in (50, 95, 99)}
+                stages[stage]["max"] = round(ordered[-1], 2)
+            result[route] = {"count": self._counts[route], "stages": stages}
+        return result
+
+    def clear(self) -> None:
+        self._samples.clear()
+        self._counts.clear()
+
+
+rolling_timings = RollingTimings(settings.server_timing_window)
+
+
+def request_stages(timings: dict[str, float], total_ms: float) -> dict[str, float]:
+    """Derive the reported stages from the raw core.timing dict of one request."""
+    db = timings.get("db", 0.0)
+    query = timings.get("query", 0.0)
+    cache = timings.get("cache", 0.0)
+    gzip = timings.get("gzip", 0.0)
+    # SQL issued outside an ORM session (e.g. connection.execute) has no "query" around it
+    accounted = cache + max(query, db) + gzip
+    return {
+        "cache": cache,
+        "db": db,
+        "orm": max(query - db, 0.0),
+        "app": max(total_ms - accounted, 0.0),
+        "gzip": gzip,
+        "total": total_ms,
+    }
+
+
+def format_server_timing(stages: dict[str, float]) -> str:
+    return ", ".join(f"{stage};dur={stages[stage]:.2f}" for stage in STAGES if stage in stages)
+
+
+def _route_label(scope: Scope) -> str:
+    """Route template (not the raw path) so IDs do not explode the number of series."""
+    path = getattr(scope.get("route"), "path", None)
+    return f"{scope['method']} {path}" if path else "unmatched"
+
+
+class ServerTimingMiddleware:
+    """Time every HTTP request; add a Server-Timing header and record rolling percentiles."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        token = timing.begin()
+        timings = timing.current()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                stages = request_stages(timings, (time.perf_counter() - start) * 1000)
+                MutableHeaders(scope=message).append("Server-Timing", format_server_timing(stages))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            # Recorded after the body, so streamed responses count their full duration
+            rolling_timings.record(_route_label(scope), request_stages(timings, (time.perf_counter() - start) * 1000))
+            timing.end(token)
+
+
+class _TimedGZipResponder(GZipResponder):
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        with timing.span("gzip"):
+            return await super().apply_compression(body, more_body=more_body)
+
+
+class TimedGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that records compression time as the ``gzip`` request stage."""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = _TimedGZipResponder(
+                self.app,
+                self.minimum_size,
+                compresslevel=self.compresslevel,
+                thread_minimum_size=self.thread_minimum_size,
+                exclude_content_types=self.exclude_content_types,
+            )
+            await responder(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -193,7 +193,7 @@ export function SpecTabs({
   useEffect(() => {
     if (cachedTagCounts) return;
     const controller = new AbortController();
-    fetch(`${API_URL}/plots/filter?limit=1`, { signal: controller.signal })
+    fetch(`${API_URL}/plots/filter?fields=globalCounts`, { signal: controller.signal })
       .then(r => r.ok ? r.json() : null)
       .then(data => {
         if (data?.globalCounts) {
@@ -34,13 +34,17 @@ load_dotenv()
 
 from itertools import islice  # noqa: E402
 
-from sqlalchemy import delete, select, tuple_  # noqa: E402
+from sqlalchemy import delete, func, select, tuple_  # noqa: E402
 from sqlalchemy.dialects.postgresql import insert  # noqa: E402
-from sqlalchemy.orm import Session  # noqa: E402
+from sqlalchemy.orm import Session, selectinload  # noqa: E402
 
+from core.code_store import CodeStore, update_code_store  # noqa: E402
+from core.config import settings  # noqa: E402
 from core.constants import LANGUAGE_FILE_EXTENSIONS  # noqa: E402
 from core.database import LANGUAGES_SEED, LIBRARIES_SEED, Impl, Language, Library, Spec  # noqa: E402
 from core.database.connection import close_db_sync, get_db_context_sync, init_db_sync, is_db_configured  # noqa: E402
+from core.search import SearchIndex, build_spec_index, flatten_tags, update_code_index  # noqa: E402
+from core.snapshot import CatalogSnapshot, fingerprint, fingerprint_query  # noqa: E402
 
 
 # Configuration
@@ -482,7 +486,8 @@ def sync_to_database(session: Session, plots: list[dict]) -> dict:
     for chunk in _chunked(all_spec_values, _BATCH_CHUNK_SIZE):
         stmt = insert(Spec).values(chunk)
         stmt = stmt.on_conflict_do_update(
-            index_elements=["id"], set_={field: stmt.excluded[field] for field in spec_update_fields}
+            index_elements=["id"],
+            set_={**{field: stmt.excluded[field] for field in spec_update_fields}, "updated_at": func.now()},
         )
         session.execute(stmt)
     stats["specs_synced"] = len(all_spec_values)
@@ -491,7 +496,8 @@ def sync_to_database(session: Session, plots: list[dict]) -> dict:
     for chunk in _chunked(all_impl_values, _BATCH_CHUNK_SIZE):
         stmt = insert(Impl).values(chunk)
         stmt = stmt.on_conflict_do_update(
-            constraint="uq_impl", set_={field: stmt.excluded[field] for field in _IMPL_UPDATE_FIELDS}
+            constraint="uq_impl",
+            set_={**{field: stmt.excluded[field] for field in _IMPL_UPDATE_FIELDS}, "updated_at": func.now()},
         )
         session.execute(stmt)
     stats["impls_synced"] = len(all_impl_values)
@@ -518,6 +524,114 @@ def sync_to_database(session: Session, plots: list[dict]) -> dict:
     return stats
 
 
+def write_search_index(plots: list[dict], index_dir: Path) -> int:
+    """
+    Build the spec search index from scanned plots and persist it for the API.
+
+    Only specs with at least one implementation are indexed (mirrors /specs).
+
+    Args:
+        plots: List of plot data dictionaries (from scan_plot_directory)
+        index_dir: Directory to write specs.json into
+
+    Returns:
+        Number of indexed specs
+    """
+    index = build_spec_index([plot["spec"] for plot in plots if plot["implementations"]])
+    index.save(index_dir / "specs.json")
+    return len(index)
+
+
+def write_code_index(plots: list[dict], index_dir: Path) -> dict:
+    """
+    Incrementally update the persisted implementation code index.
+
+    Loads the existing code.json (if any) and re-tokenizes only implementations
+    whose code hash changed, so a routine sync touching a few plots stays cheap.
+
+    Args:
+        plots: List of plot data dictionaries (from scan_plot_directory)
+        index_dir: Directory holding code.json
+
+    Returns:
+        Dict with added/updated/unchanged/removed counts
+    """
+    path = index_dir / "code.json"
+    index = SearchIndex(tokenizer="code")
+    if path.exists():
+        try:
+            existing = SearchIndex.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not load existing code index ({e}), rebuilding from scratch")
+        else:
+            if existing.tokenizer == "code":
+                index = existing
+            else:
+                logger.info(f"Existing code index uses the {existing.tokenizer!r} tokenizer, rebuilding from scratch")
+
+    impls = [
+        {
+            "spec_id": impl["spec_id"],
+            "library_id": impl["library_id"],
+            "code": impl["code"],
+            "tags": flatten_tags(plot["spec"].get("tags"), impl.get("impl_tags")),
+        }
+        for plot in plots
+        for impl in plot["implementations"]
+    ]
+    stats = update_code_index(index, impls)
+    index.save(path)
+    return stats
+
+
+def write_code_store(plots: list[dict], store_dir: Path) -> dict:
+    """
+    Incrementally update the implementation code blob store served by the API.
+
+    Only implementations whose stripped code changed get a new blob; the
+    manifest is swapped atomically before unreferenced blobs are pruned.
+
+    Args:
+        plots: List of plot data dictionaries (from scan_plot_directory)
+        store_dir: Root directory of the code store
+
+    Returns:
+        Dict with added/updated/unchanged/removed counts
+    """
+    try:
+        store = CodeStore.load(store_dir)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not load existing code store manifest ({e}), rebuilding from scratch")
+        store = CodeStore(store_dir)
+
+    stats = update_code_store(store, [impl for plot in plots for impl in plot["implementations"]])
+    store.save()
+    store.prune()
+    return stats
+
+
+def write_catalog_snapshot(session: Session, path: Path) -> int:
+    """
+    Write the catalog snapshot the API warms its cache from at startup.
+
+    Reads the synced catalog back (as SpecRepository.get_all() and
+    LibraryRepository.get_all() do) together with its fingerprint, so API
+    instances can tell whether the snapshot still matches the database.
+
+    Args:
+        session: Session on the database that was just synced
+        path: Snapshot file to write (replaced atomically)
+
+    Returns:
+        Number of specs in the snapshot
+    """
+    specs = session.scalars(select(Spec).options(selectinload(Spec.impls).selectinload(Impl.library))).all()
+    libraries = session.scalars(select(Library).order_by(Library.name)).all()
+    current = fingerprint(session.execute(fingerprint_query()).one())
+    CatalogSnapshot.from_orm(specs, libraries, current).save(path)
+    return len(specs)
+
+
 def main() -> int:
     """Main entry point for the sync script."""
     if not is_db_configured():
@@ -555,6 +669,25 @@ def main() -> int:
         logger.info("Sync completed successfully!")
         logger.info(f"  Specs synced: {stats['specs_synced']}, removed: {stats['specs_removed']}")
         logger.info(f"  Implementations synced: {stats['impls_synced']}, removed: {stats['impls_removed']}")
+
+        if settings.search_index_dir:
+            indexed = write_search_index(plots, Path(settings.search_index_dir))
+            logger.info(f"  Search index written: {indexed} specs -> {settings.search_index_dir}")
+            code_stats = write_code_index(plots, Path(settings.search_index_dir))
+            logger.info(
+                f"  Code index: {code_stats['added']} added, {code_stats['updated']} updated, "
+                f"{code_stats['removed']} removed, {code_stats['unchanged']} unchanged"
+            )
+        if settings.code_store_dir:
+            store_stats = write_code_store(plots, Path(settings.code_store_dir))
+            logger.info(
+                f"  Code store: {store_stats['added']} added, {store_stats['updated']} updated, "
+                f"{store_stats['removed']} removed, {store_stats['unchanged']} unchanged"
+            )
+        if settings.catalog_snapshot_path:
+            with get_db_context_sync() as session:
+                snapshot_specs = write_catalog_snapshot(session, Path(settings.catalog_snapshot_path))
+            logger.info(f"  Catalog snapshot written: {snapshot_specs} specs -> {settings.catalog_snapshot_path}")
         return 0
 
     except Exception as e:
@@ -0,0 +1,151 @@
+"""
+Content-addressed store for implementation source code.
+
+Holds the ready-to-serve /specs/{spec_id}/{library}/code payload of every
+implementation (noqa comments already stripped) as a gzip blob named after
+the SHA-256 of the uncompressed JSON, plus a manifest mapping
+"spec_id/library" to that digest. The sync job writes it; the API serves the
+compressed bytes as-is with the digest as ETag, so a code view needs neither
+the database nor per-request regex/JSON/compression work.
+
+Layout::
+
+    <root>/manifest.json          {"scatter-basic/matplotlib": "<sha256>", ...}
+    <root>/blobs/ab/<sha256>.gz   gzip of {"spec_id":...,"library":...,"code":...}
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from core.utils import strip_noqa_comments
+
+
+MANIFEST_FILE = "manifest.json"
+BLOB_DIR = "blobs"
+
+
+def code_payload(spec_id: str, library: str, code: str) -> bytes:
+    """Serialize the code response body exactly as FastAPI's JSONResponse would."""
+    body = {"spec_id": spec_id, "library": library, "code": strip_noqa_comments(code)}
+    return json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class CodeBlob:
+    """One stored code payload: its content digest and gzip-compressed bytes."""
+
+    __slots__ = ("digest", "gzipped")
+
+    def __init__(self, digest: str, gzipped: bytes) -> None:
+        self.digest = digest
+        self.gzipped = gzipped
+
+    @classmethod
+    def from_code(cls, spec_id: str, library: str, code: str) -> "CodeBlob":
+        """Build the blob for an implementation (strips noqa comments, compresses)."""
+        payload = code_payload(spec_id, library, code)
+        # mtime=0 keeps the compressed bytes reproducible for identical payloads
+        return cls(hashlib.sha256(payload).hexdigest(), gzip.compress(payload, compresslevel=9, mtime=0))
+
+    @property
+    def etag(self) -> str:
+        """Strong ETag (quoted digest); immutable for a given payload."""
+        return f'"{self.digest}"'
+
+    def body(self) -> bytes:
+        """Uncompressed JSON payload, for clients that do not accept gzip."""
+        return gzip.decompress(self.gzipped)
+
+
+class CodeStore:
+    """Manifest plus blob directory rooted at *root* (see module docstring)."""
+
+    def __init__(self, root: Path, manifest: dict[str, str] | None = None) -> None:
+        self.root = root
+        self.manifest: dict[str, str] = manifest or {}
+
+    @staticmethod
+    def key(spec_id: str, library: str) -> str:
+        return f"{spec_id}/{library}"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / BLOB_DIR / digest[:2] / f"{digest}.gz"
+
+    @classmethod
+    def load(cls, root: Path) -> "CodeStore":
+        """Open the store at *root*; a missing manifest yields an empty store."""
+        path = root / MANIFEST_FILE
+        manifest = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+        return cls(root, manifest)
+
+    def get(self, spec_id: str, library: str) -> CodeBlob | None:
+        """Return the stored blob, or None if the implementation or its blob is missing."""
+        digest = self.manifest.get(self.key(spec_id, library))
+        if digest is None:
+            return None
+        try:
+            return CodeBlob(digest, self._blob_path(digest).read_bytes())
+        except FileNotFoundError:
+            return None
+
+    def put(self, spec_id: str, library: str, code: str) -> str:
+        """Store *code* for an implementation and return ``"added"``, ``"updated"`` or ``"unchanged"``."""
+        blob = CodeBlob.from_code(spec_id, library, code)
+        key = self.key(spec_id, library)
+        previous = self.manifest.get(key)
+
+        path = self._blob_path(blob.digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(blob.gzipped)
+            os.replace(tmp, path)
+        self.manifest[key] = blob.digest
+
+        if previous is None:
+            return "added"
+        return "unchanged" if previous == blob.digest else "updated"
+
+    def save(self) -> None:
+        """Write the manifest atomically, so readers never see a half-written file."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / MANIFEST_FILE
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.manifest, separators=(",", ":"), sort_keys=True), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def prune(self) -> int:
+        """Delete blobs no longer referenced by the manifest; returns the number removed."""
+        referenced = set(self.manifest.values())
+        removed = 0
+        for path in (self.root / BLOB_DIR).glob("*/*.gz"):
+            if path.stem not in referenced:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+
+def update_code_store(store: CodeStore, impls: list[dict]) -> dict:
+    """Bring *store* in line with *impls* (dicts with spec_id, library_id, code).
+
+    Only changed payloads are written; implementations that disappeared are
+    dropped from the manifest. Call save() and then prune() afterwards, in
+    that order, so a reader never sees a manifest pointing at a deleted blob.
+
+    Returns:
+        Dict with added/updated/unchanged/removed counts
+    """
+    stats = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+    current: set[str] = set()
+    for impl in impls:
+        if not impl.get("code"):
+            continue
+        stats[store.put(impl["spec_id"], impl["library_id"], impl["code"])] += 1
+        current.add(store.key(impl["spec_id"], impl["library_id"]))
+
+    for key in set(store.manifest) - current:
+        del store.manifest[key]
+        stats["removed"] += 1
+    return stats
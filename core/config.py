@@ -39,6 +39,45 @@ class Settings(BaseSettings):
     db_name: str = "anyplot"
     """Database name"""
 
+    db_pool_size: int = 5
+    """Persistent connections per engine. Size to the instance's request concurrency."""
+
+    db_max_overflow: int = 10
+    """Extra connections opened under burst load (closed again when returned)"""
+
+    db_pool_timeout: float = 30.0
+    """Seconds to wait for a free connection before raising"""
+
+    db_pool_recycle: int = 1800
+    """Replace connections older than this many seconds (before Cloud SQL / proxies drop them)"""
+
+    db_pool_pre_ping: bool = True
+    """Test each connection on checkout and transparently reconnect stale ones"""
+
+    db_statement_cache_size: int = 500
+    """Prepared statements cached per asyncpg connection (SQLAlchemy's default is 100).
+    selectinload IN-lists and the filter/insights queries produce well over 100
+    distinct statements, so the default cache thrashes and re-prepares hot queries.
+    Set to 0 behind a transaction-mode pooler such as PgBouncer."""
+
+    mcp_db_pool_size: int = 2
+    """Persistent connections in the MCP server's separate pool"""
+
+    mcp_db_max_overflow: int = 3
+    """Burst connections for the MCP pool"""
+
+    database_read_url: str | None = None
+    """Read-replica connection URL. When set, plain SELECTs from API/MCP sessions go to
+    the replica; writes, locking reads and anything after a write in the same session
+    stay on the primary."""
+
+    db_read_primary_window: float = 60.0
+    """Seconds after a cache invalidation (end of a sync) during which reads use the
+    primary, so a lagging replica cannot repopulate the cache with pre-sync data"""
+
+    db_read_retry_after: float = 30.0
+    """Seconds to send reads to the primary after the replica failed to connect"""
+
     # =============================================================================
     # GOOGLE CLOUD
     # =============================================================================
@@ -192,6 +231,55 @@ class Settings(BaseSettings):
             return [item.strip() for item in stripped.split(",") if item.strip()]
         return value
 
+    # =============================================================================
+    # SEARCH
+    # =============================================================================
+
+    search_index_dir: str | None = None
+    """Directory for persisted search indexes (specs.json, code.json). Written by the
+    sync job after a successful sync (code.json incrementally) and loaded by the API
+    on a cold cache so the first /search request needs no DB round-trip. When unset
+    or a file is missing, the API builds that index from the database instead."""
+
+    code_store_dir: str | None = None
+    """Directory of the implementation code blob store (core.code_store). Written by
+    the sync job; /specs/{id}/{library}/code serves its precompressed blobs with an
+    ETag. When unset or an entry is missing, the endpoint reads the database instead."""
+
+    catalog_snapshot_path: str | None = None
+    """Catalog snapshot file (core.snapshot), e.g. on the bucket volume next to the
+    search indexes. Written by the sync job; a starting API instance fills the
+    /specs, /plots/filter and /libraries cache from it and checks it against the
+    database in the background. When unset or unreadable, those are built from
+    the database on first request."""
+
+    # =============================================================================
+    # OBSERVABILITY
+    # =============================================================================
+
+    server_timing_enabled: bool = True
+    """Time each request's stages (cache, db, orm, app, gzip), send them as a
+    Server-Timing header and keep rolling per-route percentiles for /debug/timings"""
+
+    server_timing_window: int = 1000
+    """Samples kept per route and stage for the /debug/timings percentiles"""
+
+    metrics_enabled: bool = True
+    """Record Prometheus metrics (requests, cache, DB pools, OG renders, outbound
+    calls, event-loop lag) and serve them at GET /metrics"""
+
+    metrics_token: str | None = None
+    """Bearer token required by GET /metrics (`Authorization: Bearer <token>`).
+    When unset, the endpoint is disabled (503). With several uvicorn workers also
+    set PROMETHEUS_MULTIPROC_DIR (see api/metrics.py)."""
+
+    loop_monitor_enabled: bool = False
+    """Watch for event-loop stalls: callbacks blocking the loop longer than
+    loop_monitor_threshold_ms are logged with their stack and listed at /debug/loop"""
+
+    loop_monitor_threshold_ms: float = 100.0
+    """Loop stall length (ms) reported by the loop monitor"""
+
     # =============================================================================
     # CORS
     # =============================================================================
@@ -4,6 +4,12 @@ Async SQLAlchemy database connection for anyplot.
 Supports two connection modes:
 1. Cloud SQL Connector (recommended for Cloud Run) - uses INSTANCE_CONNECTION_NAME
 2. Direct connection via DATABASE_URL (for local development)
+
+Both async modes use asyncpg and the same pooled engine setup; they differ
+only in how a raw connection is opened.
+
+An optional read replica (DATABASE_READ_URL) takes plain SELECTs from async
+sessions; see RoutingSession.
 """
 
 import asyncio
@@ -11,12 +17,18 @@ import logging
 import os
 import re
 import threading
+import time
+import weakref
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager, contextmanager
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy.pool import NullPool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, NullPool, PoolProxiedConnection
+
+from core.config import settings
+from core.timing import span
 
 
 logger = logging.getLogger(__name__)
@@ -24,26 +36,32 @@ logger = logging.getLogger(__name__)
 # Environment variables
 INSTANCE_CONNECTION_NAME = os.getenv("INSTANCE_CONNECTION_NAME", "")
 DATABASE_URL = os.getenv("DATABASE_URL", "")
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL", "")
 DB_USER = os.getenv("DB_USER", "postgres")
 DB_PASS = os.getenv("DB_PASS", "")
 DB_NAME = os.getenv("DB_NAME", "anyplot")
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 
-# Database pool defaults
-DEFAULT_POOL_SIZE = 5
-DEFAULT_MAX_OVERFLOW = 10
-
 # Global instances
 engine = None
+read_engine = None  # Optional read replica (DATABASE_READ_URL)
 AsyncSessionLocal: async_sessionmaker | None = None
 _sync_session_factory = None
-_connector = None
+_connector = None  # Sync (pg8000) Cloud SQL connector, for scripts
+_async_connector = None  # Async (asyncpg) Cloud SQL connector, bound to the API event loop
 
 # Thread safety locks for lazy initialization
 # Note: asyncio.Lock is created lazily to avoid event loop binding issues at module import
 _async_init_lock: asyncio.Lock | None = None
+_async_connector_lock: asyncio.Lock | None = None
 _sync_init_lock = threading.Lock()
 
+# Reads go to the primary until this time.monotonic() value (see route_reads_to_primary)
+_primary_reads_until = 0.0
+
+# Replica (sync) engine -> time.monotonic() of its last failed connect from a RoutingSession
+_replica_failed_at: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
 
 def _get_async_lock() -> asyncio.Lock:
     """Get or create the async initialization lock.
@@ -57,12 +75,206 @@ def _get_async_lock() -> asyncio.Lock:
     return _async_init_lock
 
 
+def _get_async_connector_lock() -> asyncio.Lock:
+    """Get or create the lock guarding async Cloud SQL connector creation."""
+    global _async_connector_lock
+    if _async_connector_lock is None:
+        _async_connector_lock = asyncio.Lock()
+    return _async_connector_lock
+
+
 class Base(DeclarativeBase):
     """Base class for all SQLAlchemy models."""
 
     pass
 
 
+class PoolMetrics:
+    """
+    Checkout latency and error counters for one named connection pool.
+
+    Fed by InstrumentedAsyncPool and read through get_pool_status().
+    """
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.checkout_ms_total = 0.0
+        self.checkout_ms_max = 0.0
+        self.checkout_timeouts = 0
+        self.connects = 0
+        self.connect_errors = 0
+        self.last_connect_error_at: float | None = None  # time.monotonic()
+
+    def record_checkout(self, wait_ms: float) -> None:
+        """Record a successful checkout that took *wait_ms* (queueing, connect and pre-ping)."""
+        self.checkouts += 1
+        self.checkout_ms_total += wait_ms
+        self.checkout_ms_max = max(self.checkout_ms_max, wait_ms)
+
+    def snapshot(self) -> dict:
+        """Counters as a JSON-friendly dict."""
+        return {
+            "checkouts": self.checkouts,
+            "checkout_ms_avg": round(self.checkout_ms_total / self.checkouts, 2) if self.checkouts else 0.0,
+            "checkout_ms_max": round(self.checkout_ms_max, 2),
+            "checkout_timeouts": self.checkout_timeouts,
+            "connects": self.connects,
+            "connect_errors": self.connect_errors,
+        }
+
+
+_pool_metrics: dict[str, PoolMetrics] = {}
+
+
+def get_pool_metrics(name: str) -> PoolMetrics:
+    """Get (or create) the metrics of the pool named *name* (e.g. "api", "mcp")."""
+    return _pool_metrics.setdefault(name, PoolMetrics())
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that records checkout latency, timeouts and connect errors.
+
+    Metrics are keyed by the pool's logging name (``pool_logging_name``), which
+    carries over when engine.dispose() recreates the pool.
+    """
+
+    @property
+    def metrics(self) -> PoolMetrics:
+        return get_pool_metrics(self._orig_logging_name or "default")
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.metrics.checkout_timeouts += 1
+            raise
+        except Exception:
+            self.metrics.connect_errors += 1
+            self.metrics.last_connect_error_at = time.monotonic()
+            raise
+        self.metrics.record_checkout((time.perf_counter() - start) * 1000)
+        return connection
+
+    def _create_connection(self) -> ConnectionPoolEntry:
+        self.metrics.connects += 1
+        return super()._create_connection()
+
+
+def _pool_kwargs(pool_size: int | None = None, max_overflow: int | None = None) -> dict:
+    """QueuePool engine kwargs from settings; size and overflow can be overridden per engine."""
+    return {
+        "pool_size": settings.db_pool_size if pool_size is None else pool_size,
+        "max_overflow": settings.db_max_overflow if max_overflow is None else max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def route_reads_to_primary(seconds: float | None = None) -> None:
+    """
+    Send replica-eligible reads to the primary for *seconds* (default: settings.db_read_primary_window).
+
+    Called when the response cache is invalidated after a sync: the replica
+    may not have replayed the sync's writes yet, and whatever is read next
+    gets cached for hours.
+    """
+    global _primary_reads_until
+    window = settings.db_read_primary_window if seconds is None else seconds
+    _primary_reads_until = max(_primary_reads_until, time.monotonic() + window)
+
+
+def mark_replica_failed(replica) -> None:
+    """Keep reads off *replica* for settings.db_read_retry_after seconds."""
+    _replica_failed_at[replica] = time.monotonic()
+
+
+def replica_available(replica) -> bool:
+    """Whether reads may use *replica* now: outside the freshness window and not recently failing."""
+    now = time.monotonic()
+    if now < _primary_reads_until:
+        return False
+    metrics = getattr(replica.pool, "metrics", None)
+    failures = (_replica_failed_at.get(replica), metrics.last_connect_error_at if metrics is not None else None)
+    failed_at = max((t for t in failures if t is not None), default=None)
+    return failed_at is None or now - failed_at >= settings.db_read_retry_after
+
+
+class RoutingSession(Session):
+    """
+    Session that sends plain SELECTs to a read replica and everything else to the primary.
+
+    The replica is taken from ``info["read_replica"]`` (a sync Engine, see
+    create_session_factory); without one this behaves like a normal Session.
+    Reads stay on the primary for locking SELECTs, once the session has
+    written (read-your-writes), and whenever replica_available() says no,
+    so a lagging or unreachable replica falls back to the primary. A read
+    whose replica connection fails runs on the primary instead, and marks the
+    replica failed for the other sessions (see mark_replica_failed).
+    """
+
+    _has_written = False
+    _executing = False
+    _replica_down = False
+
+    def execute(self, statement, *args, **kwargs):
+        # Times the outermost call only (the "query" request stage); eager loaders
+        # re-enter execute() for their follow-up SELECTs
+        if self._executing:
+            self._connect_replica(statement)
+            return super().execute(statement, *args, **kwargs)
+        self._executing = True
+        try:
+            with span("query"):
+                self._connect_replica(statement)
+                return super().execute(statement, *args, **kwargs)
+        finally:
+            self._executing = False
+
+    def _connect_replica(self, statement) -> None:
+        """Open the replica connection for a read routed there; if that fails, route this session to the primary.
+
+        Only the connect is guarded: errors from the query itself still propagate.
+        """
+        replica = self.info.get("read_replica")
+        if replica is None or self.get_bind(clause=statement) is not replica:
+            return
+        try:
+            self.connection(bind_arguments={"bind": replica})
+        except Exception:
+            logger.warning("Read replica unreachable, reading from the primary", exc_info=True)
+            self._replica_down = True
+            mark_replica_failed(replica)
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get("read_replica")
+        if self._flushing or (clause is not None and getattr(clause, "is_dml", False)):
+            self._has_written = True
+        elif (
+            replica is not None
+            and not self._has_written
+            and not self._replica_down
+            and getattr(clause, "is_select", False)  # Select or a lambda statement wrapping one
+            and clause._for_update_arg is None
+            and replica_available(replica)
+        ):
+            return replica
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+def create_session_factory(primary: AsyncEngine, replica: AsyncEngine | None = None) -> async_sessionmaker:
+    """Async session factory bound to *primary*, routing plain reads to *replica* if given."""
+    return async_sessionmaker(
+        primary,
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        expire_on_commit=False,
+        info={"read_replica": replica.sync_engine} if replica is not None else {},
+    )
+
+
 def _normalize_db_url(url: str, target_driver: str) -> str:
     """Replace any PostgreSQL URL scheme with ``postgresql+<target_driver>://``.
 
@@ -89,22 +301,40 @@ def _create_cloud_sql_engine_sync():
         )
 
     engine = create_engine(
-        "postgresql+pg8000://",
-        creator=get_conn,
-        pool_size=DEFAULT_POOL_SIZE,
-        max_overflow=DEFAULT_MAX_OVERFLOW,
-        pool_pre_ping=True,
-        echo=ENVIRONMENT == "development",
+        "postgresql+pg8000://", creator=get_conn, echo=ENVIRONMENT == "development", **_pool_kwargs()
     )
 
     logger.info(f"Created Cloud SQL engine: {INSTANCE_CONNECTION_NAME} (PUBLIC IP)")
     return engine
 
 
-def _create_direct_engine():
-    """Create sync engine using direct DATABASE_URL connection."""
-    url = _normalize_db_url(DATABASE_URL, "asyncpg")
+async def _get_async_connector():
+    """Get or create the async Cloud SQL connector.
 
+    create_async_connector() binds the connector to the running event loop,
+    so it is created on the first connection attempt rather than at engine
+    creation time.
+    """
+    global _async_connector
+
+    if _async_connector is None:
+        async with _get_async_connector_lock():
+            if _async_connector is None:
+                from google.cloud.sql.connector import create_async_connector
+
+                _async_connector = await create_async_connector()
+    return _async_connector
+
+
+def _create_pooled_async_engine(
+    url: str, name: str, pool_size: int | None = None, max_overflow: int | None = None, async_creator=None
+):
+    """Create an asyncpg engine with the shared, instrumented pool setup (see _pool_kwargs).
+
+    Used for both DATABASE_URL and the Cloud SQL connector (via *async_creator*),
+    so a local Postgres exercises the same pool code path as Cloud Run. *name*
+    labels the pool's metrics in get_pool_status().
+    """
     # Use NullPool for testing to avoid connection issues
     poolclass = NullPool if ENVIRONMENT == "test" else None
 
@@ -113,11 +343,51 @@ def _create_direct_engine():
     if poolclass:
         engine_kwargs["poolclass"] = poolclass
     else:
-        engine_kwargs["pool_size"] = DEFAULT_POOL_SIZE
-        engine_kwargs["max_overflow"] = DEFAULT_MAX_OVERFLOW
-        engine_kwargs["pool_pre_ping"] = True
+        engine_kwargs.update(_pool_kwargs(pool_size, max_overflow))
+        engine_kwargs["poolclass"] = InstrumentedAsyncPool
+        engine_kwargs["pool_logging_name"] = name
 
-    engine = create_async_engine(url, **engine_kwargs)
+    # Per-connection prepared-statement LRU in SQLAlchemy's asyncpg adapter
+    dbapi_kwargs = {}
+    if url.startswith("postgresql+asyncpg://"):
+        dbapi_kwargs["prepared_statement_cache_size"] = settings.db_statement_cache_size
+
+    if async_creator is not None:
+        # create_async_engine(async_creator=...) cannot pass DBAPI arguments, so
+        # use the equivalent sync creator form that wraps the async one.
+        def creator():
+            return db_engine.sync_engine.dialect.dbapi.connect(async_creator_fn=async_creator, **dbapi_kwargs)
+
+        engine_kwargs["creator"] = creator
+    elif dbapi_kwargs:
+        engine_kwargs["connect_args"] = dbapi_kwargs
+
+    db_engine = create_async_engine(url, **engine_kwargs)
+    return db_engine
+
+
+def _create_cloud_sql_engine(name: str = "api", pool_size: int | None = None, max_overflow: int | None = None):
+    """Create async engine using Cloud SQL Python Connector with asyncpg."""
+    from google.cloud.sql.connector import IPTypes
+
+    async def get_conn():
+        connector = await _get_async_connector()
+        return await connector.connect_async(
+            INSTANCE_CONNECTION_NAME, "asyncpg", user=DB_USER, password=DB_PASS, db=DB_NAME, ip_type=IPTypes.PUBLIC
+        )
+
+    engine = _create_pooled_async_engine(
+        "postgresql+asyncpg://", name, pool_size=pool_size, max_overflow=max_overflow, async_creator=get_conn
+    )
+
+    logger.info(f"Created async Cloud SQL engine: {INSTANCE_CONNECTION_NAME} (PUBLIC IP)")
+    return engine
+
+
+def _create_direct_engine(name: str = "api", pool_size: int | None = None, max_overflow: int | None = None):
+    """Create async engine using direct DATABASE_URL connection."""
+    url = _normalize_db_url(DATABASE_URL, "asyncpg")
+    engine = _create_pooled_async_engine(url, name, pool_size=pool_size, max_overflow=max_overflow)
 
     # Log without exposing password
     safe_url = url.split("@")[-1] if "@" in url else "local"
@@ -131,14 +401,7 @@ def _create_direct_engine_sync():
 
     url = _normalize_db_url(DATABASE_URL, "pg8000")
 
-    engine_kwargs = {
-        "echo": ENVIRONMENT == "development",
-        "pool_size": DEFAULT_POOL_SIZE,
-        "max_overflow": DEFAULT_MAX_OVERFLOW,
-        "pool_pre_ping": True,
-    }
-
-    engine = create_engine(url, **engine_kwargs)
+    engine = create_engine(url, echo=ENVIRONMENT == "development", **_pool_kwargs())
 
     # Log without exposing password
     safe_url = url.split("@")[-1] if "@" in url else "local"
@@ -146,6 +409,72 @@ def _create_direct_engine_sync():
     return engine
 
 
+def create_async_db_engine(name: str, pool_size: int | None = None, max_overflow: int | None = None):
+    """
+    Create an additional pooled async engine for the configured database.
+
+    For components that need their own pool next to FastAPI's (e.g. the MCP
+    server), so they share connection setup instead of duplicating it.
+
+    Args:
+        name: Pool name for telemetry (see get_pool_status)
+        pool_size: Persistent connections (default: settings.db_pool_size)
+        max_overflow: Burst connections (default: settings.db_max_overflow)
+
+    Raises:
+        RuntimeError: If neither DATABASE_URL nor INSTANCE_CONNECTION_NAME is configured
+    """
+    if DATABASE_URL:
+        return _create_direct_engine(name, pool_size=pool_size, max_overflow=max_overflow)
+    if INSTANCE_CONNECTION_NAME:
+        return _create_cloud_sql_engine(name, pool_size=pool_size, max_overflow=max_overflow)
+    raise RuntimeError("Async database engine requires DATABASE_URL or INSTANCE_CONNECTION_NAME")
+
+
+def create_async_read_engine(name: str, pool_size: int | None = None, max_overflow: int | None = None):
+    """
+    Create a pooled async engine for the read replica, or None without DATABASE_READ_URL.
+
+    Uses the same pool setup as the primary engines (see _create_pooled_async_engine).
+    """
+    if not DATABASE_READ_URL:
+        return None
+    url = _normalize_db_url(DATABASE_READ_URL, "asyncpg")
+    read = _create_pooled_async_engine(url, name, pool_size=pool_size, max_overflow=max_overflow)
+
+    # Log without exposing password
+    safe_url = url.split("@")[-1] if "@" in url else "local"
+    logger.info(f"Created read-replica engine: {safe_url}")
+    return read
+
+
+def get_pool_status(db_engine) -> dict:
+    """
+    Snapshot of an engine's connection pool.
+
+    Reports size, checked out (in use), overflow and checkout timeout, plus
+    the PoolMetrics counters for instrumented pools. Returns an empty dict for
+    pools without these counters (e.g. NullPool).
+
+    Example:
+        >>> get_pool_status(engine)
+        {"size": 5, "checked_out": 2, "overflow": -3, "timeout": 30.0, "checkouts": 812, "checkout_ms_avg": 0.41, ...}
+    """
+    pool = db_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {}
+    status = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "timeout": pool.timeout(),
+    }
+    metrics = getattr(pool, "metrics", None)  # Only InstrumentedAsyncPool has them
+    if metrics is not None:
+        status.update(metrics.snapshot())
+    return status
+
+
 def init_db_sync() -> None:
     """
     Initialize sync database connection (for scripts like sync_to_postgres.py).
@@ -179,8 +508,10 @@ async def init_db() -> None:
     Priority:
     1. DATABASE_URL (direct connection) - for local development
     2. Cloud SQL Connector (INSTANCE_CONNECTION_NAME) - for Cloud Run
+
+    DATABASE_READ_URL additionally creates the read-replica engine.
     """
-    global engine, AsyncSessionLocal
+    global engine, read_engine, AsyncSessionLocal
 
     if engine is not None:
         return  # Already initialized
@@ -189,14 +520,13 @@ async def init_db() -> None:
     if DATABASE_URL:
         engine = _create_direct_engine()
     elif INSTANCE_CONNECTION_NAME:
-        # For async, use sync pg8000 wrapped - Cloud Run should use DATABASE_URL
-        engine = _create_cloud_sql_engine_sync()
-        logger.warning("Using sync Cloud SQL engine - consider using DATABASE_URL for async support")
+        engine = _create_cloud_sql_engine()
     else:
         logger.warning("No database configuration found - running without database")
         return
 
-    AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    read_engine = create_async_read_engine("read")
+    AsyncSessionLocal = create_session_factory(engine, read_engine)
 
 
 def close_db_sync() -> None:
@@ -217,7 +547,12 @@ def close_db_sync() -> None:
 
 async def close_db() -> None:
     """Close async database connections and cleanup."""
-    global engine, AsyncSessionLocal, _connector
+    global engine, read_engine, AsyncSessionLocal, _connector, _async_connector
+
+    if read_engine:
+        await read_engine.dispose()
+        read_engine = None
+        logger.info("Read-replica engine disposed")
 
     if engine:
         await engine.dispose()
@@ -230,6 +565,11 @@ async def close_db() -> None:
         _connector = None
         logger.info("Cloud SQL connector closed")
 
+    if _async_connector:
+        await _async_connector.close_async()
+        _async_connector = None
+        logger.info("Async Cloud SQL connector closed")
+
 
 async def get_db() -> AsyncGenerator[AsyncSession | None, None]:
     """
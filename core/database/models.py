@@ -9,7 +9,7 @@ from typing import Any
 from uuid import uuid4
 
 from sqlalchemy import BigInteger, CheckConstraint, DateTime, Float, ForeignKey, Integer, String, Text, UniqueConstraint
-from sqlalchemy.orm import Mapped, deferred, mapped_column, relationship, synonym
+from sqlalchemy.orm import Mapped, column_property, deferred, mapped_column, relationship, synonym
 from sqlalchemy.sql import func
 
 from core.constants import LANGUAGES_METADATA, LIBRARIES_METADATA
@@ -127,6 +127,8 @@ class Impl(Base):
 
     # Code (deferred — ~13 MB total, only loaded when explicitly accessed or undeferred)
     code: Mapped[str | None] = deferred(mapped_column(Text, nullable=True))  # Source
+    # `code IS NOT NULL` evaluated in SQL — lets listings count implementations without loading code
+    has_code: Mapped[bool] = column_property(code.columns[0].isnot(None))
 
     # Previews — one per theme (filled by Phase C pipeline, synced from metadata YAML).
     # Light and dark PNGs are always emitted; HTML variants are emitted only for interactive libraries.
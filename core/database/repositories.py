@@ -4,9 +4,22 @@ Repository classes for database access.
 Provides abstraction layer between API and database models.
 """
 
+from collections.abc import AsyncIterator
 from typing import Generic, TypeVar
 
-from sqlalchemy import String, cast, func, or_, select
+from sqlalchemy import (
+    ColumnElement,
+    StatementLambdaElement,
+    and_,
+    exists,
+    func,
+    lambda_stmt,
+    literal,
+    or_,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload, undefer
 
@@ -55,6 +68,99 @@ IMPL_UPDATABLE_FIELDS = frozenset(
 )
 
 
+def _tag_filter(column: ColumnElement, category: str, values: list[str], dialect: str) -> ColumnElement[bool]:
+    """Match rows whose JSON tag dict lists any of *values* under *category*.
+
+    PostgreSQL uses one JSONB containment test per value (``tags @> '{"plot_type": ["scatter"]}'``),
+    which the GIN index can answer. SQLite (tests, local dev) unnests the category array with json_each.
+    """
+    if dialect == "postgresql":
+        return or_(*(column.op("@>")(literal({category: [value]}, JSONB)) for value in values))
+    elements = func.json_each(column, f"$.{category}").table_valued("value")
+    return exists(select(1).select_from(elements).where(elements.c.value.in_(values)))
+
+
+# =============================================================================
+# Hot lookups
+# =============================================================================
+# These run on nearly every uncached spec/code request. As lambda statements,
+# SQLAlchemy builds each select() (options included) and its cache key once per
+# lambda, keyed on the lambda's code location; later calls only pull the closure
+# values out as bound parameters. That skips statement construction and the
+# cache-key traversal of the options tree (see scripts/bench_queries.py).
+# Keep the lambdas free of Python branching: only closure *values* may vary.
+
+
+def _spec_by_id_stmt(spec_id: str) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: (
+            select(Spec)
+            .where(Spec.id == spec_id)
+            .options(
+                selectinload(Spec.impls).selectinload(Impl.library),
+                selectinload(Spec.impls).undefer(Impl.review_image_description).undefer(Impl.review_criteria_checklist),
+            )
+        )
+    )
+
+
+def _specs_by_ids_stmt(spec_ids: list[str]) -> StatementLambdaElement:
+    # The list becomes one expanding IN parameter, so any batch size shares the cache entry
+    return lambda_stmt(
+        lambda: (
+            select(Spec)
+            .where(Spec.id.in_(spec_ids))
+            .options(
+                selectinload(Spec.impls).selectinload(Impl.library),
+                selectinload(Spec.impls).undefer(Impl.review_image_description).undefer(Impl.review_criteria_checklist),
+            )
+        )
+    )
+
+
+def _spec_by_id_with_code_stmt(spec_id: str) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: (
+            select(Spec)
+            .where(Spec.id == spec_id)
+            .options(
+                selectinload(Spec.impls).selectinload(Impl.library),
+                selectinload(Spec.impls)
+                .undefer(Impl.review_image_description)
+                .undefer(Impl.review_criteria_checklist)
+                .undefer(Impl.code),
+            )
+        )
+    )
+
+
+def _impl_code_stmt(spec_id: str, library_id: str, language_id: str) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: (
+            select(Impl)
+            .where(Impl.spec_id == spec_id, Impl.library_id == library_id, Impl.language_id == language_id)
+            .options(undefer(Impl.code))
+        )
+    )
+
+
+def _impl_detail_stmt(spec_id: str, library_id: str, language_id: str) -> StatementLambdaElement:
+    # selectinload(Impl.library) — MCP get_implementation reads impl.library
+    # on an async session; without eager-load it raises MissingGreenlet.
+    return lambda_stmt(
+        lambda: (
+            select(Impl)
+            .where(Impl.spec_id == spec_id, Impl.library_id == library_id, Impl.language_id == language_id)
+            .options(
+                selectinload(Impl.library),
+                undefer(Impl.code),
+                undefer(Impl.review_image_description),
+                undefer(Impl.review_criteria_checklist),
+            )
+        )
+    )
+
+
 class BaseRepository(Generic[T]):
     """Base repository with shared CRUD operations.
 
@@ -120,16 +226,16 @@ class SpecRepository(BaseRepository[Spec]):
         Loads review_image_description and review_criteria_checklist (needed for detail display).
         Code and tested remain deferred — use /specs/{id}/{lib}/code for code.
         """
-        result = await self.session.execute(
-            select(Spec)
-            .where(Spec.id == spec_id)
-            .options(
-                selectinload(Spec.impls).selectinload(Impl.library),
-                selectinload(Spec.impls).undefer(Impl.review_image_description).undefer(Impl.review_criteria_checklist),
-            )
-        )
+        result = await self.session.execute(_spec_by_id_stmt(spec_id))
         return result.scalar_one_or_none()
 
+    async def get_by_ids(self, spec_ids: list[str]) -> list[Spec]:
+        """Get several specs in one query, loaded like get_by_id. Unknown IDs are skipped; order is unspecified."""
+        if not spec_ids:
+            return []
+        result = await self.session.execute(_specs_by_ids_stmt(list(spec_ids)))
+        return list(result.scalars().all())
+
     async def get_by_id_with_code(self, spec_id: str) -> Spec | None:
         """Like get_by_id, but additionally eager-loads Impl.code.
 
@@ -138,44 +244,48 @@ class SpecRepository(BaseRepository[Spec]):
         `get_by_id` raises MissingGreenlet on AsyncSession because the column
         is deferred and the lazy-load would emit a sync SELECT.
         """
-        impls_loader = selectinload(Spec.impls)
-        result = await self.session.execute(
-            select(Spec)
-            .where(Spec.id == spec_id)
-            .options(
-                impls_loader.selectinload(Impl.library),
-                impls_loader.undefer(Impl.review_image_description)
-                .undefer(Impl.review_criteria_checklist)
-                .undefer(Impl.code),
-            )
-        )
+        result = await self.session.execute(_spec_by_id_with_code_stmt(spec_id))
         return result.scalar_one_or_none()
 
     async def get_all(self) -> list[Spec]:
         """Get all specs with their implementations and library.
 
-        Lightweight: `Impl.code` stays deferred. Most callers (specs/plots/
-        seo/insights/stats/debug routers) only need the listing surface;
-        eager-loading every code blob would be a multi-MB regression.
-        Callers that iterate `spec.impls` and read `impl.code` on an async
-        session must use `get_all_with_code()` to avoid MissingGreenlet.
+        Lightweight: `Impl.code` stays deferred. Callers (specs/plots/seo/
+        insights/stats/debug routers, MCP listings) only need the listing
+        surface; eager-loading every code blob would be a multi-MB
+        regression. Use `impl.has_code` for presence checks — reading
+        `impl.code` on an async session raises MissingGreenlet.
         """
         impls_loader = selectinload(Spec.impls)
         result = await self.session.execute(select(Spec).options(impls_loader.selectinload(Impl.library)))
         return list(result.scalars().all())
 
-    async def get_all_with_code(self) -> list[Spec]:
-        """Get all specs with implementations (code + library eager-loaded).
+    async def stream_all(self, include_code: bool = False, batch_size: int = 100) -> AsyncIterator[Spec]:
+        """Yield every spec ordered by ID, with implementations and library, without holding the catalog.
 
-        Use this for paths that read `impl.code` on every implementation —
-        currently only the MCP `list_specs` and `search_specs` tools.
-        Touching `impl.code` after `get_all()` raises MissingGreenlet on
-        AsyncSession because the column is deferred and the lazy-load would
-        emit a sync SELECT.
+        Rows come from a server-side cursor (`yield_per`) in batches of *batch_size*
+        specs; each batch loads its impls with one selectin query, so memory stays
+        bounded by the batch, not the catalog. `Impl.code` is loaded only with
+        *include_code*. Keep the session open until the iterator is exhausted.
         """
         impls_loader = selectinload(Spec.impls)
+        options = [
+            impls_loader.selectinload(Impl.library),
+            impls_loader.undefer(Impl.review_image_description).undefer(Impl.review_criteria_checklist),
+        ]
+        if include_code:
+            options.append(impls_loader.undefer(Impl.code))
+
+        stmt = select(Spec).order_by(Spec.id).options(*options).execution_options(yield_per=batch_size)
+        result = await self.session.stream_scalars(stmt)
+        async for spec in result:
+            yield spec
+
+    async def get_page(self, limit: int, offset: int = 0) -> list[Spec]:
+        """Get one page of specs ordered by ID, like get_all (code deferred) but with SQL LIMIT/OFFSET."""
+        impls_loader = selectinload(Spec.impls)
         result = await self.session.execute(
-            select(Spec).options(impls_loader.selectinload(Impl.library), impls_loader.undefer(Impl.code))
+            select(Spec).options(impls_loader.selectinload(Impl.library)).order_by(Spec.id).limit(limit).offset(offset)
         )
         return list(result.scalars().all())
 
@@ -184,23 +294,44 @@ class SpecRepository(BaseRepository[Spec]):
         result = await self.session.execute(select(Spec.id).order_by(Spec.id))
         return [row[0] for row in result.fetchall()]
 
-    async def search_by_tags(self, tags: list[str]) -> list[Spec]:
-        """Search specs by tags. Eager-loads impls + library + code.
-
-        impl.library and impl.code are both required by MCP
-        search_specs_by_tags (server.py iterates impls and reads both); not
-        eager-loading them on an async session raises MissingGreenlet.
+    async def search_by_tags(
+        self,
+        tags: dict[str, list[str]],
+        impl_tags: dict[str, list[str]] | None = None,
+        libraries: list[str] | None = None,
+        limit: int | None = None,
+    ) -> list[Spec]:
+        """Search specs by tag category. Eager-loads impls + library (code stays deferred).
+
+        Values within a category are OR-ed, categories are AND-ed, e.g.
+        ``{"plot_type": ["scatter", "bubble"], "domain": ["finance"]}``.
+        Impl-level filters (``impl_tags`` categories and ``libraries``) must
+        all hold for at least one implementation with code. Every filter runs
+        in SQL: JSONB containment (``@>``, served by the GIN indexes on
+        specs.tags and impls.impl_tags) on PostgreSQL, json_each on SQLite.
+
+        impl.library is required by MCP search_specs_by_tags; not eager-loading
+        it on an async session raises MissingGreenlet. Use `impl.has_code` to
+        count implementations.
         """
-        filters = []
-        for tag in tags:
-            filters.append(cast(Spec.tags, String).contains(f'"{tag}"'))
+        dialect = self.session.get_bind().dialect.name
+        filters = [_tag_filter(Spec.tags, category, values, dialect) for category, values in tags.items() if values]
+
+        impl_filters = [
+            _tag_filter(Impl.impl_tags, category, values, dialect)
+            for category, values in (impl_tags or {}).items()
+            if values
+        ]
+        if libraries:
+            impl_filters.append(Impl.library_id.in_(libraries))
+        if impl_filters:
+            filters.append(Spec.impls.any(and_(Impl.code.isnot(None), *impl_filters)))
 
         impls_loader = selectinload(Spec.impls)
-        result = await self.session.execute(
-            select(Spec)
-            .where(or_(*filters))
-            .options(impls_loader.selectinload(Impl.library), impls_loader.undefer(Impl.code))
-        )
+        query = select(Spec).where(*filters).options(impls_loader.selectinload(Impl.library)).order_by(Spec.id)
+        if limit is not None:
+            query = query.limit(limit)
+        result = await self.session.execute(query)
         return list(result.scalars().all())
 
     async def upsert(self, spec_data: dict) -> Spec:
@@ -280,14 +411,35 @@ class ImplRepository(BaseRepository[Impl]):
         )
         return list(result.scalars().all())
 
+    async def get_by_library_with_code(self, library_id: str) -> list[Impl]:
+        """Get all implementations for a library with code undeferred (one library's share of the column only)."""
+        result = await self.session.execute(
+            select(Impl).where(Impl.library_id == library_id).options(undefer(Impl.code)).order_by(Impl.spec_id)
+        )
+        return list(result.scalars().all())
+
     async def get_code(self, spec_id: str, library_id: str, language_id: str = "python") -> Impl | None:
         """Get a specific implementation with only the code field undeferred."""
+        result = await self.session.execute(_impl_code_stmt(spec_id, library_id, language_id))
+        return result.scalar_one_or_none()
+
+    async def get_code_documents(self) -> list[tuple[str, str, str]]:
+        """Get (spec_id, library_id, code) for every implementation with code (search index build only)."""
         result = await self.session.execute(
-            select(Impl)
-            .where(Impl.spec_id == spec_id, Impl.library_id == library_id, Impl.language_id == language_id)
-            .options(undefer(Impl.code))
+            select(Impl.spec_id, Impl.library_id, Impl.code).where(Impl.code.isnot(None)).order_by(Impl.id)
         )
-        return result.scalar_one_or_none()
+        return [(row[0], row[1], row[2]) for row in result.all()]
+
+    async def get_codes(self, keys: list[tuple[str, str]], language_id: str = "python") -> dict[tuple[str, str], str]:
+        """Get code for a handful of (spec_id, library_id) pairs in one query, keyed by pair."""
+        if not keys:
+            return {}
+        result = await self.session.execute(
+            select(Impl.spec_id, Impl.library_id, Impl.code).where(
+                tuple_(Impl.spec_id, Impl.library_id).in_(keys), Impl.language_id == language_id
+            )
+        )
+        return {(row[0], row[1]): row[2] for row in result.all() if row[2] is not None}
 
     async def get_by_spec_and_library(self, spec_id: str, library_id: str, language_id: str = "python") -> Impl | None:
         """Get a specific implementation by spec + language + library (includes all deferred fields).
@@ -295,18 +447,7 @@ class ImplRepository(BaseRepository[Impl]):
         Defaults to language_id="python" so existing callers keep working. Pass ``language_id``
         explicitly to disambiguate when multiple languages exist for the same (spec, library).
         """
-        # selectinload(Impl.library) — MCP get_implementation reads impl.library
-        # on an async session; without eager-load it raises MissingGreenlet.
-        result = await self.session.execute(
-            select(Impl)
-            .where(Impl.spec_id == spec_id, Impl.library_id == library_id, Impl.language_id == language_id)
-            .options(
-                selectinload(Impl.library),
-                undefer(Impl.code),
-                undefer(Impl.review_image_description),
-                undefer(Impl.review_criteria_checklist),
-            )
-        )
+        result = await self.session.execute(_impl_detail_stmt(spec_id, library_id, language_id))
         return result.scalar_one_or_none()
 
     async def upsert(self, spec_id: str, library_id: str, impl_data: dict, language_id: str = "python") -> Impl:
@@ -0,0 +1,81 @@
+"""
+Streaming NDJSON export of the anyplot catalog.
+
+One JSON object per line: each spec (``"type": "spec"``) is followed by its
+implementations (``"type": "impl"``), specs ordered by ID. Shared by the
+/export/catalog.ndjson endpoint and scripts/export_catalog.py; both stream
+from a server-side cursor, so memory does not grow with the catalog.
+"""
+
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.database.models import Impl, Spec
+from core.database.repositories import SpecRepository
+from core.utils import strip_noqa_comments
+
+
+def _iso(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+def spec_record(spec: Spec) -> dict[str, Any]:
+    """Export record for a spec (specification.md + metadata fields)."""
+    return {
+        "type": "spec",
+        "id": spec.id,
+        "title": spec.title,
+        "description": spec.description,
+        "applications": spec.applications or [],
+        "data": spec.data or [],
+        "notes": spec.notes or [],
+        "tags": spec.tags,
+        "issue": spec.issue,
+        "suggested": spec.suggested,
+        "created": _iso(spec.created),
+        "updated": _iso(spec.updated),
+    }
+
+
+def impl_record(impl: Impl, include_code: bool = False) -> dict[str, Any]:
+    """Export record for an implementation; ``code`` (noqa stripped, as served by the API) only with *include_code*."""
+    record = {
+        "type": "impl",
+        "spec_id": impl.spec_id,
+        "library_id": impl.library_id,
+        "library_name": impl.library.name if impl.library else impl.library_id,
+        "language": impl.language_id,
+        "preview_url_light": impl.preview_url_light,
+        "preview_url_dark": impl.preview_url_dark,
+        "preview_html_light": impl.preview_html_light,
+        "preview_html_dark": impl.preview_html_dark,
+        "quality_score": impl.quality_score,
+        "python_version": impl.python_version,
+        "library_version": impl.library_version,
+        "generated_at": _iso(impl.generated_at),
+        "updated": _iso(impl.updated),
+        "generated_by": impl.generated_by,
+        "review_verdict": impl.review_verdict,
+        "review_strengths": impl.review_strengths or [],
+        "review_weaknesses": impl.review_weaknesses or [],
+        "review_image_description": impl.review_image_description,
+        "review_criteria_checklist": impl.review_criteria_checklist,
+        "impl_tags": impl.impl_tags,
+    }
+    if include_code:
+        record["code"] = strip_noqa_comments(impl.code)
+    return record
+
+
+async def iter_catalog_ndjson(
+    session: AsyncSession, include_code: bool = False, batch_size: int = 100
+) -> AsyncIterator[bytes]:
+    """Yield the catalog as NDJSON, one encoded chunk per spec (its line plus its impl lines)."""
+    async for spec in SpecRepository(session).stream_all(include_code=include_code, batch_size=batch_size):
+        records = [spec_record(spec)]
+        records.extend(impl_record(impl, include_code) for impl in sorted(spec.impls, key=lambda i: i.library_id))
+        yield "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in records).encode()
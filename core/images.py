@@ -177,15 +177,22 @@ def _text_advance(draw: ImageDraw.ImageDraw, text: str, font) -> int:
     return int(draw.textlength(text, font=font))
 
 
-# Optional: pngquant for better compression
-try:
-    import subprocess
+# Optional: pngquant for better compression (probed on first use, not at import:
+# the API imports this module but never optimizes PNGs)
+_HAS_PNGQUANT: bool | None = None
 
-    # `timeout=5` so a wedged binary can't block FastAPI startup forever
-    # (this runs at module import time → before app is serving).
-    _HAS_PNGQUANT = subprocess.run(["pngquant", "--version"], capture_output=True, timeout=5).returncode == 0
-except (FileNotFoundError, subprocess.SubprocessError, subprocess.TimeoutExpired):  # fmt: skip
-    _HAS_PNGQUANT = False
+
+def _has_pngquant() -> bool:
+    global _HAS_PNGQUANT
+    if _HAS_PNGQUANT is None:
+        import subprocess
+
+        try:
+            # `timeout=5` so a wedged binary can't block the caller forever
+            _HAS_PNGQUANT = subprocess.run(["pngquant", "--version"], capture_output=True, timeout=5).returncode == 0
+        except (FileNotFoundError, subprocess.SubprocessError):
+            _HAS_PNGQUANT = False
+    return _HAS_PNGQUANT
 
 
 def create_thumbnail(input_path: str | Path, output_path: str | Path, width: int = 1200) -> tuple[int, int]:
@@ -226,7 +233,7 @@ def optimize_png(input_path: str | Path, output_path: str | Path | None = None,
     output_path = Path(output_path) if output_path else input_path
     original_size = input_path.stat().st_size
 
-    if _HAS_PNGQUANT:
+    if _has_pngquant():
         import subprocess
 
         subprocess.run(
@@ -0,0 +1,360 @@
+"""
+In-process text search for anyplot.
+
+BM25-ranked inverted indexes over spec markdown and implementation code, used
+by the /search endpoints and the MCP search tool. Pure Python (no model
+downloads, no extra services) and serializable to JSON so the sync job can
+build and incrementally update them and the API can load them at start.
+"""
+
+import hashlib
+import html
+import json
+import math
+import re
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+
+# Identifier-ish tokens: words, snake_case names, numbers.
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+
+# Filler words that carry no signal in natural-language queries like
+# "show correlation between variables".
+STOPWORDS = frozenset(
+    {
+        "a",
+        "an",
+        "and",
+        "are",
+        "as",
+        "at",
+        "be",
+        "between",
+        "by",
+        "for",
+        "from",
+        "how",
+        "i",
+        "in",
+        "is",
+        "it",
+        "me",
+        "of",
+        "on",
+        "or",
+        "plot",
+        "show",
+        "that",
+        "the",
+        "to",
+        "with",
+    }
+)
+
+# Field weights for spec documents — a title hit should outrank a passing
+# mention in the description.
+SPEC_FIELD_WEIGHTS = {"title": 3, "tags": 2, "description": 1, "applications": 1, "data": 1, "notes": 1}
+
+# Case-preserving variant of _TOKEN_RE for locating matches in the original text.
+_WORD_RE = re.compile(r"[A-Za-z0-9_]+")
+
+
+def _stem(token: str) -> str:
+    """Strip common English plural/gerund suffixes ("variables" → "variable")."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 5 and token.endswith("ing"):
+        return token[:-3]
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Lowercase, split on non-identifier characters, stem, drop stopwords.
+
+    Stopwords are dropped after stemming so plurals go with them: "scatter
+    plots" and "scatter plot" both tokenize to ["scatter"].
+    """
+    if not text:
+        return []
+    stems = (_stem(t) for t in _TOKEN_RE.findall(text.lower()))
+    return [t for t in stems if t not in STOPWORDS]
+
+
+def tokenize_code(text: str | None) -> list[str]:
+    """Lowercase and split on non-identifier characters; no stopwords, no stemming.
+
+    Source code is not prose: `plot`, `show`, `is` and `in` are identifiers and
+    keywords worth finding, and `ax.plots` is not `ax.plot`.
+    """
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+# Tokenizers by name, as stored with a persisted index.
+TOKENIZERS: dict[str, Callable[[str | None], list[str]]] = {"text": tokenize, "code": tokenize_code}
+
+
+class SearchIndex:
+    """BM25 inverted index over small documents.
+
+    Postings map term -> {doc_id: term frequency}; each document keeps its
+    token length and an arbitrary JSON-serializable ``meta`` dict returned
+    with search hits. Documents and queries go through the same tokenizer,
+    named by *tokenizer* (see TOKENIZERS).
+
+    Example:
+        >>> index = SearchIndex()
+        >>> index.add("scatter-basic", "Basic scatter plot", {"title": "Basic Scatter"})
+        >>> index.search("scatter")
+        [('scatter-basic', ...)]
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, tokenizer: str = "text"):
+        self.k1 = k1
+        self.b = b
+        self.tokenizer = tokenizer
+        self._tokenize = TOKENIZERS[tokenizer]
+        self.postings: dict[str, dict[str, int]] = {}
+        self.doc_lengths: dict[str, int] = {}
+        self.meta: dict[str, dict[str, Any]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.doc_lengths
+
+    def add(self, doc_id: str, text: str, meta: dict[str, Any] | None = None) -> None:
+        """Index *text* under *doc_id*, replacing any previous version."""
+        self.remove(doc_id)
+        tokens = self._tokenize(text)
+        for term, tf in Counter(tokens).items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+        self.doc_lengths[doc_id] = len(tokens)
+        self.meta[doc_id] = meta or {}
+        self._total_length += len(tokens)
+
+    def remove(self, doc_id: str) -> bool:
+        """Drop *doc_id* from the index. Returns False if it was not indexed."""
+        length = self.doc_lengths.pop(doc_id, None)
+        if length is None:
+            return False
+        self.meta.pop(doc_id, None)
+        self._total_length -= length
+        empty = []
+        for term, docs in self.postings.items():
+            if docs.pop(doc_id, None) is not None and not docs:
+                empty.append(term)
+        for term in empty:
+            del self.postings[term]
+        return True
+
+    def search(
+        self, query: str, limit: int = 20, where: Callable[[dict[str, Any]], bool] | None = None
+    ) -> list[tuple[str, float]]:
+        """Return up to *limit* (doc_id, score) pairs, best first.
+
+        Args:
+            query: Free-text query (tokenized like the documents)
+            limit: Maximum number of hits
+            where: Optional predicate on a document's meta; non-matching documents are skipped
+        """
+        terms = set(self._tokenize(query))
+        n_docs = len(self.doc_lengths)
+        if not terms or not n_docs:
+            return []
+
+        avg_length = self._total_length / n_docs or 1.0
+        scores: dict[str, float] = {}
+        for term in terms:
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, tf in docs.items():
+                if where is not None and not where(self.meta[doc_id]):
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return sorted(scores.items(), key=lambda x: (-x[1], x[0]))[:limit]
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize to a JSON-compatible dict."""
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "tokenizer": self.tokenizer,
+            "postings": self.postings,
+            "doc_lengths": self.doc_lengths,
+            "meta": self.meta,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "SearchIndex":
+        """Inverse of :meth:`to_dict`."""
+        index = cls(k1=data["k1"], b=data["b"], tokenizer=data.get("tokenizer", "text"))
+        index.postings = data["postings"]
+        index.doc_lengths = data["doc_lengths"]
+        index.meta = data["meta"]
+        index._total_length = sum(index.doc_lengths.values())
+        return index
+
+    def save(self, path: Path) -> None:
+        """Write the index to *path* as JSON (parent directories are created)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), separators=(",", ":")), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> "SearchIndex":
+        """Read an index previously written by :meth:`save`."""
+        return cls.from_dict(json.loads(path.read_text(encoding="utf-8")))
+
+
+# =============================================================================
+# Spec documents
+# =============================================================================
+
+
+def flatten_tags(*tag_dicts: dict | None) -> list[str]:
+    """Collect the values of one or more {category: [values]} tag dicts, deduplicated, in order."""
+    seen: dict[str, None] = {}
+    for tags in tag_dicts:
+        for values in (tags or {}).values():
+            if isinstance(values, list):
+                seen.update((str(v), None) for v in values)
+    return list(seen)
+
+
+def spec_document(spec: dict[str, Any]) -> str:
+    """Build the weighted search text for a spec (the specification.md fields plus tags).
+
+    Fields are repeated according to SPEC_FIELD_WEIGHTS, which is how BM25
+    term frequency picks up the boost without a multi-field scorer.
+    """
+    fields = {
+        "title": spec.get("title") or "",
+        "tags": " ".join(tag.replace("-", " ") for tag in flatten_tags(spec.get("tags"))),
+        "description": spec.get("description") or "",
+        "applications": " ".join(spec.get("applications") or []),
+        "data": " ".join(spec.get("data") or []),
+        "notes": " ".join(spec.get("notes") or []),
+    }
+    return " ".join(" ".join([text] * SPEC_FIELD_WEIGHTS[name]) for name, text in fields.items())
+
+
+def build_spec_index(specs: list[dict[str, Any]]) -> SearchIndex:
+    """Build a spec index from plain dicts (id, title, description, applications, data, notes, tags).
+
+    Accepts dicts rather than ORM objects so the sync job can index the parsed
+    plot directories directly.
+    """
+    index = SearchIndex()
+    for spec in specs:
+        index.add(spec["id"], spec_document(spec), {"title": spec["title"], "description": spec.get("description")})
+    return index
+
+
+# =============================================================================
+# Code documents
+# =============================================================================
+
+
+def code_doc_id(spec_id: str, library_id: str) -> str:
+    """Document id for an implementation in the code index."""
+    return f"{spec_id}/{library_id}"
+
+
+def content_hash(text: str) -> str:
+    """Short, stable fingerprint used to skip re-indexing unchanged code."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def update_code_index(index: SearchIndex, impls: list[dict[str, Any]]) -> dict[str, int]:
+    """Bring *index* in line with *impls*, re-tokenizing only code that changed.
+
+    Each impl dict carries spec_id, library_id, code and tags (flattened spec
+    and impl tag values, used for filtering). Documents whose code hash is
+    unchanged only get their meta refreshed; documents not in *impls* are
+    removed. *index* must use the code tokenizer.
+
+    Returns:
+        Counts of added, updated, unchanged and removed documents
+    """
+    if index.tokenizer != "code":
+        raise ValueError(f"code index must use the code tokenizer, not {index.tokenizer!r}")
+    stats = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+    seen = set()
+    for impl in impls:
+        code = impl.get("code")
+        if not code:
+            continue
+        doc_id = code_doc_id(impl["spec_id"], impl["library_id"])
+        seen.add(doc_id)
+        meta = {
+            "spec_id": impl["spec_id"],
+            "library": impl["library_id"],
+            "tags": list(impl.get("tags") or []),
+            "hash": content_hash(code),
+        }
+        if doc_id in index and index.meta[doc_id].get("hash") == meta["hash"]:
+            index.meta[doc_id] = meta
+            stats["unchanged"] += 1
+            continue
+        stats["updated" if doc_id in index else "added"] += 1
+        index.add(doc_id, code, meta)
+
+    for doc_id in [d for d in index.doc_lengths if d not in seen]:
+        index.remove(doc_id)
+        stats["removed"] += 1
+    return stats
+
+
+def build_code_index(impls: list[dict[str, Any]]) -> SearchIndex:
+    """Build a code index from plain impl dicts (see update_code_index)."""
+    index = SearchIndex(tokenizer="code")
+    update_code_index(index, impls)
+    return index
+
+
+def highlight_snippet(text: str, query: str, context_lines: int = 1, max_chars: int = 400) -> str:
+    """Extract the best-matching lines of *text* with query terms wrapped in <mark>.
+
+    The line matching the most distinct query terms is shown with
+    *context_lines* of surrounding code. Terms are matched like the code
+    index matches them (tokenize_code). The snippet is HTML-escaped, so the
+    only markup in the result is the <mark> tags.
+    """
+    terms = set(tokenize_code(query))
+    lines = text.splitlines()
+    if not lines:
+        return ""
+
+    def _line_terms(line: str) -> int:
+        return len(terms.intersection(tokenize_code(line)))
+
+    best = max(range(len(lines)), key=lambda i: (_line_terms(lines[i]), -i))
+    window = "\n".join(lines[max(0, best - context_lines) : best + context_lines + 1])[:max_chars]
+
+    parts = []
+    pos = 0
+    for match in _WORD_RE.finditer(window):
+        word = match.group()
+        if word.lower() not in terms:
+            continue
+        parts.append(html.escape(window[pos : match.start()]))
+        parts.append(f"<mark>{html.escape(word)}</mark>")
+        pos = match.end()
+    parts.append(html.escape(window[pos:]))
+    return "".join(parts)
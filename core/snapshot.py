@@ -0,0 +1,165 @@
+"""
+Versioned catalog snapshot for instant API cold starts.
+
+The sync job writes the listing surface of the catalog (every spec with its
+implementations and library, as returned by ``SpecRepository.get_all()``, plus
+all libraries) to a single msgpack file. The file also records a fingerprint
+of the database state it was taken from. A new API instance rebuilds
+transient ORM objects from it and warms its response cache without reading
+the catalog tables. Confirming that the snapshot is current then takes one
+aggregate query (``fingerprint_query``) instead of full-table loads.
+
+Deferred columns (implementation code and the long review fields) are not
+included; ``has_code`` is stored instead, as the listing queries load it.
+
+Layout (msgpack map)::
+
+    {"format": 1, "created": "<iso>", "fingerprint": {...},
+     "libraries": [{column: value}, ...],
+     "specs": [{column: value, ..., "impls": [{column: value, ..., "has_code": bool}]}]}
+"""
+
+import os
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import msgpack
+from sqlalchemy import Column, DateTime, Select, func, select
+from sqlalchemy.orm.attributes import set_committed_value
+
+from core.database.models import Impl, Library, Spec
+
+
+SNAPSHOT_FORMAT = 1
+
+
+def _columns(model: type) -> list[tuple[str, bool]]:
+    """(attribute key, is DateTime) for the model's non-deferred table columns."""
+    mapper = model.__mapper__  # type: ignore[attr-defined]
+    columns = []
+    for prop in mapper.column_attrs:
+        column = prop.columns[0]
+        if prop.deferred or not isinstance(column, Column) or column.table is not mapper.local_table:
+            continue
+        columns.append((prop.key, isinstance(column.type, DateTime)))
+    return columns
+
+
+def _to_row(obj: Any, columns: list[tuple[str, bool]]) -> dict[str, Any]:
+    row = {}
+    for key, is_datetime in columns:
+        value = getattr(obj, key)
+        row[key] = value.isoformat() if is_datetime and value is not None else value
+    return row
+
+
+def _from_row(model: type, row: dict[str, Any], columns: list[tuple[str, bool]]) -> Any:
+    # Fill the instance dict directly, as the ORM's own row loader does: going through the
+    # instrumented constructor and setters (change events) costs ~70 µs per object
+    obj = model.__mapper__.class_manager.new_instance()  # type: ignore[attr-defined]
+    values = obj.__dict__
+    for key, is_datetime in columns:
+        value = row.get(key)
+        values[key] = datetime.fromisoformat(value) if is_datetime and value is not None else value
+    return obj
+
+
+def fingerprint_query() -> Select:
+    """One-row summary of the catalog tables; it changes with every sync (see ``fingerprint``)."""
+    return select(
+        select(func.count()).select_from(Spec).scalar_subquery(),
+        select(func.max(Spec.updated_at)).scalar_subquery(),
+        select(func.count()).select_from(Impl).scalar_subquery(),
+        select(func.max(Impl.updated_at)).scalar_subquery(),
+        select(func.count()).select_from(Library).scalar_subquery(),
+    )
+
+
+def fingerprint(row: Sequence[Any]) -> dict[str, Any]:
+    """Comparable form of a ``fingerprint_query`` result row.
+
+    The sync job stamps ``updated_at`` on every row it upserts, so any sync moves
+    the maxima; removals also change the counts.
+    """
+    specs, specs_updated, impls, impls_updated, libraries = row
+    return {
+        "specs": specs,
+        "specs_updated": specs_updated.isoformat() if specs_updated else None,
+        "impls": impls,
+        "impls_updated": impls_updated.isoformat() if impls_updated else None,
+        "libraries": libraries,
+    }
+
+
+class CatalogSnapshot:
+    """Specs (with impls and libraries attached) and libraries as transient ORM objects."""
+
+    __slots__ = ("specs", "libraries", "fingerprint", "created")
+
+    def __init__(
+        self, specs: list[Spec], libraries: list[Library], fingerprint: dict[str, Any], created: datetime
+    ) -> None:
+        self.specs = specs
+        self.libraries = libraries
+        self.fingerprint = fingerprint
+        self.created = created
+
+    @classmethod
+    def from_orm(cls, specs: Sequence[Spec], libraries: Sequence[Library], fingerprint: dict) -> "CatalogSnapshot":
+        """Snapshot of loaded ORM objects (specs with ``impls`` and ``impl.library`` loaded)."""
+        return cls(list(specs), list(libraries), fingerprint, datetime.now(timezone.utc))
+
+    def dumps(self) -> bytes:
+        spec_columns, impl_columns, library_columns = _columns(Spec), _columns(Impl), _columns(Library)
+        specs = []
+        for spec in self.specs:
+            row = _to_row(spec, spec_columns)
+            row["impls"] = [{**_to_row(impl, impl_columns), "has_code": bool(impl.has_code)} for impl in spec.impls]
+            specs.append(row)
+        return msgpack.packb(
+            {
+                "format": SNAPSHOT_FORMAT,
+                "created": self.created.isoformat(),
+                "fingerprint": self.fingerprint,
+                "libraries": [_to_row(library, library_columns) for library in self.libraries],
+                "specs": specs,
+            }
+        )
+
+    @classmethod
+    def loads(cls, data: bytes) -> "CatalogSnapshot":
+        """Rebuild the snapshot; raises ValueError for anything but a current-format snapshot map."""
+        payload = msgpack.unpackb(data)
+        if not isinstance(payload, dict):
+            raise ValueError(f"catalog snapshot is not a map: {type(payload).__name__}")
+        if payload.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"unsupported catalog snapshot format: {payload.get('format')!r}")
+        spec_columns, impl_columns, library_columns = _columns(Spec), _columns(Impl), _columns(Library)
+        libraries = [_from_row(Library, row, library_columns) for row in payload["libraries"]]
+        by_id = {library.id: library for library in libraries}
+        specs = []
+        for row in payload["specs"]:
+            spec = _from_row(Spec, row, spec_columns)
+            impls = []
+            for impl_row in row["impls"]:
+                impl = _from_row(Impl, impl_row, impl_columns)
+                impl.__dict__["has_code"] = impl_row["has_code"]
+                set_committed_value(impl, "library", by_id.get(impl.library_id))
+                set_committed_value(impl, "spec", spec)
+                impls.append(impl)
+            set_committed_value(spec, "impls", impls)
+            specs.append(spec)
+        return cls(specs, libraries, payload["fingerprint"], datetime.fromisoformat(payload["created"]))
+
+    def save(self, path: Path) -> None:
+        """Write atomically, so an instance starting mid-sync never reads a partial file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(self.dumps())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "CatalogSnapshot":
+        return cls.loads(path.read_bytes())
@@ -0,0 +1,100 @@
+"""
+Per-request stage timings collected through a context variable.
+
+The API's ServerTimingMiddleware (api/timing.py) opens a timing dict for each
+request; code on the request path adds milliseconds to named stages with
+``add()`` or ``span()``. Outside a request (scripts, the sync job) there is no
+open dict and both are no-ops, so instrumented code paths stay shared.
+
+Stages recorded here:
+  - ``db``:    SQL round-trips (cursor execute, incl. fetching the rows)
+  - ``query``: outermost ORM ``Session.execute`` calls, i.e. ``db`` plus ORM
+               hydration and eager loading; the API reports ``orm = query - db``
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+_timings: ContextVar[dict[str, float] | None] = ContextVar("request_timings", default=None)
+
+
+def begin() -> Token:
+    """Open an empty timing dict for the current context (one request)."""
+    return _timings.set({})
+
+
+def end(token: Token) -> None:
+    """Close the timing dict opened by begin()."""
+    _timings.reset(token)
+
+
+def detach() -> None:
+    """Stop recording into the request's timings from this task.
+
+    Background tasks copy the request's context and would otherwise keep adding
+    to its stages (call first thing in the task; the task's own context copy is
+    the only one affected).
+    """
+    _timings.set(None)
+
+
+def current() -> dict[str, float] | None:
+    """The open timing dict (stage -> ms), or None outside a request."""
+    return _timings.get()
+
+
+def add(stage: str, ms: float) -> None:
+    """Add *ms* to *stage* of the current request, if any."""
+    timings = _timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + ms
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time the enclosed block into *stage* (accumulates across repeated spans)."""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + (time.perf_counter() - start) * 1000
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _timings.get() is not None:
+        conn.info.setdefault("timing_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    starts = conn.info.get("timing_start")
+    if starts:
+        add("db", (time.perf_counter() - starts.pop()) * 1000)
+
+
+def _handle_error(context) -> None:
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    starts = context.connection.info.get("timing_start") if context.connection is not None else None
+    if starts:
+        add("db", (time.perf_counter() - starts.pop()) * 1000)
+
+
+def instrument_engines() -> None:
+    """Record the ``db`` stage for statements of every SQLAlchemy engine (idempotent).
+
+    Listens on the Engine class, so engines created later (replica, MCP) are
+    covered too; outside a request the listeners return after one lookup.
+    """
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the API handlers against a synthetic catalog.
+
+Seeds a database with a reproducible synthetic catalog at 1x, 10x or 100x the
+current size (327 specs, ~2.7k implementations), then times the hot paths
+through the full ASGI app (middleware, handler, serialization) without any
+network:
+
+  - filter:    /plots/filter unfiltered, by tag, by library + impl tag, paged
+  - dashboard: /insights/dashboard
+  - related:   /insights/related/{spec_id}
+  - sitemap:   /sitemap.xml and one shard
+  - spec:      /specs/{spec_id}
+  - mcp:       list_specs, search_specs_by_tags, get_spec_detail, get_implementation
+  - og:        branded image and collage rendering (no cache layer)
+
+``cold`` cases clear the response cache before every iteration (first request
+after a deploy or a sync); ``warm`` cases are served from it. Results can be
+stored as a baseline JSON; later runs compare against it and exit with status 1
+when a case's median is slower than the baseline by more than --threshold.
+Baselines are machine-specific: compare runs from the same machine.
+
+The SQLite catalog is cached in .benchmarks/ and reused across runs; 100x takes
+a few minutes to seed and ~1 GB of disk. --database-url targets a scratch
+PostgreSQL database instead (seeded when empty; --reseed drops all tables).
+
+Usage:
+    uv run python scripts/bench_api.py --save              # 1x on SQLite, write the baseline
+    uv run python scripts/bench_api.py                     # compare with it (exit 1 on regression)
+    uv run python scripts/bench_api.py --scale 10 --only filter,mcp
+    uv run python scripts/bench_api.py --scale 100 --database-url postgresql+asyncpg://localhost/anyplot_bench
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import string
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+BENCH_DIR = ROOT / ".benchmarks"
+
+# Current catalog size (1x): specs, libraries, and the share of specs each library implements
+SPECS_1X = 327
+LIBRARIES = ["altair", "bokeh", "highcharts", "letsplot", "matplotlib", "plotly", "plotnine", "pygal", "seaborn"]
+IMPL_COVERAGE = 0.92
+
+# Distinct values per tag category, as in the current catalog
+SPEC_TAG_VOCAB = {"plot_type": 176, "data_type": 31, "domain": 38, "features": 229}
+IMPL_TAG_VOCAB = {"dependencies": 21, "techniques": 38, "patterns": 14, "dataprep": 21, "styling": 12}
+
+SEED = 20260101
+
+
+# ---------------------------------------------------------------------------
+# Synthetic catalog
+# ---------------------------------------------------------------------------
+
+
+def _tags(rng: random.Random, vocab: dict[str, int], per_category: tuple[int, int]) -> dict[str, list[str]]:
+    """Tag values per category, skewed towards the first values like the real catalog (Zipf-like)."""
+    tags = {}
+    for category, size in vocab.items():
+        values = [f"{category.replace('_', '-')}-{i}" for i in range(size)]
+        weights = [1 / (i + 1) for i in range(size)]
+        picked = set(rng.choices(values, weights=weights, k=rng.randint(*per_category)))
+        tags[category] = sorted(picked)
+    return tags
+
+
+def _code(rng: random.Random, library: str, spec_id: str) -> str:
+    lines = [f'""" {spec_id}: synthetic {library} implementation """', f"import {library}", "import numpy as np", ""]
+    lines += [
+        f"values_{i} = np.random.default_rng({rng.randint(0, 999)}).normal(size=100)  # noqa: F841" for i in range(8)
+    ]
+    lines += ["", f"fig = {library}.figure(width=1600, height=900)", 'fig.title("Synthetic plot")', "fig.save()"]
+    return "\n".join(lines) + "\n"
+
+
+def spec_id_at(i: int) -> str:
+    """ID of the i-th synthetic spec; spread over first letters like real IDs (one sitemap shard each)."""
+    return f"{string.ascii_lowercase[i % 26]}-synthetic-{i:05d}"
+
+
+def generate_catalog(scale: int) -> tuple[list[dict], list[dict]]:
+    """Deterministic spec and impl rows (dicts of column values) for *scale* x the current catalog."""
+    rng = random.Random(SEED)
+    start = datetime(2025, 1, 1)
+    specs, impls = [], []
+    for i in range(SPECS_1X * scale):
+        spec_id = spec_id_at(i)
+        created = start + timedelta(hours=rng.randint(0, 24 * 365))
+        specs.append(
+            {
+                "id": spec_id,
+                "title": f"Synthetic Plot {i}",
+                "description": f"Synthetic specification {i} for benchmarking. " * 6,
+                "applications": [f"Use case {j}" for j in range(rng.randint(2, 4))],
+                "data": [f"column_{j} (numeric)" for j in range(rng.randint(2, 5))],
+                "notes": ["Keep the layout readable"],
+                "created": created,
+                "updated": created + timedelta(days=rng.randint(0, 60)),
+                "issue": 1000 + i,
+                "suggested": "benchmark",
+                "tags": _tags(rng, SPEC_TAG_VOCAB, (1, 4)),
+            }
+        )
+        for library in LIBRARIES:
+            # Every spec has a matplotlib implementation (the reference library)
+            if library != "matplotlib" and rng.random() > IMPL_COVERAGE:
+                continue
+            base = f"https://storage.googleapis.com/anyplot-images/plots/{spec_id}/{library}"
+            score = round(rng.triangular(60, 100, 92))
+            impls.append(
+                {
+                    "spec_id": spec_id,
+                    "library_id": library,
+                    "language_id": "python",
+                    "code": _code(rng, library, spec_id),
+                    "preview_url_light": f"{base}/plot-light.png",
+                    "preview_url_dark": f"{base}/plot-dark.png",
+                    "preview_html_light": f"{base}/plot-light.html" if rng.random() < 0.6 else None,
+                    "preview_html_dark": f"{base}/plot-dark.html" if rng.random() < 0.6 else None,
+                    "python_version": "3.14.3",
+                    "library_version": "1.0.0",
+                    "quality_score": score,
+                    "generated_at": created,
+                    "updated": created + timedelta(days=rng.randint(0, 30)),
+                    "generated_by": "benchmark",
+                    "review_strengths": [f"Strength {j}" for j in range(rng.randint(2, 5))],
+                    "review_weaknesses": [f"Weakness {j}" for j in range(rng.randint(1, 3))],
+                    "review_image_description": "The plot shows synthetic data. " * 10,
+                    "review_criteria_checklist": {"visual_quality": {"score": score // 4, "max": 30}},
+                    "review_verdict": "APPROVED" if score >= 90 else "REJECTED",
+                    "impl_tags": _tags(rng, IMPL_TAG_VOCAB, (0, 3)),
+                }
+            )
+    return specs, impls
+
+
+async def seed(url: str, scale: int, reseed: bool) -> int:
+    """Create and fill the catalog unless the database already holds it; returns the spec count."""
+    from sqlalchemy import func, insert, select
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from core.constants import LANGUAGES_METADATA, LIBRARIES_METADATA
+    from core.database.models import Base, Impl, Language, Library, Spec
+
+    expected = SPECS_1X * scale
+    engine = create_async_engine(url)
+    try:
+        async with engine.begin() as conn:
+            if reseed:
+                await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+            existing = (await conn.execute(select(func.count()).select_from(Spec))).scalar_one()
+            if existing:
+                if existing != expected:
+                    raise SystemExit(f"Database holds {existing} specs, expected {expected} (use --reseed)")
+                return existing
+
+            print(f"Seeding {expected} specs ({scale}x)...", file=sys.stderr)
+            await conn.execute(
+                insert(Language),
+                [{k: lang[k] for k in ("id", "name", "file_extension")} for lang in LANGUAGES_METADATA],
+            )
+            await conn.execute(
+                insert(Library),
+                [{k: lib[k] for k in ("id", "name", "language_id") if k in lib} for lib in LIBRARIES_METADATA],
+            )
+            specs, impls = generate_catalog(scale)
+            for batch in range(0, len(specs), 2000):
+                await conn.execute(insert(Spec), specs[batch : batch + 2000])
+            for batch in range(0, len(impls), 2000):
+                await conn.execute(insert(Impl), impls[batch : batch + 2000])
+            return len(specs)
+    finally:
+        await engine.dispose()
+
+
+# ---------------------------------------------------------------------------
+# Cases
+# ---------------------------------------------------------------------------
+
+
+class Case:
+    """One timed operation; *reset* runs (untimed) before every cold iteration."""
+
+    __slots__ = ("name", "mode", "run", "reset")
+
+    def __init__(
+        self, name: str, mode: str, run: Callable[[int], Awaitable[Any]], reset: Callable[[], None] | None = None
+    ) -> None:
+        self.name = name
+        self.mode = mode
+        self.run = run
+        self.reset = reset
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}:{self.mode}"
+
+
+def _png(seed: int) -> bytes:
+    from PIL import Image
+
+    rng = random.Random(seed)
+    image = Image.effect_mandelbrot((1600, 900), (-2.0, -1.0, 1.0, 1.0), rng.randint(20, 60)).convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def build_cases(client, spec_ids: list[str]) -> list[Case]:
+    """All cases; route cases go through the ASGI app via *client*, the others call the code directly."""
+    from api import cache
+    from api.mcp import server as mcp
+    from api.routers import seo
+    from core import images
+
+    def spec_at(i: int) -> str:
+        return spec_ids[(i * 7919) % len(spec_ids)]  # stride through the catalog
+
+    def get(path: str | Callable[[int], str], **params: str) -> Callable[[int], Awaitable[Any]]:
+        async def run(i: int) -> None:
+            response = await client.get(path(i) if callable(path) else path, params=params)
+            response.raise_for_status()
+
+        return run
+
+    def reset_sitemap() -> None:
+        cache.clear_cache()
+        seo._sitemap_shards.clear()  # rebuild every shard, as on the first request after a deploy
+
+    routes = [
+        ("filter/all", get("/plots/filter")),
+        ("filter/tag", get("/plots/filter", plot="plot-type-0")),
+        ("filter/lib+impl-tag", get("/plots/filter", lib="matplotlib", tech="techniques-1")),
+        ("filter/page", get("/plots/filter", limit="48", fields="images")),
+        ("dashboard", get("/insights/dashboard")),
+        ("related", get(lambda i: f"/insights/related/{spec_at(i)}")),
+        ("sitemap/index", get("/sitemap.xml")),
+        ("sitemap/shard", get("/sitemaps/specs-a.xml.gz")),
+        ("spec", get(lambda i: f"/specs/{spec_at(i)}")),
+    ]
+    mcp_tools = [
+        ("mcp/list_specs", lambda i: mcp.list_specs(limit=100)),
+        ("mcp/search_by_tags", lambda i: mcp.search_specs_by_tags(plot_type=["plot-type-0"], library=["plotly"])),
+        ("mcp/spec_detail", lambda i: mcp.get_spec_detail(spec_at(i))),
+        ("mcp/implementation", lambda i: mcp.get_implementation(spec_at(i), "matplotlib")),
+    ]
+
+    cases = []
+    for name, run in routes + mcp_tools:
+        reset = reset_sitemap if name.startswith("sitemap") else cache.clear_cache
+        cases.append(Case(name, "cold", run, reset))
+        cases.append(Case(name, "warm", run))
+
+    plot = _png(1)
+    plots = [_png(seed) for seed in range(6)]
+
+    async def branded(i: int) -> None:
+        images.create_branded_og_image(plot, spec_id=spec_at(i), library="matplotlib")
+
+    async def collage(i: int) -> None:
+        images.create_og_collage(plots, labels=LIBRARIES[:6], spec_id=spec_at(i))
+
+    cases.append(Case("og/branded", "render", branded))
+    cases.append(Case("og/collage", "render", collage))
+    return cases
+
+
+async def time_case(case: Case, iterations: int) -> dict:
+    """Median, p95 and min in ms over *iterations* runs (after one untimed warm-up run).
+
+    Cold runs stride through the catalog; warm runs repeat the warm-up's input so they hit the cache.
+    """
+    if case.reset:
+        case.reset()
+    await case.run(0)
+    samples = []
+    for i in range(1, iterations + 1):
+        if case.reset:
+            case.reset()
+        start = time.perf_counter()
+        await case.run(i if case.mode != "warm" else 0)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "min_ms": round(samples[0], 3),
+        "iterations": iterations,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Baseline
+# ---------------------------------------------------------------------------
+
+
+def compare(results: dict[str, dict], baseline: dict, threshold: float, noise_ms: float) -> list[str]:
+    """Names of cases whose median regressed by more than *threshold* (and more than *noise_ms*)."""
+    regressions = []
+    for key, result in results.items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        slower = result["median_ms"] - base["median_ms"]
+        if slower > noise_ms and result["median_ms"] > base["median_ms"] * (1 + threshold):
+            regressions.append(key)
+    return regressions
+
+
+def print_table(results: dict[str, dict], baseline: dict | None, regressions: list[str]) -> None:
+    print(f"{'case':<32} {'median ms':>10} {'p95 ms':>10} {'min ms':>10} {'baseline':>10} {'change':>8}")
+    print("-" * 85)
+    for key, result in results.items():
+        base = (baseline or {}).get("results", {}).get(key)
+        base_col = f"{base['median_ms']:>10.3f}" if base else f"{'-':>10}"
+        change = f"{(result['median_ms'] / base['median_ms'] - 1) * 100:>+7.1f}%" if base else f"{'':>8}"
+        flag = "  REGRESSION" if key in regressions else ""
+        print(
+            f"{key:<32} {result['median_ms']:>10.3f} {result['p95_ms']:>10.3f} {result['min_ms']:>10.3f} "
+            f"{base_col} {change}{flag}"
+        )
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+
+async def run(args: argparse.Namespace, url: str) -> dict[str, dict]:
+    spec_count = await seed(url, args.scale, args.reseed)
+
+    # The app modules read DATABASE_URL at import time (set in main)
+    from httpx import ASGITransport, AsyncClient
+
+    from api.main import app  # configures INFO logging; keep the output to the results
+
+    logging.getLogger().setLevel(logging.WARNING)
+    from api.mcp.server import close_mcp_engine
+    from core import images
+    from core.database import close_db, init_db
+
+    # OG rendering offline: cached or system fonts, never a GCS download attempt per render
+    font_path = images._get_monolisa_font_path
+    images._get_monolisa_font_path = lambda local_only=False, italic=False: font_path(local_only=True, italic=italic)
+
+    await init_db()
+    spec_ids = [spec_id_at(i) for i in range(spec_count)]
+    results = {}
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            for case in build_cases(client, spec_ids):
+                if args.only and not any(case.name.startswith(prefix) for prefix in args.only):
+                    continue
+                iterations = args.iterations * 10 if case.mode == "warm" else args.iterations
+                results[case.key] = await time_case(case, iterations)
+                print(f"  {case.key:<32} {results[case.key]['median_ms']:>10.3f} ms", file=sys.stderr)
+    finally:
+        await close_mcp_engine()
+        await close_db()
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, choices=[1, 10, 100], default=1, help="catalog size (default: 1x)")
+    parser.add_argument("--database-url", help="scratch PostgreSQL (postgresql+asyncpg://...); default: SQLite file")
+    parser.add_argument("--reseed", action="store_true", help="drop all tables and seed the catalog again")
+    parser.add_argument("--iterations", type=int, default=20, help="runs per cold case; warm cases run 10x")
+    parser.add_argument("--only", type=lambda s: s.split(","), help="comma-separated case prefixes (filter,mcp,...)")
+    parser.add_argument("--baseline", type=Path, help="baseline JSON (default: .benchmarks/api-<scale>x-<db>.json)")
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed median slowdown (default: 0.25)")
+    parser.add_argument("--noise-ms", type=float, default=0.2, help="ignore slowdowns below this (default: 0.2)")
+    args = parser.parse_args()
+
+    BENCH_DIR.mkdir(exist_ok=True)
+    url = args.database_url or f"sqlite+aiosqlite:///{BENCH_DIR / f'catalog-{args.scale}x.sqlite'}"
+    dialect = url.split("+", 1)[0].split(":", 1)[0]
+    baseline_path = args.baseline or BENCH_DIR / f"api-{args.scale}x-{dialect}.json"
+
+    os.environ["DATABASE_URL"] = url
+    os.environ["ENVIRONMENT"] = "benchmark"  # no SQL echo (development) and no NullPool (test)
+    results = asyncio.run(run(args, url))
+
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() and not args.save else None
+    regressions = compare(results, baseline, args.threshold, args.noise_ms) if baseline else []
+    print()
+    print_table(results, baseline, regressions)
+
+    if args.save:
+        baseline_path.write_text(
+            json.dumps(
+                {
+                    "scale": args.scale,
+                    "database": dialect,
+                    "python": platform.python_version(),
+                    "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "results": results,
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+        print(f"\nBaseline written to {baseline_path}")
+    elif baseline is None:
+        print(f"\nNo baseline at {baseline_path} (run with --save to create it)")
+    elif regressions:
+        print(f"\n{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Micro-benchmark for the hot repository lookups (spec by id, impl code).
+Compares a plain select() rebuilt on every call with the lambda statements in
+core.database.repositories, against an in-memory SQLite catalog.
+
+Two numbers per query:
+  - cache key: statement construction + SQL compilation cache key (pure Python,
+    the overhead lambda statements remove; identical on PostgreSQL)
+  - execute:   full session.execute() round-trip incl. ORM loading
+
+Usage:
+    uv run python scripts/bench_queries.py
+    uv run python scripts/bench_queries.py --iterations 5000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload, undefer
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.database.models import Base, Impl, Language, Library, Spec  # noqa: E402
+from core.database.repositories import _impl_code_stmt, _spec_by_id_stmt  # noqa: E402
+
+
+SPECS = 50
+LIBRARIES = ["matplotlib", "seaborn", "plotly", "bokeh", "altair"]
+
+
+def plain_spec_by_id(spec_id: str):
+    return (
+        select(Spec)
+        .where(Spec.id == spec_id)
+        .options(
+            selectinload(Spec.impls).selectinload(Impl.library),
+            selectinload(Spec.impls).undefer(Impl.review_image_description).undefer(Impl.review_criteria_checklist),
+        )
+    )
+
+
+def plain_impl_code(spec_id: str, library_id: str, language_id: str):
+    return (
+        select(Impl)
+        .where(Impl.spec_id == spec_id, Impl.library_id == library_id, Impl.language_id == language_id)
+        .options(undefer(Impl.code))
+    )
+
+
+CASES = [
+    ("spec by id", plain_spec_by_id, _spec_by_id_stmt, lambda i: (f"spec-{i % SPECS}",)),
+    (
+        "impl code",
+        plain_impl_code,
+        _impl_code_stmt,
+        lambda i: (f"spec-{i % SPECS}", LIBRARIES[i % len(LIBRARIES)], "python"),
+    ),
+]
+
+
+async def seed(session: AsyncSession) -> None:
+    """Insert a small synthetic catalog: SPECS specs x len(LIBRARIES) impls."""
+    session.add(Language(id="python", name="Python", file_extension=".py"))
+    session.add_all(Library(id=lib, name=lib.title()) for lib in LIBRARIES)
+    for i in range(SPECS):
+        session.add(Spec(id=f"spec-{i}", title=f"Spec {i}"))
+        session.add_all(Impl(spec_id=f"spec-{i}", library_id=lib, code=f"import {lib}\n" * 40) for lib in LIBRARIES)
+    await session.commit()
+
+
+def bench_cache_key(build, args_for, iterations: int) -> float:
+    """Return µs per statement build + cache key generation."""
+    start = time.perf_counter()
+    for i in range(iterations):
+        build(*args_for(i))._generate_cache_key()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def bench_execute(session_factory, build, args_for, iterations: int) -> float:
+    """Return µs per session.execute() of the built statement (fresh session per call, like a request)."""
+    start = time.perf_counter()
+    for i in range(iterations):
+        async with session_factory() as session:
+            (await session.execute(build(*args_for(i)))).scalars().first()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def main(iterations: int) -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        await seed(session)
+
+    print(f"{iterations} iterations, {SPECS} specs x {len(LIBRARIES)} libraries (sqlite in-memory)\n")
+    print(f"{'query':<12} {'variant':<8} {'cache key µs':>14} {'execute µs':>12}")
+    print("-" * 50)
+    for name, plain, cached, args_for in CASES:
+        for variant, build in (("plain", plain), ("lambda", cached)):
+            # warm up: populate the compiled-SQL and lambda caches
+            bench_cache_key(build, args_for, 10)
+            await bench_execute(session_factory, build, args_for, 10)
+
+            key_us = bench_cache_key(build, args_for, iterations)
+            exec_us = await bench_execute(session_factory, build, args_for, max(iterations // 10, 1))
+            print(f"{name:<12} {variant:<8} {key_us:>14.1f} {exec_us:>12.1f}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000, help="statements per variant (default: 2000)")
+    asyncio.run(main(parser.parse_args().iterations))
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: time from process start to the API's first bytes.
+
+Starts the API under uvicorn several times, as Cloud Run does on a new
+instance, and measures for each start:
+
+  - import:   `import api.main` in a fresh interpreter (the module-level cost)
+  - ready:    process spawn -> first byte of GET /health (imports, lifespan, bind)
+  - <path>:   first request to each --paths entry right after that (empty
+              response cache, pools just created), time to first byte
+
+Runs against the synthetic SQLite catalog from scripts/bench_api.py by default
+(seed it with that script first), or --database-url. Results share
+bench_api.py's baseline format: --save writes .benchmarks/startup-<db>.json,
+later runs compare against it and exit with status 1 when a case's median is
+slower by more than --threshold. --importtime lists the slowest imports.
+
+Usage:
+    uv run python scripts/bench_startup.py --save
+    uv run python scripts/bench_startup.py
+    uv run python scripts/bench_startup.py --runs 10 --paths /health,/specs,/plots/filter --importtime
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+from bench_api import BENCH_DIR, ROOT, compare, print_table
+
+
+READY_TIMEOUT = 60.0
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _first_byte(client: httpx.Client, url: str) -> float:
+    """Seconds until the response headers arrive; raises on connection errors and non-2xx."""
+    start = time.perf_counter()
+    with client.stream("GET", url) as response:
+        elapsed = time.perf_counter() - start
+        response.raise_for_status()
+        response.read()
+    return elapsed
+
+
+def measure_import(env: dict[str, str]) -> float:
+    """Seconds for `import api.main` in a fresh interpreter."""
+    code = "import time; t = time.perf_counter(); import api.main; print(time.perf_counter() - t)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def measure_start(env: dict[str, str], paths: list[str]) -> dict[str, float]:
+    """One cold start: seconds to the first /health byte, then the first byte of each path."""
+    port = _free_port()
+    command = [sys.executable, "-m", "uvicorn", "api.main:app", "--host", "127.0.0.1", "--port", str(port)]
+    command += ["--log-level", "warning"]
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        with httpx.Client(timeout=READY_TIMEOUT) as client:
+            while True:
+                if process.poll() is not None:
+                    sys.exit(f"uvicorn exited with {process.returncode}:\n{process.stderr.read().decode()}")
+                if time.perf_counter() - start > READY_TIMEOUT:
+                    sys.exit(f"API not ready after {READY_TIMEOUT:.0f}s")
+                try:
+                    _first_byte(client, f"{base}/health")
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.005)
+            timings = {"ready": time.perf_counter() - start}
+            for path in paths:
+                timings[path] = _first_byte(client, base + path)
+        return timings
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def slowest_imports(env: dict[str, str], count: int = 15) -> list[tuple[str, float]]:
+    """(module, cumulative ms) of the slowest top-level imports under `import api.main`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api.main"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit() and module.startswith("  ") and not module.startswith("    "):
+            times.append((module.strip(), int(cumulative) / 1000))  # direct imports of api.main
+    return sorted(times, key=lambda item: -item[1])[:count]
+
+
+def summarize(samples: list[float]) -> dict:
+    samples = sorted(sample * 1000 for sample in samples)
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "min_ms": round(samples[0], 3),
+        "iterations": len(samples),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="database to start against (default: the bench_api 1x SQLite catalog)")
+    parser.add_argument("--runs", type=int, default=5, help="cold starts to measure (default: 5)")
+    parser.add_argument(
+        "--paths", type=lambda s: s.split(","), default=["/specs", "/plots/filter"], help="first requests to time"
+    )
+    parser.add_argument("--importtime", action="store_true", help="also list the slowest imports of api.main")
+    parser.add_argument("--baseline", type=Path, help="baseline JSON (default: .benchmarks/startup-<db>.json)")
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed median slowdown (default: 0.25)")
+    parser.add_argument("--noise-ms", type=float, default=5.0, help="ignore slowdowns below this (default: 5)")
+    args = parser.parse_args()
+
+    catalog = BENCH_DIR / "catalog-1x.sqlite"
+    if not args.database_url and not catalog.exists():
+        sys.exit(f"No {catalog}; seed it with scripts/bench_api.py or pass --database-url")
+    url = args.database_url or f"sqlite+aiosqlite:///{catalog}"
+    dialect = url.split("+", 1)[0].split(":", 1)[0]
+    baseline_path = args.baseline or BENCH_DIR / f"startup-{dialect}.json"
+    env = {**os.environ, "DATABASE_URL": url, "ENVIRONMENT": "benchmark", "PYTHONPATH": str(ROOT)}
+
+    samples: dict[str, list[float]] = {"import": []}
+    for run in range(args.runs):
+        samples["import"].append(measure_import(env))
+        for key, seconds in measure_start(env, args.paths).items():
+            samples.setdefault(key, []).append(seconds)
+        print(f"  start {run + 1}/{args.runs}: ready in {samples['ready'][-1] * 1000:.0f} ms", file=sys.stderr)
+    results = {key: summarize(values) for key, values in samples.items()}
+
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() and not args.save else None
+    regressions = compare(results, baseline, args.threshold, args.noise_ms) if baseline else []
+    print()
+    print_table(results, baseline, regressions)
+
+    if args.importtime:
+        print("\nSlowest imports of api.main (cumulative):")
+        for module, ms in slowest_imports(env):
+            print(f"  {module:<40} {ms:>8.1f} ms")
+
+    if args.save:
+        BENCH_DIR.mkdir(exist_ok=True)
+        payload = {
+            "database": dialect,
+            "python": platform.python_version(),
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "results": results,
+        }
+        baseline_path.write_text(json.dumps(payload, indent=2) + "\n")
+        print(f"\nBaseline written to {baseline_path}")
+    elif baseline is None:
+        print(f"\nNo baseline at {baseline_path} (run with --save to create it)")
+    elif regressions:
+        print(f"\n{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Export the full catalog from PostgreSQL as NDJSON (same format as GET /export/catalog.ndjson).
+
+Each spec line is followed by its implementation lines. Rows are streamed
+from a server-side cursor and written as they arrive, so memory stays flat
+for any catalog size. A ``.gz`` output path is gzip-compressed on the fly.
+
+Usage:
+    uv run python scripts/export_catalog.py > catalog.ndjson
+    uv run python scripts/export_catalog.py --code -o catalog.ndjson.gz
+"""
+
+import argparse
+import asyncio
+import gzip
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+load_dotenv()
+
+from core.database.connection import close_db, get_db_context, is_db_configured  # noqa: E402
+from core.export import iter_catalog_ndjson  # noqa: E402
+
+
+async def export(output: Path | None, include_code: bool) -> int:
+    """Stream the catalog to *output* (stdout if None); returns the number of specs written."""
+    if output is None:
+        sink = sys.stdout.buffer
+    elif output.suffix == ".gz":
+        sink = gzip.open(output, "wb")
+    else:
+        sink = output.open("wb")
+
+    specs = 0
+    try:
+        async with get_db_context() as session:
+            async for chunk in iter_catalog_ndjson(session, include_code=include_code):
+                sink.write(chunk)
+                specs += 1
+    finally:
+        if output is not None:
+            sink.close()
+        await close_db()
+    return specs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-o", "--output", type=Path, help="output file (default: stdout; .gz compresses)")
+    parser.add_argument("--code", action="store_true", help="include implementation source code")
+    args = parser.parse_args()
+
+    if not is_db_configured():
+        print("No database configuration found (DATABASE_URL or INSTANCE_CONNECTION_NAME)", file=sys.stderr)
+        return 1
+
+    specs = asyncio.run(export(args.output, args.code))
+    print(f"Exported {specs} specs", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
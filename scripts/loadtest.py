@@ -1,197 +1,568 @@
+#!/usr/bin/env python3
 """
-Load test for Cloud Run services (pyplots frontend + backend).
-Tests increasing concurrency levels to find the performance breaking point.
+Open-loop load generator for the API with weighted, scenario-based request mixes.
+
+Requests are started on a constant-arrival-rate schedule (request i at
+t0 + i / rate), independent of how fast earlier ones complete. Latency is
+measured from the *intended* start time, so a stalled server shows up as the
+queueing delay its users would see instead of silently lowering the request
+rate (coordinated omission). The time from actually sending to the response is
+kept separately as service time.
+
+Latencies go into log-linear histograms (HdrHistogram layout, <0.4% relative
+error), which are exact enough for p99.9 and merge across endpoints and runs.
+
+Scenarios mix endpoints by weight, approximating the production traffic shape
+(the plots grid dominates, then spec pages, then OG images and the iframe
+proxy). Filter combinations, spec IDs and image URLs are drawn from the
+target's own catalog (``/plots/filter?fields=counts,images``), with tag values
+weighted by how many plots they match, as users click the larger chips.
+
+Targets:
+  - ``http://localhost:8000`` (default) or any base URL of a running API
+  - ``asgi``: the app in-process through httpx's ASGI transport, on
+    DATABASE_URL (default: the ``scripts/bench_api.py`` 1x catalog). Generator
+    and app share one event loop, so this measures handler cost and loop
+    saturation, not networking. Endpoints that fetch from GCS (OG images, the
+    HTML proxy) are skipped here.
 
 Usage:
-    uv run python scripts/loadtest.py frontend
-    uv run python scripts/loadtest.py backend
-    uv run python scripts/loadtest.py all
+    uv run python scripts/loadtest.py --rate 50 --duration 30
+    uv run python scripts/loadtest.py --rates 10,25,50,100,200 --scenario browse --json run.json
+    uv run python scripts/loadtest.py --target asgi --rates 20,50,100 --compare run.json
 """
 
+import argparse
 import asyncio
-import statistics
+import json
+import math
+import os
+import platform
+import random
 import sys
 import time
+from collections import Counter
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
 
 import httpx
 
-CONCURRENCY_LEVELS = [5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55, 60, 65, 70, 75, 80, 85, 90, 95, 100]
-DURATION_PER_LEVEL = 30  # seconds
-WARMUP_REQUESTS = 5
-DEGRADATION_STREAK_LIMIT = 3  # abort after N consecutive degraded levels
 
-TARGETS = {
-    "frontend": {
-        "name": "Frontend (pyplots.ai)",
-        "urls": ["https://pyplots.ai/"],
-    },
-    "backend": {
-        "name": "Backend (api.pyplots.ai)",
-        "urls": [
-            "https://api.pyplots.ai/specs",
-            "https://api.pyplots.ai/stats",
-        ],
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+DEFAULT_TARGET = "http://localhost:8000"
+DEFAULT_ASGI_CATALOG = ROOT / ".benchmarks" / "catalog-1x.sqlite"
+REQUEST_TIMEOUT = 30.0
+DEGRADATION_STREAK_LIMIT = 2  # abort the rate ladder after N consecutive degraded stages
+
+
+# ---------------------------------------------------------------------------
+# Latency histogram
+# ---------------------------------------------------------------------------
+
+
+class LatencyHistogram:
+    """Log-linear latency histogram in microseconds (HdrHistogram bucket layout).
+
+    Values below 2 * SUB_BUCKETS are stored exactly; above that each power of two
+    is split into SUB_BUCKETS linear buckets, so a bucket's midpoint is within
+    1 / (2 * SUB_BUCKETS) of any value recorded in it.
+    """
+
+    SUB_BUCKETS = 128
+    _SUB_BITS = 7
+
+    __slots__ = ("counts", "total", "max_us", "min_us", "sum_us")
+
+    def __init__(self) -> None:
+        self.counts: Counter[int] = Counter()
+        self.total = 0
+        self.max_us = 0
+        self.min_us = 0
+        self.sum_us = 0
+
+    @classmethod
+    def _index(cls, value: int) -> int:
+        shift = value.bit_length() - cls._SUB_BITS - 1
+        if shift <= 0:
+            return value
+        return shift * cls.SUB_BUCKETS + (value >> shift)
+
+    @classmethod
+    def _midpoint(cls, index: int) -> int:
+        shift = index // cls.SUB_BUCKETS - 1
+        if shift <= 0:
+            return index
+        low = (index - shift * cls.SUB_BUCKETS) << shift
+        return low + (1 << (shift - 1))
+
+    def record(self, seconds: float) -> None:
+        value = max(int(seconds * 1_000_000), 1)
+        self.counts[self._index(value)] += 1
+        self.min_us = value if not self.total else min(self.min_us, value)
+        self.total += 1
+        self.max_us = max(self.max_us, value)
+        self.sum_us += value
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if not other.total:
+            return
+        self.counts.update(other.counts)
+        self.min_us = other.min_us if not self.total else min(self.min_us, other.min_us)
+        self.total += other.total
+        self.max_us = max(self.max_us, other.max_us)
+        self.sum_us += other.sum_us
+
+    def percentile(self, p: float) -> float:
+        """Latency in ms at percentile *p* (0-100); the exact max for p=100."""
+        if not self.total:
+            return 0.0
+        if p >= 100:
+            return self.max_us / 1000
+        rank = max(math.ceil(p / 100 * self.total), 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._midpoint(index), self.max_us) / 1000
+        return self.max_us / 1000
+
+    def summary(self) -> dict:
+        return {
+            "count": self.total,
+            "min_ms": self.min_us / 1000,
+            "mean_ms": round(self.sum_us / self.total / 1000, 3) if self.total else 0.0,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "p999_ms": self.percentile(99.9),
+            "max_ms": self.max_us / 1000,
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "unit": "us",
+            "sub_buckets": self.SUB_BUCKETS,
+            "min": self.min_us,
+            "max": self.max_us,
+            "sum": self.sum_us,
+            "counts": {str(index): count for index, count in sorted(self.counts.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        histogram = cls()
+        histogram.counts = Counter({int(index): count for index, count in data["counts"].items()})
+        histogram.total = sum(histogram.counts.values())
+        histogram.min_us, histogram.max_us, histogram.sum_us = data["min"], data["max"], data["sum"]
+        return histogram
+
+
+# ---------------------------------------------------------------------------
+# Catalog and scenarios
+# ---------------------------------------------------------------------------
+
+
+class Catalog:
+    """What the target serves: filter values with their plot counts, specs and implementation previews."""
+
+    def __init__(self, counts: dict[str, dict[str, int]], images: list[dict]) -> None:
+        self.counts = {category: values for category, values in counts.items() if values}
+        self.spec_ids = list(counts.get("spec", {})) or sorted({image["spec_id"] for image in images})
+        self.impls = [(image["spec_id"], image.get("language", "python"), image["library"]) for image in images]
+        self.html_urls = [image[key] for image in images for key in ("html_light", "html") if image.get(key)]
+
+    @classmethod
+    async def load(cls, client: httpx.AsyncClient) -> "Catalog":
+        response = await client.get("/plots/filter", params={"fields": "counts,images"}, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        data = response.json()
+        return cls(data.get("counts", {}), data.get("images", []))
+
+    def value(self, rng: random.Random, category: str) -> str:
+        """A filter value, weighted by the number of plots it matches."""
+        values = self.counts[category]
+        return rng.choices(list(values), weights=list(values.values()))[0]
+
+
+SPEC_TAG_CATEGORIES = ("plot", "data", "dom", "feat")
+IMPL_TAG_CATEGORIES = ("dep", "tech", "pat", "prep", "style")
+PAGE_SIZE = 48
+
+
+def _filter_combo(rng: random.Random, catalog: Catalog) -> dict[str, str]:
+    """Filter parameters shaped like the grid's usage: mostly one chip, sometimes two, rarely none."""
+    spec_tags = [c for c in SPEC_TAG_CATEGORIES if c in catalog.counts]
+    impl_tags = [c for c in IMPL_TAG_CATEGORIES if c in catalog.counts]
+    roll = rng.random()
+    if roll < 0.15 or not spec_tags:
+        return {}
+    if roll < 0.45:
+        category = rng.choice(spec_tags)
+        return {category: catalog.value(rng, category)}
+    if roll < 0.65 and "lib" in catalog.counts:
+        return {"lib": catalog.value(rng, "lib")}
+    if roll < 0.85 and "lib" in catalog.counts:
+        category = rng.choice(spec_tags)
+        return {"lib": catalog.value(rng, "lib"), category: catalog.value(rng, category)}
+    # Two chips: a spec tag plus another spec tag or an implementation tag
+    first = rng.choice(spec_tags)
+    second = rng.choice([c for c in spec_tags + impl_tags if c != first] or [first])
+    return {first: catalog.value(rng, first), second: catalog.value(rng, second)}
+
+
+Request = tuple[str, dict[str, str] | None]
+RequestFactory = Callable[[random.Random, Catalog], Request]
+
+
+class Endpoint:
+    """A named request shape; *external* ones make the API fetch from GCS."""
+
+    __slots__ = ("name", "make", "external")
+
+    def __init__(self, name: str, make: RequestFactory, external: bool = False) -> None:
+        self.name = name
+        self.make = make
+        self.external = external
+
+
+def _impl(rng: random.Random, catalog: Catalog) -> tuple[str, str, str]:
+    return rng.choice(catalog.impls)
+
+
+ENDPOINTS = {
+    endpoint.name: endpoint
+    for endpoint in (
+        Endpoint("filter", lambda rng, cat: ("/plots/filter", _filter_combo(rng, cat))),
+        Endpoint(
+            "filter/scroll",
+            lambda rng, cat: (
+                "/plots/filter",
+                {
+                    **_filter_combo(rng, cat),
+                    "fields": "images",
+                    "limit": str(PAGE_SIZE),
+                    "offset": str(PAGE_SIZE * rng.randint(1, 4)),
+                },
+            ),
+        ),
+        Endpoint("spec", lambda rng, cat: (f"/specs/{rng.choice(cat.spec_ids)}", None)),
+        Endpoint("spec/images", lambda rng, cat: (f"/specs/{rng.choice(cat.spec_ids)}/images", None)),
+        Endpoint("spec/code", lambda rng, cat: ("/specs/{0}/{2}/code".format(*_impl(rng, cat)), None)),
+        Endpoint("related", lambda rng, cat: (f"/insights/related/{rng.choice(cat.spec_ids)}", None)),
+        Endpoint("specs", lambda rng, cat: ("/specs", None)),
+        Endpoint("libraries", lambda rng, cat: ("/libraries", None)),
+        Endpoint("stats", lambda rng, cat: ("/stats", None)),
+        Endpoint("og/impl", lambda rng, cat: ("/og/{0}/{1}/{2}.png".format(*_impl(rng, cat)), None), external=True),
+        Endpoint("og/spec", lambda rng, cat: (f"/og/{rng.choice(cat.spec_ids)}.png", None), external=True),
+        Endpoint("proxy/html", lambda rng, cat: ("/proxy/html", {"url": rng.choice(cat.html_urls)}), external=True),
+    )
+}
+
+# Endpoint weights per scenario (relative, need not sum to 100)
+SCENARIOS: dict[str, dict[str, float]] = {
+    "mixed": {
+        "filter": 30,
+        "filter/scroll": 15,
+        "spec": 15,
+        "spec/images": 4,
+        "spec/code": 4,
+        "related": 5,
+        "og/impl": 8,
+        "og/spec": 4,
+        "proxy/html": 8,
+        "libraries": 3,
+        "stats": 2,
+        "specs": 2,
     },
+    "browse": {"filter": 55, "filter/scroll": 30, "specs": 5, "libraries": 5, "stats": 5},
+    "detail": {"spec": 45, "spec/images": 15, "spec/code": 15, "related": 15, "proxy/html": 10},
+    "og": {"og/impl": 70, "og/spec": 30},
 }
 
 
-async def make_request(client: httpx.AsyncClient, url: str) -> tuple[float, int]:
-    """Make a single request, return (latency_ms, status_code)."""
-    start = time.monotonic()
-    try:
-        resp = await client.get(url, timeout=30.0)
-        latency = (time.monotonic() - start) * 1000
-        return latency, resp.status_code
-    except Exception:
-        latency = (time.monotonic() - start) * 1000
-        return latency, 0
+# ---------------------------------------------------------------------------
+# Open-loop runner
+# ---------------------------------------------------------------------------
+
+
+class EndpointStats:
+    __slots__ = ("latency", "service", "errors", "statuses")
+
+    def __init__(self) -> None:
+        self.latency = LatencyHistogram()  # from the intended start: what a user would see
+        self.service = LatencyHistogram()  # from the actual send
+        self.errors = 0
+        self.statuses: Counter[str] = Counter()
 
+    def as_dict(self) -> dict:
+        return {
+            "latency": {**self.latency.summary(), "histogram": self.latency.to_dict()},
+            "service": self.service.summary(),
+            "errors": self.errors,
+            "statuses": dict(self.statuses),
+        }
 
-async def run_level(
-    client: httpx.AsyncClient, urls: list[str], concurrency: int, duration: float
+
+async def _fire(client: httpx.AsyncClient, request: Request, intended: float, stats: EndpointStats) -> None:
+    path, params = request
+    sent = time.perf_counter()
+    try:
+        response = await client.get(path, params=params, timeout=REQUEST_TIMEOUT)
+        status = str(response.status_code)
+        failed = response.status_code >= 400
+    except httpx.HTTPError as exc:
+        status, failed = type(exc).__name__, True
+    done = time.perf_counter()
+    stats.latency.record(done - intended)
+    stats.service.record(done - sent)
+    stats.statuses[status] += 1
+    stats.errors += failed
+
+
+async def run_stage(
+    client: httpx.AsyncClient,
+    catalog: Catalog,
+    mix: dict[str, float],
+    rate: float,
+    duration: float,
+    rng: random.Random,
+    max_inflight: int,
 ) -> dict:
-    """Run load at a given concurrency level for `duration` seconds."""
-    latencies: list[float] = []
-    errors = 0
-    total = 0
-    url_idx = 0
-    start = time.monotonic()
-
-    async def worker():
-        nonlocal errors, total, url_idx
-        while time.monotonic() - start < duration:
-            url = urls[url_idx % len(urls)]
-            url_idx += 1
-            latency, status = await make_request(client, url)
-            total += 1
-            latencies.append(latency)
-            if status < 200 or status >= 400:
-                errors += 1
-
-    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
-    await asyncio.gather(*workers)
-    elapsed = time.monotonic() - start
-
-    if not latencies:
-        return {"concurrency": concurrency, "error": "no responses"}
-
-    latencies.sort()
+    """Issue requests at a constant *rate* for *duration* seconds; returns the stage result."""
+    names, weights = list(mix), list(mix.values())
+    stats = {name: EndpointStats() for name in names}
+    planned = max(int(rate * duration), 1)
+    inflight: set[asyncio.Task] = set()
+    dropped = 0
+    start = time.perf_counter()
+    for i in range(planned):
+        intended = start + i / rate
+        delay = intended - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        name = rng.choices(names, weights)[0]
+        if len(inflight) >= max_inflight:
+            dropped += 1  # client-side cap reached: report instead of queueing behind it
+            continue
+        task = asyncio.create_task(_fire(client, ENDPOINTS[name].make(rng, catalog), intended, stats[name]))
+        inflight.add(task)
+        task.add_done_callback(inflight.discard)
+    if inflight:
+        await asyncio.gather(*inflight)
+    elapsed = time.perf_counter() - start
+
+    total, service = LatencyHistogram(), LatencyHistogram()
+    for endpoint in stats.values():
+        total.merge(endpoint.latency)
+        service.merge(endpoint.service)
+    errors = sum(endpoint.errors for endpoint in stats.values())
     return {
-        "concurrency": concurrency,
-        "requests": total,
-        "rps": round(total / elapsed, 1),
-        "p50": round(statistics.median(latencies), 1),
-        "p95": round(latencies[int(len(latencies) * 0.95)], 1),
-        "p99": round(latencies[int(len(latencies) * 0.99)], 1),
-        "max": round(max(latencies), 1),
+        "rate": rate,
+        "duration_s": round(elapsed, 2),
+        "planned": planned,
+        "completed": total.total,
+        "dropped": dropped,
         "errors": errors,
-        "error_rate": round(errors / total * 100, 1) if total else 0,
+        "error_rate": round(errors / total.total, 4) if total.total else 0.0,
+        "achieved_rps": round(total.total / elapsed, 1),
+        "latency": {**total.summary(), "histogram": total.to_dict()},
+        "service": service.summary(),
+        "endpoints": {name: endpoint.as_dict() for name, endpoint in stats.items() if endpoint.latency.total},
     }
 
 
-def is_degraded(result: dict, baseline_p95: float | None) -> bool:
-    """Check if this level shows significant degradation vs baseline."""
-    if "error" in result:
+def is_degraded(stage: dict, baseline_p99: float | None) -> bool:
+    """Errors, dropped arrivals, or p99 more than 3x the first stage's."""
+    if stage["error_rate"] > 0.05 or stage["dropped"]:
         return True
-    if result["error_rate"] > 5:
-        return True
-    if baseline_p95 and result["p95"] > baseline_p95 * 3:
-        return True
-    return False
+    return bool(baseline_p99 and stage["latency"]["p99_ms"] > baseline_p99 * 3)
 
 
-def print_results(name: str, results: list[dict]):
-    print(f"\n{'=' * 90}")
-    print(f"  {name}")
-    print(f"{'=' * 90}")
-    header = f"{'Conc':>6} {'Reqs':>7} {'RPS':>8} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8} {'MaxMs':>8} {'Errs':>6} {'Err%':>6}"
-    print(header)
-    print("-" * 90)
+# ---------------------------------------------------------------------------
+# Targets
+# ---------------------------------------------------------------------------
 
-    prev_p95 = None
-    for r in results:
-        if "error" in r:
-            print(f"{r['concurrency']:>6}  ERROR: {r['error']}")
-            continue
 
-        flag = ""
-        if prev_p95 and r["p95"] > prev_p95 * 2:
-            flag = " << DEGRADATION"
-        if r["error_rate"] > 5:
-            flag = " << HIGH ERRORS"
+async def open_client(target: str, database_url: str | None) -> tuple[httpx.AsyncClient, Callable | None]:
+    """HTTP client for *target*, plus an async cleanup for the in-process app (or None)."""
+    if target != "asgi":
+        return httpx.AsyncClient(base_url=target, follow_redirects=True), None
 
-        print(
-            f"{r['concurrency']:>6} {r['requests']:>7} {r['rps']:>8} "
-            f"{r['p50']:>8} {r['p95']:>8} {r['p99']:>8} {r['max']:>8} "
-            f"{r['errors']:>6} {r['error_rate']:>5}%{flag}"
-        )
-        prev_p95 = r["p95"]
+    url = database_url or os.environ.get("DATABASE_URL")
+    if not url:
+        if not DEFAULT_ASGI_CATALOG.exists():
+            sys.exit(f"No DATABASE_URL and no {DEFAULT_ASGI_CATALOG}; seed it with scripts/bench_api.py first")
+        url = f"sqlite+aiosqlite:///{DEFAULT_ASGI_CATALOG}"
+    # The app modules read DATABASE_URL at import time
+    os.environ["DATABASE_URL"] = url
+    os.environ.setdefault("ENVIRONMENT", "benchmark")  # no SQL echo (development) and no NullPool (test)
+
+    import logging
+
+    from api.main import app  # configures INFO logging; keep the output to the results
+
+    logging.getLogger().setLevel(logging.WARNING)
+    from core.database import close_db, init_db
+
+    await init_db()
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest"), close_db
 
-    print()
 
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
 
-async def warmup(client: httpx.AsyncClient, urls: list[str]):
-    """Send a few warmup requests to ensure caches are primed."""
-    print("  Warming up...", end="", flush=True)
-    for _ in range(WARMUP_REQUESTS):
-        for url in urls:
-            await make_request(client, url)
-    print(" done")
 
+def print_stage(stage: dict, flag: str = "") -> None:
+    lat = stage["latency"]
+    print(
+        f"{stage['rate']:>7g} {stage['achieved_rps']:>8} {stage['completed']:>7} {lat['p50_ms']:>8.1f} "
+        f"{lat['p90_ms']:>8.1f} {lat['p99_ms']:>8.1f} {lat['p999_ms']:>8.1f} {lat['max_ms']:>8.1f} "
+        f"{stage['errors']:>6} {stage['dropped']:>6}{flag}"
+    )
 
-async def test_target(target_key: str):
-    target = TARGETS[target_key]
-    print(f"\nTesting: {target['name']}")
-    print(f"Endpoints: {', '.join(target['urls'])}")
-    print(f"Levels: {CONCURRENCY_LEVELS}, {DURATION_PER_LEVEL}s each")
-    print(f"Early abort: after {DEGRADATION_STREAK_LIMIT} consecutive degraded levels")
 
-    results = []
-    baseline_p95 = None
-    degradation_streak = 0
+def print_header() -> None:
+    print(
+        f"\n{'Rate':>7} {'RPS':>8} {'Reqs':>7} {'p50ms':>8} {'p90ms':>8} {'p99ms':>8} {'p99.9ms':>8} {'MaxMs':>8} {'Errs':>6} {'Drop':>6}"
+    )
+    print("-" * 88)
 
-    async with httpx.AsyncClient(follow_redirects=True) as client:
-        await warmup(client, target["urls"])
 
-        for level in CONCURRENCY_LEVELS:
-            print(f"  Concurrency {level:>3} ({DURATION_PER_LEVEL}s)...", end="", flush=True)
-            result = await run_level(client, target["urls"], level, DURATION_PER_LEVEL)
-            results.append(result)
-            rps = result.get("rps", "?")
-            p95 = result.get("p95", "?")
-            print(f" {rps} rps, p95={p95}ms")
+def print_endpoints(stage: dict) -> None:
+    print(f"\n  Endpoints at {stage['rate']:g} req/s (latency from intended start; svc = service time p50)")
+    print(
+        f"  {'endpoint':<16} {'reqs':>6} {'p50ms':>8} {'p90ms':>8} {'p99ms':>8} {'maxMs':>8} {'svc p50':>8} {'errs':>5}"
+    )
+    for name, endpoint in sorted(stage["endpoints"].items(), key=lambda item: -item[1]["latency"]["count"]):
+        lat = endpoint["latency"]
+        print(
+            f"  {name:<16} {lat['count']:>6} {lat['p50_ms']:>8.1f} {lat['p90_ms']:>8.1f} {lat['p99_ms']:>8.1f} "
+            f"{lat['max_ms']:>8.1f} {endpoint['service']['p50_ms']:>8.1f} {endpoint['errors']:>5}"
+        )
 
-            # Track baseline from first stable level
-            if baseline_p95 is None and not is_degraded(result, None):
-                baseline_p95 = result.get("p95")
 
-            # Check for degradation streak
-            if is_degraded(result, baseline_p95):
-                degradation_streak += 1
-                if degradation_streak >= DEGRADATION_STREAK_LIMIT:
-                    print(f"\n  EARLY ABORT: {DEGRADATION_STREAK_LIMIT} consecutive degraded levels detected")
-                    break
-            else:
-                degradation_streak = 0
+def print_comparison(result: dict, previous: dict) -> None:
+    """p50/p99 change per stage against an earlier run, matched by rate."""
+    before = {stage["rate"]: stage for stage in previous["stages"]}
+    meta = previous["meta"]
+    print(f"\nCompared with {meta.get('started_at', 'previous run')} ({meta.get('target')}, {meta.get('scenario')}):")
+    print(
+        f"{'Rate':>7} {'p50 before':>11} {'p50 now':>9} {'change':>8} {'p99 before':>11} {'p99 now':>9} {'change':>8}"
+    )
+    for stage in result["stages"]:
+        old = before.get(stage["rate"])
+        if old is None:
+            continue
+        cells = []
+        for key in ("p50_ms", "p99_ms"):
+            was, now = old["latency"][key], stage["latency"][key]
+            change = f"{(now - was) / was:+.0%}" if was else "n/a"
+            cells.append(f"{was:>11.1f} {now:>9.1f} {change:>8}")
+        print(f"{stage['rate']:>7g} {' '.join(cells)}")
 
-    print_results(target["name"], results)
-    return results
 
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
 
-async def main():
-    targets = sys.argv[1:] if len(sys.argv) > 1 else ["all"]
 
-    if "all" in targets:
-        targets = ["frontend", "backend"]
+async def run(args: argparse.Namespace) -> dict:
+    client, cleanup = await open_client(args.target, args.database_url)
+    mix = dict(SCENARIOS[args.scenario])
+    rng = random.Random(args.seed)
+    stages: list[dict] = []
+    try:
+        catalog = await Catalog.load(client)
+        skipped = [name for name in mix if ENDPOINTS[name].external and args.target == "asgi"]
+        if not catalog.html_urls:
+            skipped.append("proxy/html")
+        for name in skipped:
+            mix.pop(name, None)
+        if not mix:
+            sys.exit(f"Scenario {args.scenario!r} has no endpoints this target can serve")
+        print(f"Target: {args.target}  scenario: {args.scenario}  catalog: {len(catalog.spec_ids)} specs")
+        print("Mix: " + ", ".join(f"{name} {weight:g}" for name, weight in mix.items()))
+        if skipped:
+            print(f"Skipped (needs GCS or has no data): {', '.join(sorted(set(skipped)))}")
+
+        if args.warmup:
+            print(f"Warming up ({args.warmup:g}s at {args.rates[0]:g} req/s)...", end="", flush=True)
+            await run_stage(client, catalog, mix, args.rates[0], args.warmup, rng, args.max_inflight)
+            print(" done")
+
+        print_header()
+        baseline_p99 = None
+        streak = 0
+        for rate in args.rates:
+            stage = await run_stage(client, catalog, mix, rate, args.duration, rng, args.max_inflight)
+            stages.append(stage)
+            degraded = is_degraded(stage, baseline_p99)
+            print_stage(stage, " << DEGRADED" if degraded else "")
+            baseline_p99 = baseline_p99 or stage["latency"]["p99_ms"]
+            streak = streak + 1 if degraded else 0
+            if streak >= DEGRADATION_STREAK_LIMIT:
+                print(f"Stopping: {streak} consecutive degraded stages")
+                break
+    finally:
+        await client.aclose()
+        if cleanup:
+            await cleanup()
+
+    for stage in stages:
+        print_endpoints(stage)
+    return {
+        "meta": {
+            "target": args.target,
+            "scenario": args.scenario,
+            "mix": mix,
+            "duration_s": args.duration,
+            "seed": args.seed,
+            "max_inflight": args.max_inflight,
+            "python": platform.python_version(),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "stages": stages,
+    }
 
-    for t in targets:
-        if t not in TARGETS:
-            print(f"Unknown target: {t}. Choose from: {', '.join(TARGETS.keys())}, all")
-            sys.exit(1)
 
-    for t in targets:
-        await test_target(t)
+def _rates(value: str) -> list[float]:
+    return [float(rate) for rate in value.split(",")]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default=DEFAULT_TARGET, help=f"base URL or 'asgi' (default: {DEFAULT_TARGET})")
+    parser.add_argument(
+        "--database-url", help="database for --target asgi (default: DATABASE_URL or the bench catalog)"
+    )
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed", help="request mix (default: mixed)")
+    rates = parser.add_mutually_exclusive_group()
+    rates.add_argument("--rate", type=float, help="one stage at this many requests per second")
+    rates.add_argument("--rates", type=_rates, help="comma-separated rates, run in order (default: 10,25,50,100)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per stage (default: 30)")
+    parser.add_argument("--warmup", type=float, default=5.0, help="untimed seconds at the first rate (default: 5)")
+    parser.add_argument("--max-inflight", type=int, default=1000, help="drop arrivals beyond this many open requests")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the request sequence (default: 1)")
+    parser.add_argument("--json", type=Path, help="write the results (with histograms) to this file")
+    parser.add_argument("--compare", type=Path, help="earlier --json output to compare p50/p99 against")
+    args = parser.parse_args()
+    args.rates = [args.rate] if args.rate else args.rates or [10.0, 25.0, 50.0, 100.0]
+    if args.target != "asgi":
+        args.target = args.target.rstrip("/")
+
+    result = asyncio.run(run(args))
+
+    if args.compare:
+        print_comparison(result, json.loads(args.compare.read_text()))
+    if args.json:
+        args.json.write_text(json.dumps(result, indent=2) + "\n")
+        print(f"\nResults written to {args.json}")
+    return 0
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    sys.exit(main())
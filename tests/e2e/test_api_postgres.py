@@ -9,6 +9,8 @@ These tests are skipped if DATABASE_URL is not set, allowing
 local development without PostgreSQL.
 """
 
+import gzip
+import re
 from unittest.mock import patch
 
 import pytest
@@ -205,12 +207,20 @@ class TestSeoEndpoints:
         assert "Disallow: /" in response.text
 
     async def test_sitemap(self, client):
-        """Should return sitemap XML with spec URLs."""
+        """Should return a sitemap index whose shards list the spec URLs."""
         response = await client.get("/sitemap.xml")
 
         assert response.status_code == 200
         assert response.headers["content-type"] == "application/xml"
-        content = response.text
+        assert "<sitemapindex" in response.text
+        shard_paths = re.findall(r"<loc>https://anyplot\.ai(/sitemaps/[^<]+)</loc>", response.text)
+        assert "/sitemaps/static.xml.gz" in shard_paths
+
+        content = ""
+        for path in shard_paths:
+            shard = await client.get(path)
+            assert shard.status_code == 200
+            content += gzip.decompress(shard.content).decode()
         assert "scatter-basic" in content
         assert "bar-grouped" in content
 
@@ -5,6 +5,9 @@ Tests full API stack using FastAPI's dependency override mechanism
 with SQLite in-memory database for fast, isolated testing.
 """
 
+import gzip
+import json
+import re
 from unittest.mock import patch
 
 import pytest
@@ -82,6 +85,20 @@ class TestSpecsEndpoints:
         assert "images" in data
         assert len(data["images"]) == 2
 
+    async def test_server_timing_reports_db_stage(self, client):
+        """A cache miss should report SQL time in Server-Timing; the cached repeat none."""
+
+        def stages(response) -> dict[str, float]:
+            parts = (part.split(";dur=") for part in response.headers["server-timing"].split(", "))
+            return {name: float(ms) for name, ms in parts}
+
+        cold = stages(await client.get("/specs/scatter-basic"))
+        warm = stages(await client.get("/specs/scatter-basic"))
+
+        assert cold["db"] > 0
+        assert cold["total"] >= cold["db"]
+        assert warm["db"] == 0
+
 
 class TestLibrariesEndpoints:
     """Integration tests for /libraries endpoints."""
@@ -190,6 +207,34 @@ class TestDownloadEndpoints:
         assert response.status_code == 404
 
 
+class TestExportEndpoints:
+    """Integration tests for the NDJSON catalog export."""
+
+    async def test_export_catalog_streams_specs_and_impls(self, client):
+        """Should stream each spec line followed by its impl lines, without code by default."""
+        response = await client.get("/export/catalog.ndjson", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert response.headers["content-encoding"] == "gzip"
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [(r["type"], r.get("id") or r["library_id"]) for r in records] == [
+            ("spec", "bar-grouped"),
+            ("impl", "matplotlib"),
+            ("spec", "scatter-basic"),
+            ("impl", "matplotlib"),
+            ("impl", "seaborn"),
+        ]
+        assert "code" not in records[1]
+
+    async def test_export_catalog_with_code(self, client):
+        """Should include implementation code when requested."""
+        response = await client.get("/export/catalog.ndjson?code=true")
+
+        impls = [json.loads(line) for line in response.text.splitlines() if '"type":"impl"' in line]
+        assert impls[0]["code"].startswith("import matplotlib")
+
+
 class TestSeoEndpoints:
     """Integration tests for SEO endpoints."""
 
@@ -202,12 +247,20 @@ class TestSeoEndpoints:
         assert "Disallow: /" in response.text
 
     async def test_sitemap(self, client):
-        """Should return sitemap XML with spec URLs."""
+        """Should return a sitemap index whose shards list the spec URLs."""
         response = await client.get("/sitemap.xml")
 
         assert response.status_code == 200
         assert response.headers["content-type"] == "application/xml"
-        content = response.text
+        assert "<sitemapindex" in response.text
+        shard_paths = re.findall(r"<loc>https://anyplot\.ai(/sitemaps/[^<]+)</loc>", response.text)
+        assert "/sitemaps/static.xml.gz" in shard_paths
+
+        content = ""
+        for path in shard_paths:
+            shard = await client.get(path)
+            assert shard.status_code == 200
+            content += gzip.decompress(shard.content).decode()
         assert "scatter-basic" in content
         assert "bar-grouped" in content
 
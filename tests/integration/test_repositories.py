@@ -16,6 +16,20 @@ pytestmark = pytest.mark.integration
 class TestSpecRepository:
     """Integration tests for SpecRepository."""
 
+    async def test_get_page(self, test_db_with_data):
+        """Should page through specs in ID order with code deferred."""
+        repo = SpecRepository(test_db_with_data)
+
+        first = await repo.get_page(limit=1)
+        second = await repo.get_page(limit=1, offset=1)
+
+        assert [s.id for s in first] == ["bar-grouped"]
+        assert [s.id for s in second] == ["scatter-basic"]
+        assert await repo.get_page(limit=10, offset=2) == []
+        # Presence is known without loading the code column
+        assert all(impl.has_code for impl in second[0].impls)
+        assert "code" not in second[0].impls[0].__dict__
+
     async def test_get_all(self, test_db_with_data):
         """Should fetch all specs with implementations."""
         repo = SpecRepository(test_db_with_data)
@@ -79,15 +93,49 @@ class TestSpecRepository:
         repo = SpecRepository(test_db_with_data)
 
         # Search for scatter plots
-        scatter_specs = await repo.search_by_tags(["scatter"])
+        scatter_specs = await repo.search_by_tags({"plot_type": ["scatter"]})
         assert len(scatter_specs) == 1
         assert scatter_specs[0].id == "scatter-basic"
 
         # Search for bar plots
-        bar_specs = await repo.search_by_tags(["bar"])
+        bar_specs = await repo.search_by_tags({"plot_type": ["bar"]})
         assert len(bar_specs) == 1
         assert bar_specs[0].id == "bar-grouped"
 
+    async def test_search_by_tags_category_semantics(self, test_db_with_data):
+        """Values within a category are OR-ed, categories are AND-ed, and categories are not mixed up."""
+        repo = SpecRepository(test_db_with_data)
+
+        either = await repo.search_by_tags({"plot_type": ["scatter", "bar"]})
+        assert [s.id for s in either] == ["bar-grouped", "scatter-basic"]
+
+        both = await repo.search_by_tags({"plot_type": ["scatter"], "features": ["grouped"]})
+        assert both == []
+
+        # "numeric" is a data_type of scatter-basic, never a plot_type
+        assert await repo.search_by_tags({"plot_type": ["numeric"]}) == []
+
+        assert len(await repo.search_by_tags({}, limit=1)) == 1
+
+    async def test_search_by_tags_impl_level(self, test_db_with_data):
+        """Impl-level filters match when a single implementation satisfies all of them."""
+        impl_repo = ImplRepository(test_db_with_data)
+        await impl_repo.upsert("scatter-basic", "seaborn", {"impl_tags": {"styling": ["alpha-blending"]}})
+        await impl_repo.upsert("bar-grouped", "matplotlib", {"impl_tags": {"dataprep": ["aggregation"]}})
+        repo = SpecRepository(test_db_with_data)
+
+        styled = await repo.search_by_tags({}, impl_tags={"styling": ["alpha-blending"]})
+        assert [s.id for s in styled] == ["scatter-basic"]
+
+        assert [s.id for s in await repo.search_by_tags({}, libraries=["seaborn"])] == ["scatter-basic"]
+
+        # alpha-blending is on the seaborn impl, not the matplotlib one
+        mismatch = await repo.search_by_tags({}, impl_tags={"styling": ["alpha-blending"]}, libraries=["matplotlib"])
+        assert mismatch == []
+
+        none = await repo.search_by_tags({"plot_type": ["scatter"]}, impl_tags={"dataprep": ["aggregation"]})
+        assert none == []
+
     async def test_create(self, test_session):
         """Should create new spec."""
         repo = SpecRepository(test_session)
@@ -281,6 +329,14 @@ class TestImplRepository:
         assert len(impls) == 2
         assert all(impl.library_id == "matplotlib" for impl in impls)
 
+    async def test_get_by_library_with_code(self, test_db_with_data):
+        """Should fetch one library's implementations with code loaded."""
+        repo = ImplRepository(test_db_with_data)
+        impls = await repo.get_by_library_with_code("seaborn")
+
+        assert [impl.spec_id for impl in impls] == ["scatter-basic"]
+        assert impls[0].code.startswith("import seaborn")
+
     async def test_get_by_spec_and_library(self, test_db_with_data):
         """Should fetch specific implementation."""
         repo = ImplRepository(test_db_with_data)
@@ -0,0 +1,92 @@
+"""
+Unit tests for the MCP server's database pool.
+
+Uses a real SQLite file database so connection checkout and reuse are exercised.
+"""
+
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import api.mcp.server as mcp_module
+from core.config import settings
+from core.database import connection
+from core.database.connection import InstrumentedAsyncPool
+
+
+@pytest.fixture
+async def pooled_mcp(tmp_path):
+    """Point the MCP server at an instrumented, pooled SQLite engine with fresh metrics."""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'mcp.db'}",
+        poolclass=InstrumentedAsyncPool,
+        pool_logging_name="mcp-test",
+        pool_size=2,
+        max_overflow=3,
+    )
+    await mcp_module.close_mcp_engine()
+    with (
+        patch("api.mcp.server.create_async_db_engine", return_value=engine) as mock_create,
+        patch.dict(connection._pool_metrics, clear=True),
+    ):
+        yield mock_create
+        await mcp_module.close_mcp_engine()
+
+
+@pytest.mark.asyncio
+async def test_sessions_reuse_pooled_connection(pooled_mcp):
+    """Consecutive tool sessions should share one engine and reuse its pooled connection."""
+    first = await mcp_module.get_mcp_db_session()
+    first_conn = (await (await first.connection()).get_raw_connection()).dbapi_connection
+    await first.close()
+
+    second = await mcp_module.get_mcp_db_session()
+    assert (await second.execute(text("SELECT 1"))).scalar_one() == 1
+    second_conn = (await (await second.connection()).get_raw_connection()).dbapi_connection
+    await second.close()
+
+    assert first_conn is second_conn
+    pooled_mcp.assert_called_once_with(
+        "mcp", pool_size=settings.mcp_db_pool_size, max_overflow=settings.mcp_db_max_overflow
+    )
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_track_checkouts(pooled_mcp):
+    """Checkout latency, connects and pool occupancy should be reported."""
+    session = await mcp_module.get_mcp_db_session()
+    await session.execute(text("SELECT 1"))
+    stats = mcp_module.get_mcp_pool_stats()
+    await session.close()
+
+    assert stats["checkouts"] == 1
+    assert stats["connects"] == 1
+    assert stats["checked_out"] == 1
+    assert stats["size"] == 2
+    assert stats["checkout_ms_max"] >= stats["checkout_ms_avg"] >= 0
+    assert stats["connect_errors"] == 0
+    assert mcp_module.get_mcp_pool_stats()["checked_out"] == 0
+
+
+@pytest.mark.asyncio
+async def test_close_mcp_engine_disposes_pool(pooled_mcp):
+    """close_mcp_engine should drop the engine so the next call creates a new one."""
+    session = await mcp_module.get_mcp_db_session()
+    await session.close()
+
+    await mcp_module.close_mcp_engine()
+
+    assert mcp_module._mcp_engine is None
+    assert "size" not in mcp_module.get_mcp_pool_stats()
+
+
+def test_missing_database_url_raises():
+    """Without a database connection configured the MCP server raises ValueError."""
+    with (
+        patch("api.mcp.server._mcp_engine", None),
+        patch("api.mcp.server.create_async_db_engine", side_effect=RuntimeError("no url")),
+        pytest.raises(ValueError, match="Database not configured"),
+    ):
+        mcp_module._get_mcp_engine()
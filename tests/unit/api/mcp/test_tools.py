@@ -1,7 +1,8 @@
 """
 Unit tests for MCP server tools.
 
-Tests all 6 MCP tools with mocked database sessions.
+Tests all 7 MCP tools with mocked database sessions. The shared API cache
+is cleared before each test.
 """
 
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -10,14 +11,23 @@ import pytest
 
 # Import the tool functions from the module
 # With FastMCP's @mcp_server.tool() decorator, these are plain async functions
+from api.cache import clear_cache
 from api.mcp.server import (
     get_implementation,
     get_spec_detail,
     get_tag_values,
     list_libraries,
     list_specs,
+    search_specs,
     search_specs_by_tags,
 )
+from core.search import build_spec_index
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    """MCP tools share the API cache; start each test with it empty."""
+    clear_cache()
 
 
 @pytest.fixture
@@ -83,8 +93,7 @@ def mock_spec():
 async def test_list_specs(mock_db_context, mock_spec):
     """Test list_specs tool."""
     mock_repo = MagicMock()
-    # list_specs reads impl.code on every spec → eager-loaded variant.
-    mock_repo.get_all_with_code = AsyncMock(return_value=[mock_spec])
+    mock_repo.get_page = AsyncMock(return_value=[mock_spec])
 
     with patch("api.mcp.server.SpecRepository", return_value=mock_repo):
         result = await list_specs(limit=10, offset=0)
@@ -98,19 +107,55 @@ async def test_list_specs(mock_db_context, mock_spec):
 @pytest.mark.asyncio
 async def test_list_specs_pagination(mock_db_context):
     """Test list_specs pagination."""
-    specs = [MagicMock(id=f"spec-{i}", title=f"Spec {i}", description="", tags={}, impls=[]) for i in range(5)]
+    specs = [MagicMock(id=f"spec-{i}", title=f"Spec {i}", description="", tags={}, impls=[]) for i in range(1, 3)]
 
     mock_repo = MagicMock()
-    mock_repo.get_all_with_code = AsyncMock(return_value=specs)
+    mock_repo.get_page = AsyncMock(return_value=specs)
 
     with patch("api.mcp.server.SpecRepository", return_value=mock_repo):
         result = await list_specs(limit=2, offset=1)
 
+    # LIMIT/OFFSET are applied in SQL, not by slicing in Python
+    mock_repo.get_page.assert_awaited_once_with(limit=2, offset=1)
     assert len(result) == 2
     assert result[0]["id"] == "spec-1"
     assert result[1]["id"] == "spec-2"
 
 
+@pytest.mark.asyncio
+async def test_list_specs_served_from_cache(mock_db_context, mock_spec):
+    """Repeated calls hit the shared cache; only the first one opens a session."""
+    mock_repo = MagicMock()
+    mock_repo.get_page = AsyncMock(return_value=[mock_spec])
+
+    with patch("api.mcp.server.SpecRepository", return_value=mock_repo):
+        first = await list_specs(limit=10, offset=0)
+        second = await list_specs(limit=10, offset=0)
+        await list_specs(limit=10, offset=10)
+
+    assert first == second
+    assert mock_repo.get_page.await_count == 2  # one per distinct (limit, offset)
+    assert mock_db_context.close.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_list_specs_counts_without_code(mock_db_context, mock_spec):
+    """library_count comes from impl.has_code, so impl.code is never read."""
+    with_code = mock_spec.impls[0]
+    with_code.has_code = True
+    without_code = MagicMock(has_code=False)
+    mock_spec.impls = [with_code, without_code]
+    del with_code.code  # any access would raise AttributeError
+
+    mock_repo = MagicMock()
+    mock_repo.get_page = AsyncMock(return_value=[mock_spec])
+
+    with patch("api.mcp.server.SpecRepository", return_value=mock_repo):
+        result = await list_specs()
+
+    assert result[0]["library_count"] == 1
+
+
 @pytest.mark.asyncio
 async def test_search_specs_by_tags_spec_level(mock_db_context, mock_spec):
     """Test search_specs_by_tags with spec-level filters."""
@@ -120,55 +165,97 @@ async def test_search_specs_by_tags_spec_level(mock_db_context, mock_spec):
     with patch("api.mcp.server.SpecRepository", return_value=mock_repo):
         result = await search_specs_by_tags(plot_type=["scatter"], domain=["statistics"])
 
-    # Verify repository called with flattened list (order may vary)
-    call_args = mock_repo.search_by_tags.call_args[0][0]
-    assert sorted(call_args) == ["scatter", "statistics"]
+    # Categories are passed through (AND across, OR within), not flattened
+    mock_repo.search_by_tags.assert_awaited_once_with(
+        {"plot_type": ["scatter"], "domain": ["statistics"]}, impl_tags={}, libraries=None, limit=100
+    )
     assert len(result) == 1
     assert result[0]["id"] == "scatter-basic"
 
 
 @pytest.mark.asyncio
 async def test_search_specs_by_tags_impl_level(mock_db_context, mock_spec):
-    """Test search_specs_by_tags with impl-level filters."""
+    """Test search_specs_by_tags pushes impl-level filters into the repository query."""
     mock_repo = MagicMock()
-    # No spec-level tag filter → search_specs falls back to get_all_with_code
-    # because the impl-level filter loop reads `impl.code`.
-    mock_repo.get_all_with_code = AsyncMock(return_value=[mock_spec])
+    mock_repo.search_by_tags = AsyncMock(return_value=[mock_spec])
 
     with patch("api.mcp.server.SpecRepository", return_value=mock_repo):
-        result = await search_specs_by_tags(library=["matplotlib"], patterns=["data-generation"])
-
+        result = await search_specs_by_tags(
+            library=["matplotlib"], patterns=["data-generation"], dataprep=["kde"], styling=["minimal"], limit=5
+        )
+
+    mock_repo.search_by_tags.assert_awaited_once_with(
+        {},
+        impl_tags={"patterns": ["data-generation"], "dataprep": ["kde"], "styling": ["minimal"]},
+        libraries=["matplotlib"],
+        limit=5,
+    )
     assert len(result) == 1
     assert result[0]["id"] == "scatter-basic"
 
 
 @pytest.mark.asyncio
-async def test_search_specs_by_tags_no_matches(mock_db_context, mock_spec):
-    """Test search_specs_by_tags filtering out non-matching impls."""
+async def test_search_specs_by_tags_cache_key_ignores_value_order(mock_db_context, mock_spec):
+    """The same filters given in a different order share one cache entry."""
     mock_repo = MagicMock()
-    mock_repo.get_all_with_code = AsyncMock(return_value=[mock_spec])
+    mock_repo.search_by_tags = AsyncMock(return_value=[mock_spec])
 
     with patch("api.mcp.server.SpecRepository", return_value=mock_repo):
-        result = await search_specs_by_tags(library=["seaborn"])  # matplotlib impl, not seaborn
+        await search_specs_by_tags(plot_type=["scatter", "line"], library=["plotly", "matplotlib"])
+        await search_specs_by_tags(plot_type=["line", "scatter"], library=["matplotlib", "plotly"])
+        await search_specs_by_tags(plot_type=["line", "scatter"], limit=5)
 
-    assert len(result) == 0
+    assert mock_repo.search_by_tags.await_count == 2
 
 
 @pytest.mark.asyncio
-async def test_search_specs_by_tags_dataprep_styling(mock_db_context, mock_spec):
-    """Test search_specs_by_tags with dataprep and styling filters."""
+async def test_search_specs_by_tags_no_matches(mock_db_context):
+    """Test search_specs_by_tags returns an empty list when SQL finds nothing."""
     mock_repo = MagicMock()
-    mock_repo.get_all_with_code = AsyncMock(return_value=[mock_spec])
+    mock_repo.search_by_tags = AsyncMock(return_value=[])
 
     with patch("api.mcp.server.SpecRepository", return_value=mock_repo):
-        # Test dataprep filter - should not match (mock_spec has no dataprep tags)
-        result = await search_specs_by_tags(dataprep=["normalization"])
-        assert len(result) == 0
+        result = await search_specs_by_tags(library=["seaborn"])
 
-        # Test styling filter - should match (mock_spec has styling: alpha-blending)
-        result = await search_specs_by_tags(styling=["alpha-blending"])
-        assert len(result) == 1
-        assert result[0]["id"] == "scatter-basic"
+    assert result == []
+
+
+@pytest.mark.asyncio
+async def test_search_specs(mock_db_context):
+    """Test search_specs tool ranks specs from the search index."""
+    index = build_spec_index(
+        [
+            {"id": "scatter-basic", "title": "Basic Scatter Plot", "description": "Correlation of two variables"},
+            {"id": "bar-basic", "title": "Basic Bar Chart", "description": "Compare categories"},
+        ]
+    )
+
+    with patch("api.mcp.server.get_spec_index", AsyncMock(return_value=index)):
+        result = await search_specs(query="show correlation between variables")
+
+    assert [r["id"] for r in result] == ["scatter-basic"]
+    assert result[0]["title"] == "Basic Scatter Plot"
+    assert result[0]["score"] > 0
+    assert result[0]["website_url"].endswith("/python/scatter-basic")
+
+
+@pytest.mark.asyncio
+async def test_search_specs_builds_index_on_mcp_pool(mock_db_context):
+    """Without a persisted index, search_specs builds it from an MCP pool session, not the API pool."""
+    index = build_spec_index([{"id": "scatter-basic", "title": "Basic Scatter Plot", "description": "Correlation"}])
+    build = AsyncMock(return_value=index)
+
+    with (
+        patch("api.search.settings.search_index_dir", None),
+        patch("api.search._build_spec_index_from_db", build),
+        patch("api.search.get_db_context") as api_db_context,
+    ):
+        result = await search_specs(query="correlation")
+
+    assert [r["id"] for r in result] == ["scatter-basic"]
+    build.assert_awaited_once_with(mock_db_context)
+    mock_db_context.close.assert_awaited_once()
+    api_db_context.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -196,6 +283,11 @@ async def test_get_spec_detail_not_found(mock_db_context):
     with patch("api.mcp.server.SpecRepository", return_value=mock_repo):
         with pytest.raises(ValueError, match="Specification 'invalid' not found"):
             await get_spec_detail("invalid")
+        with pytest.raises(ValueError, match="Specification 'invalid' not found"):
+            await get_spec_detail("invalid")
+
+    # Not-found errors are not cached, so a spec added by the next sync shows up
+    assert mock_repo.get_by_id_with_code.await_count == 2
 
 
 @pytest.mark.asyncio
@@ -358,7 +450,7 @@ class TestMcpServerProtocol:
 
     @pytest.mark.asyncio
     async def test_all_tools_registered(self):
-        """MCP server should have all 6 tools registered."""
+        """MCP server should have all 7 tools registered."""
         from api.mcp.server import mcp_server
 
         tools = await mcp_server.list_tools()
@@ -366,6 +458,7 @@ class TestMcpServerProtocol:
         expected = {
             "list_specs",
             "search_specs_by_tags",
+            "search_specs",
             "get_spec_detail",
             "get_implementation",
             "list_libraries",
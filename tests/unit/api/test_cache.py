@@ -156,8 +156,7 @@ class TestClearSpecCache:
         set_cache("filter:lib=matplotlib", "filter result")
         set_cache("stats", "stats data")
         set_cache("sitemap_xml", "sitemap")
-        set_cache("seo:scatter-basic", "seo overview")
-        set_cache("seo:scatter-basic:matplotlib", "seo impl")
+        set_cache("seo_pages", "bot page store")
         set_cache("og:scatter-basic:matplotlib", "og image")
         set_cache("unrelated:key", "unrelated")
 
@@ -172,8 +171,7 @@ class TestClearSpecCache:
         assert get_cache("filter:lib=matplotlib") is None
         assert get_cache("stats") is None
         assert get_cache("sitemap_xml") is None
-        assert get_cache("seo:scatter-basic") is None
-        assert get_cache("seo:scatter-basic:matplotlib") is None
+        assert get_cache("seo_pages") is None
         assert get_cache("og:scatter-basic:matplotlib") is None
 
         # Unrelated should still be there
@@ -18,10 +18,13 @@ import pytest
 from fastapi.testclient import TestClient
 
 from api.cache import clear_cache
+from api.loop_monitor import LoopStall, loop_monitor
 from api.main import app, fastapi_app
 from api.routers.debug import require_admin
+from api.timing import rolling_timings
 from core.config import settings
 from core.database import get_db
+from core.database.connection import InstrumentedAsyncPool
 
 
 DB_CONFIG_PATCH = "api.dependencies.is_db_configured"
@@ -342,6 +345,91 @@ class TestDebugStatus:
         assert response.status_code == 200
         assert response.json()["database_connected"] is False
 
+    def test_debug_pools_reports_mcp_stats(self, db_client) -> None:
+        """GET /debug/pools should return pool snapshots for the API and MCP engines."""
+        client, _ = db_client
+        mcp_stats = {"size": 2, "checked_out": 0, "checkouts": 3, "checkout_ms_avg": 0.5, "checkout_timeouts": 0}
+        api_engine = MagicMock()
+        api_engine.pool = InstrumentedAsyncPool(MagicMock(), pool_size=5, max_overflow=10, logging_name="api-test")
+
+        with (
+            patch("api.routers.debug.get_mcp_pool_stats", return_value=mcp_stats),
+            patch("core.database.connection.engine", api_engine),
+        ):
+            response = client.get("/debug/pools")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["mcp"] == mcp_stats
+        assert data["api"]["size"] == 5
+        assert data["api"]["timeout"] == 30.0
+        assert data["api"]["checkouts"] == 0
+
+    def test_debug_timings_reports_route_percentiles(self, db_client) -> None:
+        """GET /debug/timings should return per-route stage percentiles."""
+        client, _ = db_client
+        rolling_timings.clear()
+        client.get("/health")
+
+        response = client.get("/debug/timings")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["enabled"] is True
+        assert data["window"] == rolling_timings.window
+        health = data["routes"]["GET /health"]
+        assert health["count"] == 1
+        assert set(health["stages"]) == {"cache", "db", "orm", "app", "gzip", "total"}
+        assert set(health["stages"]["total"]) == {"p50", "p95", "p99", "max"}
+
+    def test_debug_loop_reports_stalls(self, db_client) -> None:
+        """GET /debug/loop should list recorded loop stalls with their stacks."""
+        client, _ = db_client
+        loop_monitor.clear()
+        stall = LoopStall(datetime(2026, 1, 1, tzinfo=timezone.utc), 0.0)
+        stall.stack = ['  File "core/images.py", line 1\n']
+        stall.duration_ms = 250.0
+        loop_monitor.stalls.append(stall)
+        loop_monitor.total = 1
+        try:
+            response = client.get("/debug/loop")
+        finally:
+            loop_monitor.clear()
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["enabled"] is False  # opt-in, not started in tests
+        assert data["total"] == 1
+        assert data["stalls"][0]["duration_ms"] == 250.0
+        assert "core/images.py" in data["stalls"][0]["stack"][0]
+
+    def test_debug_profile_collapsed(self, db_client) -> None:
+        """GET /debug/profile returns collapsed stacks of the worker's threads."""
+        client, _ = db_client
+        response = client.get("/debug/profile", params={"seconds": 0.1})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        line = response.text.splitlines()[0]
+        assert ";" in line
+        assert line.rsplit(" ", 1)[1].isdigit()
+
+    def test_debug_profile_speedscope(self, db_client) -> None:
+        client, _ = db_client
+        response = client.get("/debug/profile", params={"seconds": 0.1, "format": "speedscope"})
+
+        assert response.status_code == 200
+        assert "speedscope.json" in response.headers["content-disposition"]
+        data = response.json()
+        assert data["shared"]["frames"]
+        assert all(profile["type"] == "sampled" for profile in data["profiles"])
+
+    def test_debug_profile_one_capture_at_a_time(self, db_client) -> None:
+        client, _ = db_client
+        with patch("api.routers.debug._profile_lock", MagicMock(locked=lambda: True)):
+            response = client.get("/debug/profile", params={"seconds": 0.1})
+        assert response.status_code == 409
+
     def test_debug_status_system_health(self, db_client) -> None:
         """System health should report database_connected=True and valid fields."""
         client, _ = db_client
@@ -383,6 +471,12 @@ class TestRequireAdmin:
             response = auth_client.get("/debug/ping")
         assert response.status_code == 503
 
+    def test_timings_503_when_admin_token_unset(self, auth_client) -> None:
+        """admin_token unset → 503 on /debug/timings too."""
+        with patch.object(settings, "admin_token", None):
+            response = auth_client.get("/debug/timings")
+        assert response.status_code == 503
+
     def test_status_401_when_token_set_and_header_missing(self, auth_client) -> None:
         """admin_token set, no header → 401."""
         with patch.object(settings, "admin_token", "supersecret"):
@@ -425,6 +519,16 @@ class TestRequireAdmin:
             response = auth_client.post("/debug/cache/invalidate", headers={"X-Cache-Token": "cachesecret"})
         assert response.status_code == 200
 
+    def test_cache_invalidate_routes_reads_to_primary(self, auth_client) -> None:
+        """After a sync, reads must not refill the cache from a lagging replica."""
+        with (
+            patch.object(settings, "cache_invalidate_token", "cachesecret"),
+            patch("core.database.connection.route_reads_to_primary") as mock_route,
+        ):
+            response = auth_client.post("/debug/cache/invalidate", headers={"X-Cache-Token": "cachesecret"})
+        assert response.status_code == 200
+        mock_route.assert_called_once_with()
+
 
 class TestRequireAdminCfAccess:
     """Tests for the Cloudflare Access JWT path of `require_admin`.
@@ -516,7 +620,7 @@ class TestJwksHelpers:
         sentinel = MagicMock()
         with (
             patch.object(settings, "cf_access_team_domain", "anyplot.cloudflareaccess.com"),
-            patch("api.routers.debug.pyjwt.PyJWKClient", return_value=sentinel) as mock_ctor,
+            patch("jwt.PyJWKClient", return_value=sentinel) as mock_ctor,
         ):
             result = _jwks_client()
         assert result is sentinel
@@ -539,7 +643,7 @@ class TestJwksHelpers:
         with (
             patch.object(settings, "cf_access_team_domain", "anyplot.cloudflareaccess.com"),
             patch.object(settings, "cf_access_aud", None),
-            patch("api.routers.debug.pyjwt.PyJWKClient", return_value=MagicMock()),
+            patch("jwt.PyJWKClient", return_value=MagicMock()),
         ):
             assert _verify_cf_access_jwt("some.jwt.token") is None
         self._reset_jwks_cache()
@@ -554,8 +658,8 @@ class TestJwksHelpers:
         with (
             patch.object(settings, "cf_access_team_domain", "anyplot.cloudflareaccess.com"),
             patch.object(settings, "cf_access_aud", "the-aud-uuid"),
-            patch("api.routers.debug.pyjwt.PyJWKClient", return_value=mock_client),
-            patch("api.routers.debug.pyjwt.decode", return_value={"email": "alice@example.com"}) as mock_decode,
+            patch("jwt.PyJWKClient", return_value=mock_client),
+            patch("jwt.decode", return_value={"email": "alice@example.com"}) as mock_decode,
         ):
             email = _verify_cf_access_jwt("good.jwt.token")
         assert email == "alice@example.com"
@@ -578,7 +682,7 @@ class TestJwksHelpers:
         with (
             patch.object(settings, "cf_access_team_domain", "anyplot.cloudflareaccess.com"),
             patch.object(settings, "cf_access_aud", "the-aud-uuid"),
-            patch("api.routers.debug.pyjwt.PyJWKClient", return_value=mock_client),
+            patch("jwt.PyJWKClient", return_value=mock_client),
         ):
             assert _verify_cf_access_jwt("bad.jwt.token") is None
         self._reset_jwks_cache()
@@ -593,8 +697,8 @@ class TestJwksHelpers:
         with (
             patch.object(settings, "cf_access_team_domain", "anyplot.cloudflareaccess.com"),
             patch.object(settings, "cf_access_aud", "the-aud-uuid"),
-            patch("api.routers.debug.pyjwt.PyJWKClient", return_value=mock_client),
-            patch("api.routers.debug.pyjwt.decode", return_value={"email": None}),
+            patch("jwt.PyJWKClient", return_value=mock_client),
+            patch("jwt.decode", return_value={"email": None}),
         ):
             assert _verify_cf_access_jwt("token") is None
         self._reset_jwks_cache()
@@ -5,9 +5,19 @@ Directly tests the pure helper functions in api/routers/insights.py
 that don't require database or HTTP setup.
 """
 
+import threading
 from datetime import timezone
+from unittest.mock import AsyncMock, patch
 
-from api.routers.insights import _collect_impl_tags, _flatten_tags, _parse_iso, _score_bucket
+from api.routers.insights import (
+    _build_related_index,
+    _collect_impl_tags,
+    _flatten_tags,
+    _load_related_index,
+    _lookup_related,
+    _parse_iso,
+    _score_bucket,
+)
 
 
 class TestScoreBucket:
@@ -178,3 +188,96 @@ class TestCollectImplTags:
 
         result = _collect_impl_tags(spec)
         assert result == set()
+
+
+def _related_spec(spec_id: str, tags: dict, impl_tags: dict | None = None, library: str = "matplotlib"):
+    from unittest.mock import MagicMock
+
+    impl = MagicMock()
+    impl.library_id = library
+    impl.quality_score = 90.0
+    impl.preview_url = f"https://example.com/{spec_id}.png"
+    impl.preview_url_light = impl.preview_url
+    impl.preview_url_dark = None
+    impl.impl_tags = impl_tags or {}
+    impl.library.language = "python"
+
+    spec = MagicMock()
+    spec.id = spec_id
+    spec.title = spec_id.title()
+    spec.tags = tags
+    spec.impls = [impl]
+    return spec
+
+
+class TestRelatedIndex:
+    """Tests for _build_related_index and _lookup_related."""
+
+    def test_spec_mode_ranks_by_jaccard(self) -> None:
+        specs = [
+            _related_spec("scatter-basic", {"plot_type": ["scatter"], "domain": ["statistics"]}),
+            _related_spec("scatter-ml", {"plot_type": ["scatter"], "domain": ["statistics", "ml"]}),
+            _related_spec("bar-basic", {"plot_type": ["bar"], "domain": ["statistics"]}),
+            _related_spec("pie-basic", {"plot_type": ["pie"]}),
+        ]
+        index = _build_related_index(specs)
+
+        result = _lookup_related(index, "scatter-basic", limit=1, mode="spec")
+        assert [r.id for r in result.related] == ["scatter-ml"]
+        assert result.related[0].similarity == round(2 / 3, 3)
+        assert result.related[0].shared_tags == ["statistics", "scatter"]
+
+        ids = {r.id for r in _lookup_related(index, "scatter-basic", limit=6, mode="spec").related}
+        assert ids == {"scatter-ml", "bar-basic"}
+
+    def test_full_mode_uses_library_impl_tags(self) -> None:
+        specs = [
+            _related_spec("scatter-basic", {"plot_type": ["scatter"]}, {"techniques": ["annotations"]}),
+            _related_spec("bar-annotated", {"plot_type": ["bar"]}, {"techniques": ["annotations"]}),
+        ]
+        index = _build_related_index(specs)
+
+        assert _lookup_related(index, "scatter-basic", limit=6, mode="spec").related == []
+        related = _lookup_related(index, "scatter-basic", limit=6, mode="full", library="matplotlib").related
+        assert [r.id for r in related] == ["bar-annotated"]
+        assert related[0].shared_tags == ["annotations"]
+        assert related[0].preview_url == "https://example.com/bar-annotated.png"
+
+    def test_full_mode_unknown_library_falls_back_to_spec_tags(self) -> None:
+        specs = [
+            _related_spec("scatter-basic", {"plot_type": ["scatter"]}, {"techniques": ["annotations"]}),
+            _related_spec("scatter-3d", {"plot_type": ["scatter"]}),
+        ]
+        index = _build_related_index(specs)
+
+        related = _lookup_related(index, "scatter-basic", limit=6, mode="full", library="ggplot").related
+        assert [r.id for r in related] == ["scatter-3d"]
+        assert related[0].similarity == 1.0
+
+    def test_unknown_spec_returns_empty(self) -> None:
+        index = _build_related_index([_related_spec("scatter-basic", {"plot_type": ["scatter"]})])
+        assert _lookup_related(index, "nonexistent", limit=6, mode="spec").related == []
+
+    def test_lookup_is_deterministic(self) -> None:
+        specs = [_related_spec(f"scatter-{i}", {"plot_type": ["scatter"], "domain": [f"d{i % 3}"]}) for i in range(20)]
+        index = _build_related_index(specs)
+
+        first = _lookup_related(index, "scatter-0", limit=4, mode="spec")
+        second = _lookup_related(index, "scatter-0", limit=4, mode="spec")
+        assert first == second
+        assert len(first.related) == 4
+
+    async def test_load_builds_off_the_event_loop(self) -> None:
+        repo = AsyncMock()
+        repo.get_all.return_value = [_related_spec("scatter-basic", {"plot_type": ["scatter"]})]
+        threads = []
+
+        def build(specs):
+            threads.append(threading.current_thread())
+            return _build_related_index(specs)
+
+        with patch("api.routers.insights._build_related_index", side_effect=build):
+            index = await _load_related_index(repo)
+
+        assert threads and threads[0] is not threading.main_thread()
+        assert _lookup_related(index, "scatter-basic", limit=6, mode="spec").related == []
@@ -0,0 +1,84 @@
+"""Tests for api/loop_monitor.py (event-loop blocking detector)."""
+
+import asyncio
+import time
+import traceback
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from prometheus_client import REGISTRY
+
+from api.loop_monitor import LoopBlockMonitor
+
+
+def _block_the_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+class TestLoopBlockMonitor:
+    async def test_flags_blocking_call_with_its_stack(self, caplog) -> None:
+        monitor = LoopBlockMonitor(threshold_ms=50, interval=0.01)
+        blocks = REGISTRY.get_sample_value("anyplot_event_loop_blocks_total") or 0.0
+        monitor.start()
+        try:
+            await asyncio.sleep(0.05)
+            _block_the_loop(0.2)
+            await asyncio.sleep(0.05)  # heartbeat resumes and records the stall
+        finally:
+            await monitor.stop()
+
+        assert monitor.total == 1
+        stall = monitor.snapshot()[0]
+        assert 150 <= stall["duration_ms"] <= 400
+        assert any("_block_the_loop" in line for line in stall["stack"])
+        assert "Event loop blocked for" in caplog.text
+        assert REGISTRY.get_sample_value("anyplot_event_loop_blocks_total") == blocks + 1
+
+    async def test_stall_start_is_derived_from_the_last_beat(self) -> None:
+        monitor = LoopBlockMonitor(threshold_ms=80, interval=0.01)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.05)
+            blocked_at = datetime.now(timezone.utc)
+            _block_the_loop(0.2)
+            await asyncio.sleep(0.05)
+        finally:
+            await monitor.stop()
+
+        # Detection happens at least the threshold (80 ms) after the stall began
+        started_at = monitor.stalls[0].started_at
+        assert abs(started_at - blocked_at) < timedelta(milliseconds=40)
+
+    async def test_stack_is_formatted_outside_the_lock(self) -> None:
+        monitor = LoopBlockMonitor(threshold_ms=50, interval=0.01)
+        held = []
+        format_stack = traceback.format_stack
+
+        def record(frame):
+            held.append(monitor._lock.locked())
+            return format_stack(frame)
+
+        monitor.start()
+        try:
+            with patch("api.loop_monitor.traceback.format_stack", side_effect=record):
+                await asyncio.sleep(0.05)
+                _block_the_loop(0.2)
+                await asyncio.sleep(0.05)
+        finally:
+            await monitor.stop()
+
+        assert held == [False]
+        assert any("_block_the_loop" in line for line in monitor.stalls[0].stack)
+
+    async def test_short_callbacks_are_not_flagged(self) -> None:
+        monitor = LoopBlockMonitor(threshold_ms=200, interval=0.01)
+        monitor.start()
+        try:
+            for _ in range(5):
+                _block_the_loop(0.01)
+                await asyncio.sleep(0.01)
+        finally:
+            await monitor.stop()
+
+        assert monitor.total == 0
+        assert not monitor.running
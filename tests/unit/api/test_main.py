@@ -327,9 +327,9 @@ class TestGZipMiddleware:
         """GZip middleware should be configured in the app."""
         from starlette.middleware.gzip import GZipMiddleware
 
-        # Check that GZipMiddleware is in the middleware stack
+        # Check that GZipMiddleware (or the timed subclass) is in the middleware stack
         middleware_classes = [m.cls for m in fastapi_app.user_middleware]
-        assert GZipMiddleware in middleware_classes
+        assert any(isinstance(cls, type) and issubclass(cls, GZipMiddleware) for cls in middleware_classes)
 
     def test_gzip_not_used_for_small_responses(self, client: TestClient) -> None:
         """GZip middleware should not compress small responses."""
@@ -347,7 +347,7 @@ class TestGZipMiddleware:
 
         # Find the GZipMiddleware and check its configuration
         for middleware in fastapi_app.user_middleware:
-            if middleware.cls == GZipMiddleware:
+            if isinstance(middleware.cls, type) and issubclass(middleware.cls, GZipMiddleware):
                 assert middleware.kwargs.get("minimum_size") == 500
                 break
         else:
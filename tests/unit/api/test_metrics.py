@@ -0,0 +1,158 @@
+"""Tests for api/metrics.py and the GET /metrics endpoint."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from api import cache
+from api.main import app
+from api.metrics import _pool_samples, _record_pool, monitor_event_loop_lag, outbound_hooks, sample_pools
+from core.config import settings
+
+
+def _value(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture
+def metrics_client():
+    with patch.object(settings, "metrics_token", "metricsecret"):
+        yield TestClient(app)
+
+
+class TestMetricsEndpoint:
+    def test_503_without_token_configured(self) -> None:
+        with patch.object(settings, "metrics_token", None):
+            response = TestClient(app).get("/metrics")
+        assert response.status_code == 503
+
+    def test_401_with_wrong_token(self, metrics_client) -> None:
+        assert metrics_client.get("/metrics").status_code == 401
+        response = metrics_client.get("/metrics", headers={"Authorization": "Bearer wrong"})
+        assert response.status_code == 401
+
+    def test_text_format(self, metrics_client) -> None:
+        response = metrics_client.get("/metrics", headers={"Authorization": "Bearer metricsecret"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "anyplot_http_request_duration_seconds" in response.text
+
+    def test_openmetrics_negotiated(self, metrics_client) -> None:
+        response = metrics_client.get(
+            "/metrics",
+            headers={"Authorization": "Bearer metricsecret", "Accept": "application/openmetrics-text; version=1.0.0"},
+        )
+        assert response.headers["content-type"].startswith("application/openmetrics-text")
+        assert response.text.endswith("# EOF\n")
+
+
+class TestMetricsMiddleware:
+    def test_counts_route_template_and_status(self) -> None:
+        client = TestClient(app)
+        before = _value("anyplot_http_requests_total", method="GET", route="/health", status="200")
+        unmatched = _value("anyplot_http_requests_total", method="GET", route="unmatched", status="404")
+
+        client.get("/health")
+        client.get("/does-not-exist")
+
+        assert _value("anyplot_http_requests_total", method="GET", route="/health", status="200") == before + 1
+        assert _value("anyplot_http_requests_total", method="GET", route="unmatched", status="404") == unmatched + 1
+        assert _value("anyplot_http_request_duration_seconds_count", method="GET", route="/health") >= 1
+
+
+class TestCacheEvents:
+    @pytest.fixture(autouse=True)
+    def _clear(self):
+        cache.clear_cache()
+        yield
+        cache.clear_cache()
+
+    def test_hit_and_miss_per_namespace(self) -> None:
+        hits = _value("anyplot_cache_events_total", namespace="spec", event="hit")
+        misses = _value("anyplot_cache_events_total", namespace="spec", event="miss")
+
+        cache.get_cache("spec:scatter-basic")
+        cache.set_cache("spec:scatter-basic", {"id": "scatter-basic"})
+        cache.get_cache("spec:scatter-basic")
+
+        assert _value("anyplot_cache_events_total", namespace="spec", event="miss") == misses + 1
+        assert _value("anyplot_cache_events_total", namespace="spec", event="hit") == hits + 1
+
+    async def test_stale_serve_and_refresh(self) -> None:
+        stale = _value("anyplot_cache_events_total", namespace="stats", event="stale")
+        refreshes = _value("anyplot_cache_events_total", namespace="stats", event="refresh")
+
+        async def factory() -> int:
+            return 1
+
+        await cache.get_or_set_cache("stats", factory)
+        assert await cache.get_or_set_cache("stats", factory, refresh_after=-1) == 1
+        await asyncio.sleep(0)  # let the background refresh run
+
+        assert _value("anyplot_cache_events_total", namespace="stats", event="stale") == stale + 1
+        assert _value("anyplot_cache_events_total", namespace="stats", event="refresh") == refreshes + 1
+
+    def test_evictions(self) -> None:
+        clock = [0.0]
+        small = cache._LockPruningTTLCache(maxsize=1, ttl=60, timer=lambda: clock[0])
+        by_size = _value("anyplot_cache_events_total", namespace="a", event="evict_size")
+        by_ttl = _value("anyplot_cache_events_total", namespace="b", event="evict_ttl")
+
+        small["a:1"] = 1
+        small["b:1"] = 1  # full: evicts a:1
+        clock[0] = 120.0
+        small.expire()
+
+        assert _value("anyplot_cache_events_total", namespace="a", event="evict_size") == by_size + 1
+        assert _value("anyplot_cache_events_total", namespace="b", event="evict_ttl") == by_ttl + 1
+
+
+class TestPoolMetrics:
+    def test_counters_follow_pool_totals(self) -> None:
+        _pool_samples.pop("test", None)
+        status = {"size": 5, "checked_out": 2, "checkouts": 10, "checkout_ms_avg": 2.0}
+        status.update(checkout_timeouts=0, connect_errors=1)
+        _record_pool("test", status)
+        _record_pool("test", {**status, "checked_out": 1, "checkouts": 15, "connect_errors": 1})
+
+        assert _value("anyplot_db_pool_checked_out", pool="test") == 1
+        assert _value("anyplot_db_pool_size", pool="test") == 5
+        assert _value("anyplot_db_pool_checkouts_total", pool="test") == 15
+        assert _value("anyplot_db_pool_checkout_wait_seconds_total", pool="test") == pytest.approx(0.03)
+        assert _value("anyplot_db_pool_connect_errors_total", pool="test") == 1
+
+
+class TestOutboundHooks:
+    async def test_records_target_and_status(self) -> None:
+        before = _value("anyplot_outbound_request_duration_seconds_count", target="test", status="204")
+        transport = httpx.MockTransport(lambda request: httpx.Response(204))
+        async with httpx.AsyncClient(transport=transport, event_hooks=outbound_hooks("test")) as client:
+            await client.get("https://example.com/")
+        assert _value("anyplot_outbound_request_duration_seconds_count", target="test", status="204") == before + 1
+
+
+class TestEventLoopLag:
+    async def test_records_lag(self) -> None:
+        before = _value("anyplot_event_loop_lag_seconds_count")
+        task = asyncio.create_task(monitor_event_loop_lag(interval=0.01))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert _value("anyplot_event_loop_lag_seconds_count") > before
+
+
+def test_sample_pools_reads_engines() -> None:
+    engine = MagicMock()
+    with (
+        patch("api.metrics.connection") as mock_connection,
+        patch("api.metrics.get_pool_status", return_value={"size": 3, "checked_out": 0}),
+    ):
+        mock_connection.engine = engine
+        mock_connection.read_engine = None
+        sample_pools()
+    assert _value("anyplot_db_pool_size", pool="api") == 3
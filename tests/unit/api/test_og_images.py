@@ -128,7 +128,7 @@ class TestStaticOgImage:
         loading is broken in the container.
         """
         with (
-            patch("api.routers.og_images.create_home_og_image", side_effect=RuntimeError("PIL broken")),
+            patch("core.images.create_home_og_image", side_effect=RuntimeError("PIL broken")),
             patch("pathlib.Path.read_bytes", return_value=FAKE_PNG),
             patch("api.routers.og_images.track_og_image"),
         ):
@@ -141,7 +141,7 @@ class TestStaticOgImage:
         """If dynamic generation AND the bundled static fallback both fail,
         return 500 — there's nothing to serve."""
         with (
-            patch("api.routers.og_images.create_home_og_image", side_effect=RuntimeError("PIL broken")),
+            patch("core.images.create_home_og_image", side_effect=RuntimeError("PIL broken")),
             patch("pathlib.Path.read_bytes", side_effect=FileNotFoundError("not found")),
             patch("api.routers.og_images.track_og_image"),
         ):
@@ -258,7 +258,7 @@ class TestBrandedImplImage:
             patch("api.routers.og_images.set_cache"),
             patch("api.routers.og_images.SpecRepository", return_value=mock_repo),
             patch("api.routers.og_images._fetch_image", new_callable=AsyncMock, return_value=FAKE_PNG),
-            patch("api.routers.og_images.create_branded_og_image", return_value=FAKE_PNG),
+            patch("core.images.create_branded_og_image", return_value=FAKE_PNG),
         ):
             response = client.get("/og/scatter-basic/python/matplotlib.png")
 
@@ -395,7 +395,7 @@ class TestSpecCollageImage:
             patch("api.routers.og_images.set_cache"),
             patch("api.routers.og_images.SpecRepository", return_value=mock_repo),
             patch("api.routers.og_images._fetch_image", new_callable=AsyncMock, return_value=FAKE_PNG),
-            patch("api.routers.og_images.create_og_collage", return_value=FAKE_PNG),
+            patch("core.images.create_og_collage", return_value=FAKE_PNG),
         ):
             response = client.get("/og/scatter-basic.png")
 
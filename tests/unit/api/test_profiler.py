@@ -0,0 +1,61 @@
+"""Tests for api/profiler.py (sampling profiler behind GET /debug/profile)."""
+
+import threading
+from collections import Counter
+
+from api import profiler
+
+
+def _spin(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def _run_sampled(seconds: float = 0.1):
+    stop = threading.Event()
+    worker = threading.Thread(target=_spin, args=(stop,), name="spinner")
+    worker.start()
+    try:
+        return profiler.sample(seconds, interval=0.002)
+    finally:
+        stop.set()
+        worker.join()
+
+
+class TestSample:
+    def test_captures_other_threads(self) -> None:
+        counts = _run_sampled()
+        spinner = [stack for (thread, stack) in counts if thread == "spinner"]
+        assert spinner
+        assert any(frame[0] == "_spin" and frame[1] == "tests/unit/api/test_profiler.py" for frame in spinner[0])
+
+    def test_skips_the_sampling_thread(self) -> None:
+        counts = _run_sampled(0.02)
+        assert not any(frame[0] == "sample" for (_, stack) in counts for frame in stack)
+
+
+class TestFormats:
+    counts = Counter(
+        {
+            ("MainThread", (("main", "api/main.py", 1), ("filter", "api/routers/plots.py", 10))): 3,
+            ("MainThread", (("main", "api/main.py", 1),)): 1,
+            ("worker", (("render", "core/images.py", 5),)): 2,
+        }
+    )
+
+    def test_collapsed(self) -> None:
+        lines = profiler.to_collapsed(self.counts).splitlines()
+        assert lines[0] == "MainThread;main (api/main.py:1);filter (api/routers/plots.py:10) 3"
+        assert len(lines) == 3
+        assert profiler.to_collapsed(Counter()) == ""
+
+    def test_speedscope(self) -> None:
+        doc = profiler.to_speedscope(self.counts, interval=0.005)
+        frames = [frame["name"] for frame in doc["shared"]["frames"]]
+        assert frames == ["main", "filter", "render"]
+        main, worker = doc["profiles"]
+        assert main["name"] == "MainThread"
+        assert main["samples"] == [[0, 1], [0]]
+        assert main["weights"] == [0.015, 0.005]
+        assert main["endValue"] == 0.02
+        assert worker["samples"] == [[2]]
@@ -4,12 +4,15 @@ Tests for api/routers/ endpoints.
 Tests the modular router endpoints.
 """
 
+import base64
+import gzip
+import threading
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
 
-from api.cache import clear_cache
+from api.cache import clear_cache, clear_cache_by_pattern
 from api.main import app, fastapi_app
 from api.routers.plots import (
     _calculate_contextual_counts,
@@ -17,6 +20,9 @@ from api.routers.plots import (
     _calculate_or_counts,
     _image_matches_groups,
 )
+from api.routers.specs import _build_impl_code
+from core.code_store import CodeBlob, CodeStore
+from core.config import settings
 from core.database import get_db
 from tests.conftest import TEST_IMAGE_URL
 
@@ -204,14 +210,14 @@ class TestLibrariesRouter:
 
     def test_library_images_invalid_library(self, client: TestClient) -> None:
         """Library images should return 404 for invalid library."""
-        mock_spec_repo = MagicMock()
-        mock_spec_repo.get_all = AsyncMock(return_value=[])
+        mock_impl_repo = MagicMock()
+        mock_impl_repo.get_by_library_with_code = AsyncMock(return_value=[])
 
         with (
             patch(DB_CONFIG_PATCH, return_value=True),
             patch("api.routers.libraries.get_cache", return_value=None),
             patch("api.routers.libraries.set_cache"),
-            patch("api.routers.libraries.SpecRepository", return_value=mock_spec_repo),
+            patch("api.routers.libraries.ImplRepository", return_value=mock_impl_repo),
         ):
             response = client.get("/libraries/invalid_lib/images")
             assert response.status_code == 404
@@ -253,13 +259,15 @@ class TestLibrariesRouter:
         """Library images should return images from DB."""
         client, _ = db_client
 
-        mock_spec_repo = MagicMock()
-        mock_spec_repo.get_all_with_code = AsyncMock(return_value=[mock_spec])
+        mock_impl = mock_spec.impls[0]
+        mock_impl.spec_id = "scatter-basic"
+        mock_impl_repo = MagicMock()
+        mock_impl_repo.get_by_library_with_code = AsyncMock(return_value=[mock_impl])
 
         with (
             patch("api.routers.libraries.get_cache", return_value=None),
             patch("api.routers.libraries.set_cache"),
-            patch("api.routers.libraries.SpecRepository", return_value=mock_spec_repo),
+            patch("api.routers.libraries.ImplRepository", return_value=mock_impl_repo),
         ):
             response = client.get("/libraries/matplotlib/images")
             assert response.status_code == 200
@@ -267,6 +275,8 @@ class TestLibrariesRouter:
             assert data["library"] == "matplotlib"
             assert len(data["images"]) == 1
             assert data["images"][0]["spec_id"] == "scatter-basic"
+            # Code is loaded for the requested library only
+            mock_impl_repo.get_by_library_with_code.assert_awaited_once_with("matplotlib")
 
     def test_library_images_cache_hit(self, db_client) -> None:
         """Library images should return cached data when available."""
@@ -347,6 +357,40 @@ class TestSpecsRouter:
             response = client.get("/specs/nonexistent")
             assert response.status_code == 404
 
+    def test_specs_batch(self, client: TestClient, mock_spec) -> None:
+        """Batch should load all uncached specs in one query, keep request order and report misses."""
+        empty_spec = MagicMock()
+        empty_spec.id = "no-impls"
+        empty_spec.impls = []
+        mock_spec_repo = MagicMock()
+        mock_spec_repo.get_by_ids = AsyncMock(return_value=[empty_spec, mock_spec])
+
+        with (
+            patch(DB_CONFIG_PATCH, return_value=True),
+            patch("api.routers.specs.SpecRepository", return_value=mock_spec_repo),
+        ):
+            response = client.get("/specs/batch?ids=nonexistent,scatter-basic,no-impls,scatter-basic")
+            assert response.status_code == 200
+            data = response.json()
+            assert [spec["id"] for spec in data["specs"]] == ["scatter-basic"]
+            assert data["missing"] == ["nonexistent", "no-impls"]
+            mock_spec_repo.get_by_ids.assert_awaited_once_with(["nonexistent", "scatter-basic", "no-impls"])
+
+            # Found specs share the /specs/{spec_id} cache entry; only the misses are queried again
+            mock_spec_repo.get_by_ids.reset_mock(return_value=True)
+            mock_spec_repo.get_by_ids.return_value = []
+            response = client.get("/specs/batch?ids=scatter-basic,nonexistent")
+            assert [spec["id"] for spec in response.json()["specs"]] == ["scatter-basic"]
+            mock_spec_repo.get_by_ids.assert_awaited_once_with(["nonexistent"])
+            assert client.get("/specs/scatter-basic").json() == response.json()["specs"][0]
+
+    def test_specs_batch_limits(self, client: TestClient) -> None:
+        """Batch should reject empty and oversized ID lists."""
+        with patch(DB_CONFIG_PATCH, return_value=True):
+            assert client.get("/specs/batch?ids=,").status_code == 400
+            ids = ",".join(f"spec-{i}" for i in range(51))
+            assert client.get(f"/specs/batch?ids={ids}").status_code == 400
+
     def test_specs_map_without_db(self, client: TestClient) -> None:
         """Specs map should return 503 when DB not configured."""
         with patch(DB_CONFIG_PATCH, return_value=False):
@@ -550,32 +594,67 @@ class TestSeoRouter:
             assert "<loc>https://anyplot.ai/</loc>" in content
 
     def test_sitemap_with_db(self, db_client, mock_spec) -> None:
-        """Sitemap should include specs and implementations from DB."""
+        """Sitemap should be an index of shards; the spec's shard lists its URLs."""
         client, _ = db_client
 
         mock_spec_repo = MagicMock()
         mock_spec_repo.get_all = AsyncMock(return_value=[mock_spec])
 
         with (
-            patch("api.routers.seo.get_cache", return_value=None),
-            patch("api.routers.seo.set_cache"),
+            patch("api.routers.seo.get_or_set_cache", side_effect=_passthrough_cache),
             patch("api.routers.seo.SpecRepository", return_value=mock_spec_repo),
         ):
             response = client.get("/sitemap.xml")
             assert response.status_code == 200
-            # URL format: /, /plots, /specs, /{spec_id}, /{spec_id}/{language}/{library}
+            assert response.headers["content-type"] == "application/xml"
+            assert "<sitemapindex" in response.text
+            assert "<loc>https://anyplot.ai/sitemaps/static.xml.gz</loc>" in response.text
+            assert "https://anyplot.ai/sitemaps/specs-s.xml.gz" in response.text
+
+            static = client.get("/sitemaps/static.xml.gz")
+            assert static.status_code == 200
+            static_xml = gzip.decompress(static.content).decode()
+            assert "https://anyplot.ai/plots" in static_xml
+            assert "https://anyplot.ai/specs" in static_xml
+
+            shard = client.get("/sitemaps/specs-s.xml.gz")
+            assert shard.status_code == 200
+            assert shard.headers["content-type"] == "application/gzip"
+            assert "content-encoding" not in shard.headers
+            assert shard.headers["etag"]
+            text = gzip.decompress(shard.content).decode()
+            # URL format: /{spec_id}, /{spec_id}/{language}/{library}
             # The /{spec_id}/{language} tier is NOT listed — language filtering is
             # served as /{spec_id}?language={language} (filtered hub, same canonical).
-            assert "https://anyplot.ai/plots" in response.text
-            assert "https://anyplot.ai/specs" in response.text
             # Cross-language hub
-            assert "<loc>https://anyplot.ai/scatter-basic</loc>" in response.text
+            assert "<loc>https://anyplot.ai/scatter-basic</loc>" in text
             # Language-overview tier must NOT appear (consolidated onto hub)
-            assert "<loc>https://anyplot.ai/scatter-basic/python</loc>" not in response.text
+            assert "<loc>https://anyplot.ai/scatter-basic/python</loc>" not in text
             # Implementation detail
-            assert "<loc>https://anyplot.ai/scatter-basic/python/matplotlib</loc>" in response.text
+            assert "<loc>https://anyplot.ai/scatter-basic/python/matplotlib</loc>" in text
             # Legacy /python/{spec} prefix must NOT appear
-            assert "https://anyplot.ai/python/scatter-basic" not in response.text
+            assert "https://anyplot.ai/python/scatter-basic" not in text
+
+    def test_sitemap_shard_etag_and_missing(self, db_client, mock_spec) -> None:
+        """Shards answer If-None-Match with 304; unknown shards are 404."""
+        client, _ = db_client
+
+        mock_spec_repo = MagicMock()
+        mock_spec_repo.get_all = AsyncMock(return_value=[mock_spec])
+
+        with (
+            patch("api.routers.seo.get_or_set_cache", side_effect=_passthrough_cache),
+            patch("api.routers.seo.SpecRepository", return_value=mock_spec_repo),
+        ):
+            first = client.get("/sitemaps/specs-s.xml.gz")
+            assert first.status_code == 200
+            assert first.headers["cache-control"] == "public, max-age=3600"
+
+            second = client.get("/sitemaps/specs-s.xml.gz", headers={"If-None-Match": first.headers["etag"]})
+            assert second.status_code == 304
+            assert second.content == b""
+
+            assert client.get("/sitemaps/specs-z.xml.gz").status_code == 404
 
 
 class TestSeoProxyRouter:
@@ -614,7 +693,7 @@ class TestSeoProxyRouter:
         client, _ = db_client
 
         mock_spec_repo = MagicMock()
-        mock_spec_repo.get_by_id = AsyncMock(return_value=mock_spec)
+        mock_spec_repo.get_all = AsyncMock(return_value=[mock_spec])
 
         with patch("api.routers.seo.SpecRepository", return_value=mock_spec_repo):
             response = client.get("/seo-proxy/scatter-basic")
@@ -630,7 +709,7 @@ class TestSeoProxyRouter:
         client, _ = db_client
 
         mock_spec_repo = MagicMock()
-        mock_spec_repo.get_by_id = AsyncMock(return_value=None)
+        mock_spec_repo.get_all = AsyncMock(return_value=[])
 
         with patch("api.routers.seo.SpecRepository", return_value=mock_spec_repo):
             response = client.get("/seo-proxy/nonexistent-spec")
@@ -666,7 +745,7 @@ class TestSeoProxyRouter:
         client, _ = db_client
 
         mock_spec_repo = MagicMock()
-        mock_spec_repo.get_by_id = AsyncMock(return_value=mock_spec)
+        mock_spec_repo.get_all = AsyncMock(return_value=[mock_spec])
 
         with patch("api.routers.seo.SpecRepository", return_value=mock_spec_repo):
             response = client.get("/seo-proxy/scatter-basic/python/matplotlib")
@@ -683,7 +762,7 @@ class TestSeoProxyRouter:
         client, _ = db_client
 
         mock_spec_repo = MagicMock()
-        mock_spec_repo.get_by_id = AsyncMock(return_value=None)
+        mock_spec_repo.get_all = AsyncMock(return_value=[])
 
         with patch("api.routers.seo.SpecRepository", return_value=mock_spec_repo):
             response = client.get("/seo-proxy/nonexistent-spec/python/matplotlib")
@@ -708,13 +787,44 @@ class TestSeoProxyRouter:
         mock_spec_no_preview.impls = [mock_impl_no_preview]
 
         mock_spec_repo = MagicMock()
-        mock_spec_repo.get_by_id = AsyncMock(return_value=mock_spec_no_preview)
+        mock_spec_repo.get_all = AsyncMock(return_value=[mock_spec_no_preview])
 
         with patch("api.routers.seo.SpecRepository", return_value=mock_spec_repo):
             response = client.get("/seo-proxy/scatter-basic/python/seaborn")
             assert response.status_code == 200
             assert "api.anyplot.ai/og/home.png" in response.text  # Default image via API
 
+    def test_seo_pages_prerendered_once(self, db_client, mock_spec) -> None:
+        """Bot pages are rendered from one catalog load, precompressed and ETagged."""
+        client, _ = db_client
+
+        mock_spec_repo = MagicMock()
+        mock_spec_repo.get_all = AsyncMock(return_value=[mock_spec])
+
+        with patch("api.routers.seo.SpecRepository", return_value=mock_spec_repo):
+            hub = client.get("/seo-proxy/scatter-basic")
+            assert hub.status_code == 200
+            assert hub.headers["content-encoding"] == "gzip"
+            assert "Basic Scatter Plot" in hub.text
+
+            impl = client.get("/seo-proxy/scatter-basic/python/matplotlib", headers={"Accept-Encoding": "identity"})
+            assert impl.status_code == 200
+            assert "content-encoding" not in impl.headers
+            assert "api.anyplot.ai/og/scatter-basic/python/matplotlib.png" in impl.text
+
+            # Known spec without that implementation: rendered on the fly with the default image
+            other = client.get("/seo-proxy/scatter-basic/python/bokeh")
+            assert other.status_code == 200
+            assert "Basic Scatter Plot - bokeh" in other.text
+            assert "api.anyplot.ai/og/home.png" in other.text
+
+            assert client.get("/seo-proxy/unknown-spec/python/matplotlib").status_code == 404
+
+            not_modified = client.get("/seo-proxy/scatter-basic", headers={"If-None-Match": hub.headers["etag"]})
+            assert not_modified.status_code == 304
+
+        mock_spec_repo.get_all.assert_awaited_once()
+
     def test_seo_about(self, client: TestClient) -> None:
         """SEO about page should return HTML with og:tags."""
         response = client.get("/seo-proxy/about")
@@ -791,7 +901,7 @@ class TestOgImagesRouter:
 
         with (
             patch("api.routers.og_images.track_og_image"),
-            patch("api.routers.og_images.create_home_og_image", side_effect=RuntimeError("PIL broken")),
+            patch("core.images.create_home_og_image", side_effect=RuntimeError("PIL broken")),
             patch("pathlib.Path.read_bytes", side_effect=FileNotFoundError("not found")),
         ):
             response = client.get("/og/home.png")
@@ -902,7 +1012,7 @@ class TestOgImagesRouter:
             patch("api.routers.og_images.set_cache"),
             patch("api.routers.og_images.SpecRepository", return_value=mock_spec_repo),
             patch("api.routers.og_images._fetch_image", new_callable=AsyncMock, return_value=fake_image_bytes),
-            patch("api.routers.og_images.create_branded_og_image", return_value=fake_branded_bytes),
+            patch("core.images.create_branded_og_image", return_value=fake_branded_bytes),
         ):
             response = client.get("/og/scatter-basic/python/matplotlib.png")
             assert response.status_code == 200
@@ -937,7 +1047,7 @@ class TestOgImagesRouter:
             patch("api.routers.og_images.set_cache"),
             patch("api.routers.og_images.SpecRepository", return_value=mock_spec_repo),
             patch("api.routers.og_images._fetch_image", new_callable=AsyncMock, return_value=b"fake image"),
-            patch("api.routers.og_images.create_og_collage", return_value=fake_collage_bytes),
+            patch("core.images.create_og_collage", return_value=fake_collage_bytes),
         ):
             response = client.get("/og/scatter-basic.png")
             assert response.status_code == 200
@@ -1014,19 +1124,16 @@ class TestPlotsRouter:
             assert data["total"] == 1
 
     def test_filter_cached(self, client: TestClient) -> None:
-        """Filter should return cached response when available."""
-        cached_response = MagicMock()
-        cached_response.total = 5
-        cached_response.images = []
-        cached_response.counts = {}
-        cached_response.globalCounts = {}
-        cached_response.orCounts = []
-        cached_response.specTitles = {}
-        cached_response.offset = 0
-        cached_response.limit = None
+        """Filter should return cached sections when available."""
+        cached = {
+            "filter:catalog": {"generation": 7, "global_counts": {"lib": {"matplotlib": 5}}, "spec_titles": {"s": "S"}},
+            "filter:all:7:images": [{"spec_id": "s", "library": "matplotlib"}] * 5,
+            "filter:all:7:counts": {"lib": {"matplotlib": 5}},
+            "filter:all:7:or": [],
+        }
 
         async def _return_cached(key, factory, **kwargs):
-            return cached_response
+            return cached[key]
 
         with (
             patch(DB_CONFIG_PATCH, return_value=True),
@@ -1034,6 +1141,10 @@ class TestPlotsRouter:
         ):
             response = client.get("/plots/filter")
             assert response.status_code == 200
+            data = response.json()
+            assert data["total"] == 5
+            assert data["globalCounts"] == {"lib": {"matplotlib": 5}}
+            assert data["specTitles"] == {"s": "S"}
 
     def test_filter_with_limit(self, client: TestClient, mock_spec) -> None:
         """Filter with limit should return limited images but total of all."""
@@ -1137,6 +1248,89 @@ class TestPlotsRouter:
             assert data["limit"] is None
 
 
+class TestPlotsFilterPagination:
+    """Tests for cursor pagination and the fields projection on /plots/filter."""
+
+    @pytest.fixture
+    def three_image_repo(self, mock_spec) -> MagicMock:
+        for library in ("plotly", "seaborn"):
+            impl = MagicMock()
+            impl.library_id = library
+            impl.preview_url = TEST_IMAGE_URL
+            impl.preview_html = None
+            impl.quality_score = 80.0
+            impl.impl_tags = {}
+            mock_spec.impls.append(impl)
+        repo = MagicMock()
+        repo.get_all = AsyncMock(return_value=[mock_spec])
+        return repo
+
+    def test_cursor_walks_all_pages(self, client: TestClient, three_image_repo) -> None:
+        """nextCursor should page through every image once and be null on the last page."""
+        with (
+            patch(DB_CONFIG_PATCH, return_value=True),
+            patch("api.routers.plots.SpecRepository", return_value=three_image_repo),
+        ):
+            first = client.get("/plots/filter?lib=matplotlib,plotly,seaborn&limit=2").json()
+            assert len(first["images"]) == 2
+            assert first["nextCursor"]
+
+            url = f"/plots/filter?lib=matplotlib,plotly,seaborn&limit=2&fields=images&cursor={first['nextCursor']}"
+            second = client.get(url).json()
+            assert set(second) == {"total", "images", "offset", "limit", "nextCursor"}
+            assert second["offset"] == 2
+            assert second["nextCursor"] is None
+            libraries = [img["library"] for img in first["images"] + second["images"]]
+            assert sorted(libraries) == ["matplotlib", "plotly", "seaborn"]
+
+            # Catalog loaded once; later pages reuse the cached sections
+            three_image_repo.get_all.assert_awaited_once()
+
+    def test_cursor_rejected_for_other_filter(self, client: TestClient, three_image_repo) -> None:
+        """A cursor is bound to its filter; malformed cursors are rejected."""
+        with (
+            patch(DB_CONFIG_PATCH, return_value=True),
+            patch("api.routers.plots.SpecRepository", return_value=three_image_repo),
+        ):
+            cursor = client.get("/plots/filter?limit=1").json()["nextCursor"]
+            assert client.get(f"/plots/filter?lib=matplotlib&cursor={cursor}").status_code == 400
+            assert client.get("/plots/filter?cursor=not-a-cursor").status_code == 400
+
+            # A boolean offset is not an int offset, even though bool subclasses int
+            forged = base64.urlsafe_b64encode(b'{"k":"filter:all","o":true}').decode().rstrip("=")
+            assert client.get(f"/plots/filter?limit=1&cursor={forged}").status_code == 400
+
+    def test_sections_follow_the_catalog_generation(self, client: TestClient, three_image_repo) -> None:
+        """Rebuilding the catalog recomputes the per-filter sections instead of mixing generations."""
+        with (
+            patch(DB_CONFIG_PATCH, return_value=True),
+            patch("api.routers.plots.SpecRepository", return_value=three_image_repo),
+        ):
+            assert client.get("/plots/filter?fields=images").json()["total"] == 3
+
+            three_image_repo.get_all.return_value[0].impls.pop()
+            clear_cache_by_pattern("filter:catalog")  # e.g. the catalog expired before its sections
+            data = client.get("/plots/filter").json()
+
+            assert data["total"] == 2
+            assert len(data["images"]) == 2
+            assert sum(data["counts"]["lib"].values()) == 2
+
+    def test_fields_projection(self, client: TestClient, three_image_repo) -> None:
+        """fields= should return only the requested sections and reject unknown ones."""
+        with (
+            patch(DB_CONFIG_PATCH, return_value=True),
+            patch("api.routers.plots.SpecRepository", return_value=three_image_repo),
+            patch("api.routers.plots._calculate_or_counts") as or_counts,
+        ):
+            data = client.get("/plots/filter?fields=globalCounts").json()
+            assert set(data) == {"total", "globalCounts", "offset", "limit", "nextCursor"}
+            assert data["total"] == 3
+            or_counts.assert_not_called()
+
+            assert client.get("/plots/filter?fields=images,bogus").status_code == 400
+
+
 class TestPlotsHelperFunctions:
     """Tests for plots.py helper functions."""
 
@@ -1798,7 +1992,7 @@ class TestSpecCodeEndpoint:
 
     def test_code_cache_hit(self, client: TestClient) -> None:
         """Code endpoint should return cached data when available."""
-        cached = {"spec_id": "scatter-basic", "library": "matplotlib", "code": "cached code"}
+        cached = CodeBlob.from_code("scatter-basic", "matplotlib", "cached code")
 
         async def _return_cached(key, factory, **kwargs):
             return cached
@@ -1810,3 +2004,160 @@ class TestSpecCodeEndpoint:
             response = client.get("/specs/scatter-basic/matplotlib/code")
             assert response.status_code == 200
             assert response.json()["code"] == "cached code"
+
+    def test_code_etag_and_not_modified(self, client: TestClient) -> None:
+        """Code endpoint should send a content-hash ETag and answer If-None-Match with 304."""
+        mock_impl = MagicMock()
+        mock_impl.code = "plt.plot(x)  # noqa: F401"
+        mock_impl_repo = MagicMock()
+        mock_impl_repo.get_code = AsyncMock(return_value=mock_impl)
+
+        with (
+            patch(DB_CONFIG_PATCH, return_value=True),
+            patch("api.routers.specs.get_or_set_cache", side_effect=_passthrough_cache),
+            patch("api.routers.specs.ImplRepository", return_value=mock_impl_repo),
+        ):
+            response = client.get("/specs/scatter-basic/matplotlib/code")
+            etag = response.headers["etag"]
+            assert response.headers["content-encoding"] == "gzip"
+            assert response.json()["code"] == "plt.plot(x)"
+
+            response = client.get("/specs/scatter-basic/matplotlib/code", headers={"If-None-Match": etag})
+            assert response.status_code == 304
+            assert response.content == b""
+
+            response = client.get("/specs/scatter-basic/matplotlib/code", headers={"Accept-Encoding": "identity"})
+            assert "content-encoding" not in response.headers
+            assert response.headers["etag"] == etag
+
+    def test_code_served_from_store(self, client: TestClient, tmp_path) -> None:
+        """Code endpoint should serve the sync job's blob store without querying the DB."""
+        store = CodeStore(tmp_path)
+        store.put("scatter-basic", "matplotlib", "stored code")
+        store.save()
+        mock_impl_repo = MagicMock()
+        mock_impl_repo.get_code = AsyncMock(return_value=None)
+
+        with (
+            patch(DB_CONFIG_PATCH, return_value=True),
+            patch("api.routers.specs.get_or_set_cache", side_effect=_passthrough_cache),
+            patch("api.routers.specs.ImplRepository", return_value=mock_impl_repo),
+            patch.object(settings, "code_store_dir", str(tmp_path)),
+        ):
+            response = client.get("/specs/scatter-basic/matplotlib/code")
+            assert response.status_code == 200
+            assert response.json()["code"] == "stored code"
+            mock_impl_repo.get_code.assert_not_called()
+
+            # Missing from the store: falls back to the DB
+            response = client.get("/specs/scatter-basic/plotly/code")
+            assert response.status_code == 404
+            mock_impl_repo.get_code.assert_awaited_once()
+
+    async def test_code_store_read_off_the_event_loop(self, tmp_path) -> None:
+        """The manifest and blobs live on a mounted bucket, so they are read in a worker thread."""
+        store = CodeStore(tmp_path)
+        store.put("scatter-basic", "matplotlib", "stored code")
+        store.save()
+        threads = []
+        load, get = CodeStore.load, CodeStore.get
+
+        def record(method):
+            def wrapper(*args):
+                threads.append(threading.current_thread())
+                return method(*args)
+
+            return wrapper
+
+        with (
+            patch("api.routers.specs.get_or_set_cache", side_effect=_passthrough_cache),
+            patch.object(settings, "code_store_dir", str(tmp_path)),
+            patch.object(CodeStore, "load", record(load)),
+            patch.object(CodeStore, "get", record(get)),
+        ):
+            blob = await _build_impl_code(MagicMock(), "scatter-basic", "matplotlib")
+
+        assert b"stored code" in blob.body()
+        assert len(threads) == 2
+        assert threading.main_thread() not in threads
+
+
+class TestSearchRouter:
+    """Tests for the /search endpoint."""
+
+    def test_search_without_db(self, client: TestClient) -> None:
+        """Search should return 503 when DB not configured."""
+        with patch(DB_CONFIG_PATCH, return_value=False):
+            response = client.get("/search?q=scatter")
+            assert response.status_code == 503
+
+    def test_search_requires_query(self, client: TestClient) -> None:
+        """Search should reject a missing query."""
+        with patch(DB_CONFIG_PATCH, return_value=True):
+            response = client.get("/search")
+            assert response.status_code == 422
+
+    def test_search_with_db(self, db_client, mock_spec) -> None:
+        """Search should rank specs from the index built out of the DB."""
+        client, _ = db_client
+        mock_spec_repo = MagicMock()
+        mock_spec_repo.get_all = AsyncMock(return_value=[mock_spec])
+
+        with (
+            patch("api.search.get_or_set_cache", side_effect=_passthrough_cache),
+            patch("api.search.SpecRepository", return_value=mock_spec_repo),
+        ):
+            response = client.get("/search?q=basic scatter")
+            assert response.status_code == 200
+            data = response.json()
+            assert data["query"] == "basic scatter"
+            assert data["total"] == 1
+            assert data["results"][0]["id"] == "scatter-basic"
+            assert data["results"][0]["score"] > 0
+
+    def test_search_no_matches(self, db_client, mock_spec) -> None:
+        """Search should return an empty result list when nothing matches."""
+        client, _ = db_client
+        mock_spec_repo = MagicMock()
+        mock_spec_repo.get_all = AsyncMock(return_value=[mock_spec])
+
+        with (
+            patch("api.search.get_or_set_cache", side_effect=_passthrough_cache),
+            patch("api.search.SpecRepository", return_value=mock_spec_repo),
+        ):
+            response = client.get("/search?q=xylophone")
+            assert response.status_code == 200
+            assert response.json() == {"query": "xylophone", "total": 0, "results": []}
+
+    def test_search_code_with_db(self, client: TestClient, mock_spec) -> None:
+        """Code search should return highlighted snippets, fetching code only for hits."""
+        mock_spec_repo = MagicMock()
+        mock_spec_repo.get_all = AsyncMock(return_value=[mock_spec])
+        mock_impl_repo = MagicMock()
+        mock_impl_repo.get_code_documents = AsyncMock(
+            return_value=[("scatter-basic", "matplotlib", "fig, ax = plt.subplots()\nax.scatter(x, y)")]
+        )
+        mock_impl_repo.get_codes = AsyncMock(
+            return_value={("scatter-basic", "matplotlib"): "fig, ax = plt.subplots()\nax.scatter(x, y)"}
+        )
+
+        with (
+            patch(DB_CONFIG_PATCH, return_value=True),
+            patch("api.search.get_or_set_cache", side_effect=_passthrough_cache),
+            patch("api.search.SpecRepository", return_value=mock_spec_repo),
+            patch("api.search.ImplRepository", return_value=mock_impl_repo),
+        ):
+            response = client.get("/search/code?q=scatter&library=matplotlib&tag=scatter")
+            assert response.status_code == 200
+            data = response.json()
+            assert data["total"] == 1
+            hit = data["results"][0]
+            assert (hit["spec_id"], hit["library"]) == ("scatter-basic", "matplotlib")
+            assert "<mark>scatter</mark>" in hit["snippet"]
+            mock_impl_repo.get_codes.assert_awaited_once_with([("scatter-basic", "matplotlib")])
+
+            response = client.get("/search/code?q=scatter&library=plotly")
+            assert response.json()["total"] == 0
+
+            response = client.get("/search/code?q=scatter&tag=nonexistent-tag")
+            assert response.json()["total"] == 0
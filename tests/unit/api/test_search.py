@@ -0,0 +1,136 @@
+"""Tests for api/search.py (search index resolution: persisted file first, then DB)."""
+
+import threading
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from api.search import (
+    CODE_INDEX_FILE,
+    SPEC_INDEX_FILE,
+    _refresh_code_index,
+    _refresh_spec_index,
+    get_code_index,
+    get_spec_index,
+)
+from core.search import build_code_index, build_spec_index
+
+
+def _spec_index(spec_id: str):
+    return build_spec_index([{"id": spec_id, "title": "Basic Scatter Plot", "description": "Correlation"}])
+
+
+async def _passthrough_cache(key, factory, **kwargs):
+    return await factory()
+
+
+def _db_context(session):
+    @asynccontextmanager
+    async def context():
+        yield session
+
+    return context
+
+
+@pytest.fixture
+def persisted_dir(tmp_path):
+    with patch("api.search.settings.search_index_dir", str(tmp_path)):
+        yield tmp_path
+
+
+class TestSpecIndex:
+    async def test_refresh_prefers_persisted_index(self, persisted_dir) -> None:
+        _spec_index("scatter-persisted").save(persisted_dir / SPEC_INDEX_FILE)
+        build = AsyncMock(return_value=_spec_index("scatter-db"))
+
+        with patch("api.search._build_spec_index_from_db", build), patch("api.search.get_db_context") as db_context:
+            index = await _refresh_spec_index()
+
+        assert [doc_id for doc_id, _ in index.search("scatter")] == ["scatter-persisted"]
+        build.assert_not_awaited()
+        db_context.assert_not_called()
+
+    async def test_refresh_falls_back_to_db_without_persisted_index(self, persisted_dir) -> None:
+        session = MagicMock()
+        build = AsyncMock(return_value=_spec_index("scatter-db"))
+
+        with (
+            patch("api.search._build_spec_index_from_db", build),
+            patch("api.search.get_db_context", _db_context(session)),
+        ):
+            index = await _refresh_spec_index()
+
+        assert [doc_id for doc_id, _ in index.search("scatter")] == ["scatter-db"]
+        build.assert_awaited_once_with(session)
+
+    async def test_builds_off_the_event_loop(self, persisted_dir) -> None:
+        threads = []
+
+        def build(documents):
+            threads.append(threading.current_thread())
+            return build_spec_index(documents)
+
+        spec = MagicMock(
+            id="scatter-basic", title="Basic Scatter Plot", description="Correlation", tags=None, notes=None
+        )
+        spec.applications, spec.data = [], []
+        spec.impls = [MagicMock()]
+        repo = MagicMock()
+        repo.get_all = AsyncMock(return_value=[spec])
+        with (
+            patch("api.search.get_or_set_cache", side_effect=_passthrough_cache),
+            patch("api.search.SpecRepository", return_value=repo),
+            patch("api.search.build_spec_index", side_effect=build),
+        ):
+            index = await get_spec_index(MagicMock())
+
+        assert threads and threads[0] is not threading.main_thread()
+        assert [doc_id for doc_id, _ in index.search("scatter")] == ["scatter-basic"]
+
+
+class TestCodeIndex:
+    async def test_empty_persisted_index_is_used(self, persisted_dir) -> None:
+        build_code_index([]).save(persisted_dir / CODE_INDEX_FILE)
+        build = AsyncMock()
+
+        with (
+            patch("api.search.get_or_set_cache", side_effect=_passthrough_cache),
+            patch("api.search._build_code_index_from_db", build),
+        ):
+            index = await get_code_index(MagicMock())
+
+        assert len(index) == 0
+        build.assert_not_awaited()
+
+    async def test_refresh_prefers_persisted_index(self, persisted_dir) -> None:
+        code = {"spec_id": "scatter-basic", "library_id": "matplotlib", "code": "ax.twinx()", "tags": []}
+        build_code_index([code]).save(persisted_dir / CODE_INDEX_FILE)
+
+        with patch("api.search.get_db_context") as db_context:
+            index = await _refresh_code_index()
+
+        assert len(index.search("twinx")) == 1
+        db_context.assert_not_called()
+
+    async def test_refresh_builds_off_the_event_loop_without_persisted_index(self, persisted_dir) -> None:
+        threads = []
+
+        def build(documents):
+            threads.append(threading.current_thread())
+            return build_code_index(documents)
+
+        specs = MagicMock()
+        specs.get_all = AsyncMock(return_value=[])
+        impls = MagicMock()
+        impls.get_code_documents = AsyncMock(return_value=[("scatter-basic", "matplotlib", "ax.twinx()")])
+        with (
+            patch("api.search.get_db_context", _db_context(MagicMock())),
+            patch("api.search.SpecRepository", return_value=specs),
+            patch("api.search.ImplRepository", return_value=impls),
+            patch("api.search.build_code_index", side_effect=build),
+        ):
+            index = await _refresh_code_index()
+
+        assert threads and threads[0] is not threading.main_thread()
+        assert len(index.search("twinx")) == 1
@@ -4,10 +4,22 @@ Tests for SEO helper functions.
 Directly tests the pure helper functions in api/routers/seo.py.
 """
 
+import gzip
+import threading
 from datetime import datetime
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
-from api.routers.seo import BOT_HTML_TEMPLATE, _build_sitemap_xml, _lastmod
+import pytest
+
+from api.routers import seo
+from api.routers.seo import (
+    BOT_HTML_TEMPLATE,
+    BotPageStore,
+    _build_bot_pages,
+    _build_sitemap_xml,
+    _lastmod,
+    _update_sitemap_shards,
+)
 
 
 class TestLastmod:
@@ -183,6 +195,85 @@ class TestBuildSitemapXml:
         assert "<loc>https://anyplot.ai/scatter-basic</loc></url>" in result
 
 
+def _make_spec(spec_id: str, updated: datetime, libraries: tuple[str, ...] = ("matplotlib",)) -> MagicMock:
+    library = MagicMock()
+    library.language = "python"
+    impls = []
+    for library_id in libraries:
+        impl = MagicMock()
+        impl.library_id = library_id
+        impl.library = library
+        impl.updated = updated
+        impls.append(impl)
+    spec = MagicMock()
+    spec.id = spec_id
+    spec.impls = impls
+    spec.updated = updated
+    return spec
+
+
+class TestSitemapShards:
+    """Tests for the sharded sitemap index (_update_sitemap_shards)."""
+
+    @pytest.fixture(autouse=True)
+    def reset_shards(self):
+        original = dict(seo._sitemap_shards)
+        yield
+        seo._sitemap_shards.clear()
+        seo._sitemap_shards.update(original)
+
+    def test_index_lists_static_and_prefix_shards(self) -> None:
+        specs = [
+            _make_spec("scatter-basic", datetime(2025, 3, 15)),
+            _make_spec("bar-grouped", datetime(2025, 3, 1)),
+            _make_spec("sankey-basic", datetime(2025, 4, 2)),
+        ]
+        index = _update_sitemap_shards(specs)
+        assert "<sitemapindex" in index
+        assert "<loc>https://anyplot.ai/sitemaps/static.xml.gz</loc>" in index
+        assert "<loc>https://anyplot.ai/sitemaps/specs-b.xml.gz</loc><lastmod>2025-03-01</lastmod>" in index
+        assert "<loc>https://anyplot.ai/sitemaps/specs-s.xml.gz</loc><lastmod>2025-04-02</lastmod>" in index
+        assert "<urlset" not in index
+
+        shard = gzip.decompress(seo._sitemap_shards["specs-s"].gzipped).decode()
+        assert "<loc>https://anyplot.ai/scatter-basic/python/matplotlib</loc>" in shard
+        assert "<loc>https://anyplot.ai/sankey-basic</loc>" in shard
+        assert "bar-grouped" not in shard
+        # Static pages only live in the static shard
+        assert "<loc>https://anyplot.ai/plots</loc>" not in shard
+
+    def test_unchanged_shard_is_reused(self) -> None:
+        _update_sitemap_shards([_make_spec("scatter-basic", datetime(2025, 3, 15))])
+        shard = seo._sitemap_shards["specs-s"]
+
+        _update_sitemap_shards([_make_spec("scatter-basic", datetime(2025, 3, 15))])
+        assert seo._sitemap_shards["specs-s"] is shard
+
+    def test_changed_shard_is_regenerated(self) -> None:
+        _update_sitemap_shards(
+            [_make_spec("scatter-basic", datetime(2025, 3, 15)), _make_spec("bar-grouped", datetime(2025, 3, 1))]
+        )
+        bar_shard = seo._sitemap_shards["specs-b"]
+        scatter_shard = seo._sitemap_shards["specs-s"]
+
+        _update_sitemap_shards(
+            [
+                _make_spec("scatter-basic", datetime(2025, 3, 15), ("matplotlib", "seaborn")),
+                _make_spec("bar-grouped", datetime(2025, 3, 1)),
+            ]
+        )
+        assert seo._sitemap_shards["specs-b"] is bar_shard
+        assert seo._sitemap_shards["specs-s"].etag != scatter_shard.etag
+        assert b"seaborn" in gzip.decompress(seo._sitemap_shards["specs-s"].gzipped)
+
+    def test_emptied_shard_is_dropped(self) -> None:
+        _update_sitemap_shards([_make_spec("scatter-basic", datetime(2025, 3, 15))])
+        index = _update_sitemap_shards([_make_spec("bar-grouped", datetime(2025, 3, 1))])
+        assert "specs-s" not in seo._sitemap_shards
+        assert "specs-s.xml.gz" not in index
+        assert "static" in seo._sitemap_shards
+
+
 class TestBotHtmlTemplate:
     """Tests for the BOT_HTML_TEMPLATE."""
 
@@ -207,3 +298,24 @@ class TestBotHtmlTemplate:
         result = BOT_HTML_TEMPLATE.format(title="t", description="d", image="i", url=url)
         assert 'rel="canonical"' in result
         assert url in result
+
+
+class TestBotPages:
+    """Tests for the pre-rendered bot page store."""
+
+    async def test_pages_are_rendered_off_the_event_loop(self) -> None:
+        impl = MagicMock(library_id="matplotlib", preview_url="https://example.com/p.png")
+        impl.library.language = "python"
+        spec = MagicMock(id="scatter-basic", title="Basic Scatter", description="Scatter", impls=[impl])
+        threads = []
+
+        def build(specs):
+            threads.append(threading.current_thread())
+            return BotPageStore(specs)
+
+        with patch("api.routers.seo.BotPageStore", side_effect=build):
+            store = await _build_bot_pages([spec])
+
+        assert threads and threads[0] is not threading.main_thread()
+        assert set(store.pages) == {"scatter-basic", "scatter-basic/python/matplotlib"}
+        assert b"Basic Scatter" in gzip.decompress(store.pages["scatter-basic"].gzipped)
@@ -0,0 +1,110 @@
+"""Tests for api/snapshot.py (cache warm-up from the catalog snapshot)."""
+
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+
+import msgpack
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from api.cache import cache_key, clear_cache, get_cache, set_cache
+from api.snapshot import load_catalog_snapshot, verify_catalog_snapshot, warm_cache
+from core.database.models import Impl, Library, Spec
+from core.snapshot import CatalogSnapshot, fingerprint, fingerprint_query
+
+
+@pytest.fixture(autouse=True)
+def _clean_cache():
+    clear_cache()
+    yield
+    clear_cache()
+
+
+@pytest.fixture
+async def snapshot(test_db_with_data) -> CatalogSnapshot:
+    session = test_db_with_data
+    specs = (await session.scalars(select(Spec).options(selectinload(Spec.impls).selectinload(Impl.library)))).all()
+    libraries = (await session.scalars(select(Library).order_by(Library.name))).all()
+    current = fingerprint((await session.execute(fingerprint_query())).one())
+    return CatalogSnapshot.loads(CatalogSnapshot.from_orm(specs, libraries, current).dumps())
+
+
+def _db_context(session):
+    @asynccontextmanager
+    async def context():
+        yield session
+
+    return context
+
+
+class TestWarmCache:
+    async def test_fills_catalog_entries(self, snapshot) -> None:
+        warm_cache(snapshot)
+
+        specs = get_cache(cache_key("specs_list"))
+        assert {item.id for item in specs} == {spec.id for spec in snapshot.specs if spec.impls}
+        assert get_cache("filter:catalog") is not None
+        assert [library["id"] for library in get_cache(cache_key("libraries"))["libraries"]] == [
+            "matplotlib",
+            "seaborn",
+        ]
+
+
+class TestLoadCatalogSnapshot:
+    async def test_unset_path_returns_none(self) -> None:
+        with patch("api.snapshot.settings.catalog_snapshot_path", None):
+            assert await load_catalog_snapshot() is None
+
+    async def test_missing_or_corrupt_file_returns_none(self, tmp_path) -> None:
+        path = tmp_path / "catalog.msgpack"
+        with patch("api.snapshot.settings.catalog_snapshot_path", str(path)):
+            assert await load_catalog_snapshot() is None
+            path.write_bytes(b"not msgpack")
+            assert await load_catalog_snapshot() is None
+            path.write_bytes(msgpack.packb([1, 2]))
+            assert await load_catalog_snapshot() is None
+            path.write_bytes(msgpack.packb({"format": 1, "specs": [{"id": "x"}], "libraries": []}))
+            assert await load_catalog_snapshot() is None
+        assert get_cache(cache_key("specs_list")) is None
+
+    async def test_loads_and_warms_the_cache(self, snapshot, tmp_path) -> None:
+        path = tmp_path / "catalog.msgpack"
+        snapshot.save(path)
+
+        with patch("api.snapshot.settings.catalog_snapshot_path", str(path)):
+            loaded = await load_catalog_snapshot()
+
+        assert loaded is not None
+        assert loaded.fingerprint == snapshot.fingerprint
+        assert get_cache(cache_key("specs_list")) is not None
+
+
+class TestVerifyCatalogSnapshot:
+    async def test_current_snapshot_keeps_the_cache(self, snapshot, test_session) -> None:
+        warm_cache(snapshot)
+
+        with patch("api.snapshot.get_db_context", _db_context(test_session)):
+            assert await verify_catalog_snapshot(snapshot) is True
+
+        assert get_cache(cache_key("specs_list")) is not None
+
+    async def test_stale_snapshot_clears_the_cache(self, snapshot, test_session) -> None:
+        warm_cache(snapshot)
+        set_cache(cache_key("spec", "scatter-basic"), "derived")
+        test_session.add(Library(id="plotly", name="Plotly"))
+        await test_session.commit()
+
+        with patch("api.snapshot.get_db_context", _db_context(test_session)):
+            assert await verify_catalog_snapshot(snapshot) is False
+
+        assert get_cache(cache_key("specs_list")) is None
+        assert get_cache(cache_key("spec", "scatter-basic")) is None
+
+    async def test_database_error_keeps_the_snapshot(self, snapshot) -> None:
+        warm_cache(snapshot)
+
+        with patch("api.snapshot.get_db_context", side_effect=RuntimeError("no database")):
+            assert await verify_catalog_snapshot(snapshot) is True
+
+        assert get_cache(cache_key("specs_list")) is not None
@@ -0,0 +1,107 @@
+"""Cold-start imports of api.main and the deferred MCP server (api/mcp/lazy.py).
+
+Import time itself is measured against a baseline by scripts/bench_startup.py;
+a wall-clock limit here would depend on the machine running the tests.
+"""
+
+import os
+import subprocess
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.mcp.lazy import LazyMCPApp, get_mcp_pool_stats
+from core import timing
+
+
+ROOT = Path(__file__).resolve().parents[3]
+
+# Loaded on first use (OG image, MCP request, Cloudflare Access JWT, GCS font download), never at startup
+DEFERRED_MODULES = ("PIL", "fastmcp", "mcp", "jwt", "google.cloud.storage", "core.images", "api.mcp.server")
+
+MCP_HEADERS = {"Accept": "application/json, text/event-stream", "Content-Type": "application/json"}
+MCP_INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {"protocolVersion": "2025-06-18", "capabilities": {}, "clientInfo": {"name": "test", "version": "1"}},
+}
+
+
+def _imported_modules() -> set[str]:
+    """Modules loaded by a fresh `import api.main` (from its -X importtime report)."""
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api.main"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+        check=True,
+    )
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            modules.add(module.strip())
+    return modules
+
+
+class TestStartupImports:
+    def test_heavy_modules_are_deferred(self) -> None:
+        modules = _imported_modules()
+
+        assert "api.main" in modules
+        assert [module for module in DEFERRED_MODULES if module in modules] == []
+
+
+class TestLazyMCPApp:
+    def test_first_request_starts_the_server(self) -> None:
+        with TestClient(app) as client:
+            response = client.post("/mcp", json=MCP_INITIALIZE, headers=MCP_HEADERS)
+        assert response.status_code == 200
+        assert '"serverInfo"' in response.text
+
+    async def test_server_tasks_do_not_inherit_request_timings(self) -> None:
+        seen = {}
+
+        class FakeHTTPApp:
+            @asynccontextmanager
+            async def lifespan(self, app):
+                seen["lifespan"] = timing.current()
+                yield
+
+            async def __call__(self, scope, receive, send) -> None:
+                seen["request"] = timing.current()
+
+        server = MagicMock()
+        server.http_app.return_value = FakeHTTPApp()
+        mcp_app = LazyMCPApp()
+        token = timing.begin()
+        try:
+            with patch("api.mcp.server.mcp_server", server):
+                await mcp_app({"type": "http"}, None, None)
+        finally:
+            timing.end(token)
+            await mcp_app.aclose()
+
+        assert seen["lifespan"] is None
+        assert seen["request"] == {}
+
+    async def test_aclose_without_requests_is_a_noop(self) -> None:
+        mcp_app = LazyMCPApp()
+        await mcp_app.aclose()
+        assert not mcp_app.loaded
+
+    def test_pool_stats_empty_until_the_server_is_loaded(self) -> None:
+        with patch.dict(sys.modules):
+            sys.modules.pop("api.mcp.server", None)
+            assert get_mcp_pool_stats() == {}
+            assert get_mcp_pool_stats(replica=True) == {}
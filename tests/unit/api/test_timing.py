@@ -0,0 +1,63 @@
+"""Tests for api/timing.py (Server-Timing header and rolling per-route percentiles)."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.timing import RollingTimings, format_server_timing, request_stages, rolling_timings
+
+
+class TestRequestStages:
+    def test_orm_and_app_are_derived(self) -> None:
+        stages = request_stages({"cache": 0.5, "db": 3.0, "query": 4.0, "gzip": 1.0}, total_ms=10.0)
+        assert stages == {"cache": 0.5, "db": 3.0, "orm": 1.0, "app": 4.5, "gzip": 1.0, "total": 10.0}
+
+    def test_db_outside_orm_session(self) -> None:
+        stages = request_stages({"db": 3.0}, total_ms=5.0)
+        assert stages["orm"] == 0.0
+        assert stages["app"] == 2.0
+
+    def test_format(self) -> None:
+        header = format_server_timing(request_stages({"db": 1.234}, total_ms=2.0))
+        assert header == "cache;dur=0.00, db;dur=1.23, orm;dur=0.00, app;dur=0.77, gzip;dur=0.00, total;dur=2.00"
+
+
+class TestRollingTimings:
+    def test_percentiles_over_window(self) -> None:
+        rolling = RollingTimings(window=100)
+        for ms in range(1, 201):  # only the last 100 (101..200) stay in the window
+            rolling.record("GET /specs", {"total": float(ms)})
+
+        route = rolling.snapshot()["GET /specs"]
+        assert route["count"] == 200
+        assert route["stages"]["total"] == {"p50": 150.0, "p95": 195.0, "p99": 199.0, "max": 200.0}
+        # Stages missing from a request count as 0
+        assert route["stages"]["db"]["max"] == 0.0
+
+    def test_clear(self) -> None:
+        rolling = RollingTimings(window=10)
+        rolling.record("GET /specs", {"total": 1.0})
+        rolling.clear()
+        assert rolling.snapshot() == {}
+
+
+class TestServerTimingMiddleware:
+    @pytest.fixture(autouse=True)
+    def _reset(self):
+        rolling_timings.clear()
+        yield
+        rolling_timings.clear()
+
+    def test_header_and_route_template(self) -> None:
+        client = TestClient(app)
+        response = client.get("/health")
+        assert response.status_code == 200
+        names = [part.split(";")[0] for part in response.headers["server-timing"].split(", ")]
+        assert names == ["cache", "db", "orm", "app", "gzip", "total"]
+
+        client.get("/seo-proxy/plots")
+        client.get("/does-not-exist")
+        snapshot = rolling_timings.snapshot()
+        assert snapshot["GET /health"]["count"] == 1
+        assert "GET /seo-proxy/plots" in snapshot
+        assert "unmatched" in snapshot
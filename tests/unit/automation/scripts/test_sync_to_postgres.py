@@ -3,6 +3,9 @@
 from datetime import datetime
 from unittest.mock import MagicMock, patch
 
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
 from automation.scripts.sync_to_postgres import (
     _chunked,
     convert_datetimes_to_strings,
@@ -14,7 +17,15 @@ from automation.scripts.sync_to_postgres import (
     parse_timestamp,
     scan_plot_directory,
     sync_to_database,
+    write_catalog_snapshot,
+    write_code_index,
+    write_code_store,
+    write_search_index,
 )
+from core.code_store import CodeStore
+from core.database.models import Base, Impl, Library, Spec
+from core.search import SearchIndex
+from core.snapshot import CatalogSnapshot
 
 
 class TestParseTimestamp:
@@ -903,6 +914,147 @@ class TestSyncToDatabase:
         assert mock_session.execute.call_count == 6
 
 
+class TestWriteSearchIndex:
+    """Tests for write_search_index function."""
+
+    def test_indexes_only_specs_with_implementations(self, tmp_path):
+        """Should persist specs.json containing only implemented specs."""
+        plots = [
+            {
+                "spec": {"id": "scatter-basic", "title": "Basic Scatter", "description": "Points", "tags": {}},
+                "implementations": [{"library_id": "matplotlib"}],
+            },
+            {
+                "spec": {"id": "draft-plot", "title": "Draft Scatter", "description": "Not yet built", "tags": {}},
+                "implementations": [],
+            },
+        ]
+
+        count = write_search_index(plots, tmp_path / "search")
+
+        assert count == 1
+        index = SearchIndex.load(tmp_path / "search" / "specs.json")
+        assert [doc_id for doc_id, _ in index.search("scatter")] == ["scatter-basic"]
+
+
+class TestWriteCodeIndex:
+    """Tests for write_code_index function."""
+
+    def _plots(self, code: str) -> list[dict]:
+        return [
+            {
+                "spec": {"id": "line-dual-axis", "tags": {"plot_type": ["line"]}},
+                "implementations": [
+                    {
+                        "spec_id": "line-dual-axis",
+                        "library_id": "matplotlib",
+                        "code": code,
+                        "impl_tags": {"techniques": ["twin-axes"]},
+                    }
+                ],
+            }
+        ]
+
+    def test_writes_and_updates_incrementally(self, tmp_path):
+        """Should create code.json, then only re-index changed implementations."""
+        stats = write_code_index(self._plots("ax2 = ax.twinx()"), tmp_path)
+        assert stats == {"added": 1, "updated": 0, "unchanged": 0, "removed": 0}
+
+        stats = write_code_index(self._plots("ax2 = ax.twinx()"), tmp_path)
+        assert stats == {"added": 0, "updated": 0, "unchanged": 1, "removed": 0}
+
+        stats = write_code_index(self._plots("ax.secondary_yaxis('right')"), tmp_path)
+        assert stats == {"added": 0, "updated": 1, "unchanged": 0, "removed": 0}
+
+        index = SearchIndex.load(tmp_path / "code.json")
+        assert index.search("twinx") == []
+        assert index.meta["line-dual-axis/matplotlib"]["tags"] == ["line", "twin-axes"]
+
+    def test_rebuilds_index_built_with_the_text_tokenizer(self, tmp_path):
+        """Should re-tokenize everything when code.json predates the code tokenizer."""
+        legacy = SearchIndex()
+        legacy.add("line-dual-axis/matplotlib", "ax2 = ax.twinx()", {"hash": "stale"})
+        legacy.save(tmp_path / "code.json")
+
+        stats = write_code_index(self._plots("ax2.plot(x, y)"), tmp_path)
+
+        assert stats["added"] == 1
+        index = SearchIndex.load(tmp_path / "code.json")
+        assert index.tokenizer == "code"
+        assert [doc_id for doc_id, _ in index.search("plot")] == ["line-dual-axis/matplotlib"]
+
+    def test_rebuilds_when_existing_index_is_corrupt(self, tmp_path):
+        """Should start from an empty index when code.json cannot be parsed."""
+        (tmp_path / "code.json").write_text("not json")
+
+        stats = write_code_index(self._plots("ax2 = ax.twinx()"), tmp_path)
+
+        assert stats["added"] == 1
+
+
+class TestWriteCodeStore:
+    """Tests for write_code_store function."""
+
+    def _plots(self, *impls: tuple[str, str]) -> list[dict]:
+        return [
+            {
+                "spec": {"id": "scatter-basic"},
+                "implementations": [
+                    {"spec_id": "scatter-basic", "library_id": library, "code": code} for library, code in impls
+                ],
+            }
+        ]
+
+    def test_writes_updates_and_prunes(self, tmp_path):
+        """Should store stripped code, rewrite only changed impls and drop removed ones."""
+        stats = write_code_store(self._plots(("matplotlib", "plt.plot(x)  # noqa: F401"), ("plotly", "go")), tmp_path)
+        assert stats == {"added": 2, "updated": 0, "unchanged": 0, "removed": 0}
+        assert b"noqa" not in CodeStore.load(tmp_path).get("scatter-basic", "matplotlib").body()
+
+        stats = write_code_store(self._plots(("matplotlib", "plt.scatter(x)")), tmp_path)
+        assert stats == {"added": 0, "updated": 1, "unchanged": 0, "removed": 1}
+
+        store = CodeStore.load(tmp_path)
+        assert store.get("scatter-basic", "plotly") is None
+        assert list(store.manifest) == ["scatter-basic/matplotlib"]
+        assert len(list((tmp_path / "blobs").glob("*/*.gz"))) == 1
+
+    def test_rebuilds_when_manifest_is_corrupt(self, tmp_path):
+        """Should start from an empty store when manifest.json cannot be parsed."""
+        (tmp_path / "manifest.json").write_text("not json")
+
+        stats = write_code_store(self._plots(("matplotlib", "plt.plot(x)")), tmp_path)
+
+        assert stats["added"] == 1
+
+
+class TestWriteCatalogSnapshot:
+    """Tests for write_catalog_snapshot function."""
+
+    def test_writes_catalog_with_fingerprint(self, tmp_path):
+        """Should snapshot specs with impls and libraries, fingerprinted against the database."""
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        with Session(engine) as session:
+            session.add_all([Library(id="seaborn", name="Seaborn"), Library(id="matplotlib", name="Matplotlib")])
+            session.add(Spec(id="scatter-basic", title="Basic Scatter"))
+            session.add(Impl(spec_id="scatter-basic", library_id="matplotlib", code="plt.scatter(x, y)"))
+            session.commit()
+
+            count = write_catalog_snapshot(session, tmp_path / "catalog.msgpack")
+
+        snapshot = CatalogSnapshot.load(tmp_path / "catalog.msgpack")
+        assert count == 1
+        assert [library.id for library in snapshot.libraries] == ["matplotlib", "seaborn"]
+        impl = snapshot.specs[0].impls[0]
+        assert impl.has_code is True
+        assert impl.library.name == "Matplotlib"
+        assert snapshot.fingerprint["specs"] == 1
+        assert snapshot.fingerprint["impls"] == 1
+        assert snapshot.fingerprint["libraries"] == 2
+        engine.dispose()
+
+
 class TestMain:
     """Tests for main function."""
 
@@ -15,6 +15,8 @@ from core.database.repositories import (
     ImplRepository,
     LibraryRepository,
     SpecRepository,
+    _impl_code_stmt,
+    _spec_by_id_stmt,
 )
 
 
@@ -79,6 +81,27 @@ class TestSpecRepository:
         result = await repo.get_by_id("nonexistent")
         assert result is None
 
+    @pytest.mark.asyncio
+    async def test_get_by_ids(self, test_session: AsyncSession) -> None:
+        repo = SpecRepository(test_session)
+        await repo.create({"id": "bar-basic", "title": "Basic Bar"})
+        await repo.create({"id": "scatter-basic", "title": "Basic Scatter"})
+
+        specs = await repo.get_by_ids(["scatter-basic", "nonexistent", "bar-basic"])
+        assert sorted(spec.id for spec in specs) == ["bar-basic", "scatter-basic"]
+        assert [spec.id for spec in await repo.get_by_ids(["bar-basic"])] == ["bar-basic"]
+        assert await repo.get_by_ids([]) == []
+
+    @pytest.mark.asyncio
+    async def test_stream_all_batches(self, test_session: AsyncSession) -> None:
+        repo = SpecRepository(test_session)
+        for spec_id in ("c-spec", "a-spec", "b-spec"):
+            await repo.create({"id": spec_id, "title": spec_id})
+
+        streamed = [spec async for spec in repo.stream_all(batch_size=2)]
+        assert [spec.id for spec in streamed] == ["a-spec", "b-spec", "c-spec"]
+        assert all(spec.impls == [] for spec in streamed)
+
     @pytest.mark.asyncio
     async def test_get_ids(self, test_session: AsyncSession) -> None:
         repo = SpecRepository(test_session)
@@ -144,6 +167,20 @@ class TestSpecRepository:
         assert await repo.delete("nonexistent") is False
 
 
+class TestHotLookupStatements:
+    """The lambda statements share one compiled-SQL cache entry across parameter values."""
+
+    def test_spec_lookup_cache_key_ignores_id(self) -> None:
+        key_a = _spec_by_id_stmt("scatter-basic")._generate_cache_key()
+        key_b = _spec_by_id_stmt("bar-basic")._generate_cache_key()
+        assert key_a == key_b
+
+    def test_impl_code_cache_key_ignores_ids(self) -> None:
+        key_a = _impl_code_stmt("scatter-basic", "matplotlib", "python")._generate_cache_key()
+        key_b = _impl_code_stmt("bar-basic", "plotly", "python")._generate_cache_key()
+        assert key_a == key_b
+
+
 class TestLibraryRepository:
     """Tests for LibraryRepository."""
 
@@ -238,6 +275,21 @@ class TestImplRepository:
         impl = await repo.get_code("nonexistent", "matplotlib")
         assert impl is None
 
+    @pytest.mark.asyncio
+    async def test_get_code_documents(self, setup_data: AsyncSession) -> None:
+        repo = ImplRepository(setup_data)
+        await repo.upsert("scatter-basic", "matplotlib", {"code": "import matplotlib"})
+        docs = await repo.get_code_documents()
+        assert docs == [("scatter-basic", "matplotlib", "import matplotlib")]
+
+    @pytest.mark.asyncio
+    async def test_get_codes(self, setup_data: AsyncSession) -> None:
+        repo = ImplRepository(setup_data)
+        await repo.upsert("scatter-basic", "matplotlib", {"code": "import matplotlib"})
+        codes = await repo.get_codes([("scatter-basic", "matplotlib"), ("nonexistent", "matplotlib")])
+        assert codes == {("scatter-basic", "matplotlib"): "import matplotlib"}
+        assert await repo.get_codes([]) == {}
+
     @pytest.mark.asyncio
     async def test_get_by_spec_and_library(self, setup_data: AsyncSession) -> None:
         repo = ImplRepository(setup_data)
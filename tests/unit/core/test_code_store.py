@@ -0,0 +1,66 @@
+"""Tests for core.code_store (content-addressed implementation code blobs)."""
+
+import gzip
+import json
+
+from core.code_store import CodeBlob, CodeStore, code_payload, update_code_store
+
+
+class TestCodeBlob:
+    def test_payload_strips_noqa_and_matches_json_response(self) -> None:
+        payload = code_payload("scatter-basic", "matplotlib", "import numpy as np  # noqa: F401\nx = 'ü'")
+        assert json.loads(payload) == {
+            "spec_id": "scatter-basic",
+            "library": "matplotlib",
+            "code": "import numpy as np\nx = 'ü'",
+        }
+        assert payload.startswith(b'{"spec_id":"scatter-basic",')
+
+    def test_digest_and_bytes_are_deterministic(self) -> None:
+        a = CodeBlob.from_code("s", "l", "code")
+        b = CodeBlob.from_code("s", "l", "code")
+        assert a.digest == b.digest
+        assert a.gzipped == b.gzipped
+        assert a.etag == f'"{a.digest}"'
+        assert gzip.decompress(a.gzipped) == a.body() == code_payload("s", "l", "code")
+
+    def test_digest_changes_with_content(self) -> None:
+        assert CodeBlob.from_code("s", "l", "a").digest != CodeBlob.from_code("s", "l", "b").digest
+
+
+class TestCodeStore:
+    def test_put_get_roundtrip(self, tmp_path) -> None:
+        store = CodeStore(tmp_path)
+        assert store.put("s", "matplotlib", "plt.plot()") == "added"
+        assert store.put("s", "matplotlib", "plt.plot()") == "unchanged"
+        assert store.put("s", "matplotlib", "plt.scatter()") == "updated"
+        store.save()
+
+        loaded = CodeStore.load(tmp_path)
+        blob = loaded.get("s", "matplotlib")
+        assert json.loads(blob.body())["code"] == "plt.scatter()"
+        assert loaded.get("s", "plotly") is None
+
+    def test_missing_blob_returns_none(self, tmp_path) -> None:
+        store = CodeStore(tmp_path)
+        store.put("s", "matplotlib", "plt.plot()")
+        for path in (tmp_path / "blobs").glob("*/*.gz"):
+            path.unlink()
+        assert store.get("s", "matplotlib") is None
+
+    def test_load_without_manifest_is_empty(self, tmp_path) -> None:
+        assert CodeStore.load(tmp_path / "missing").manifest == {}
+
+    def test_update_removes_stale_and_prune_deletes_blobs(self, tmp_path) -> None:
+        store = CodeStore(tmp_path)
+        impls = [
+            {"spec_id": "s", "library_id": "matplotlib", "code": "a"},
+            {"spec_id": "s", "library_id": "plotly", "code": "b"},
+            {"spec_id": "s", "library_id": "bokeh", "code": None},
+        ]
+        assert update_code_store(store, impls) == {"added": 2, "updated": 0, "unchanged": 0, "removed": 0}
+
+        assert update_code_store(store, impls[:1]) == {"added": 0, "updated": 0, "unchanged": 1, "removed": 1}
+        store.save()
+        assert store.prune() == 1
+        assert store.get("s", "matplotlib") is not None
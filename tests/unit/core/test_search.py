@@ -0,0 +1,214 @@
+"""Tests for core.search (BM25 spec search index)."""
+
+import pytest
+
+from core.search import (
+    SearchIndex,
+    build_code_index,
+    build_spec_index,
+    flatten_tags,
+    highlight_snippet,
+    spec_document,
+    tokenize,
+    tokenize_code,
+    update_code_index,
+)
+
+
+def _specs() -> list[dict]:
+    return [
+        {
+            "id": "scatter-basic",
+            "title": "Basic Scatter Plot",
+            "description": "Shows the correlation between two numeric variables.",
+            "applications": ["Exploring relationships"],
+            "tags": {"plot_type": ["scatter"], "data_type": ["numeric"]},
+        },
+        {
+            "id": "heatmap-correlation",
+            "title": "Correlation Matrix Heatmap",
+            "description": "Pairwise correlation coefficients displayed as a colored grid.",
+            "applications": ["Feature selection"],
+            "tags": {"plot_type": ["heatmap"], "data_type": ["numeric"]},
+        },
+        {
+            "id": "bar-basic",
+            "title": "Basic Bar Chart",
+            "description": "Compares values across categories.",
+            "applications": ["Sales by region"],
+            "tags": {"plot_type": ["bar"], "data_type": ["categorical"]},
+        },
+    ]
+
+
+class TestTokenize:
+    def test_drops_stopwords_and_stems(self) -> None:
+        assert tokenize("Show correlation between variables") == ["correlation", "variable"]
+
+    def test_plural_stopwords_are_dropped(self) -> None:
+        assert tokenize("scatter plots") == tokenize("scatter plot") == ["scatter"]
+        assert tokenize("shows trends") == ["trend"]
+
+    def test_keeps_identifiers(self) -> None:
+        assert tokenize("plt.scatter(x_values)") == ["plt", "scatter", "x_value"]
+
+    def test_empty(self) -> None:
+        assert tokenize(None) == []
+        assert tokenize("") == []
+
+    def test_code_keeps_stopwords_and_suffixes(self) -> None:
+        assert tokenize_code("for ax in axes: ax.plot(x_values); plt.show()") == [
+            "for",
+            "ax",
+            "in",
+            "axes",
+            "ax",
+            "plot",
+            "x_values",
+            "plt",
+            "show",
+        ]
+        assert tokenize_code(None) == []
+
+
+class TestSearchIndex:
+    def test_search_ranks_relevant_first(self) -> None:
+        index = build_spec_index(_specs())
+        results = index.search("show correlation between variables")
+        ids = [doc_id for doc_id, _ in results]
+        # scatter-basic matches both "correlation" and "variable"
+        assert ids == ["scatter-basic", "heatmap-correlation"]
+
+    def test_title_weight_outranks_description(self) -> None:
+        text = spec_document({"title": "Scatter", "description": "bar mention"})
+        assert tokenize(text).count("scatter") == 3
+        assert tokenize(text).count("bar") == 1
+
+    def test_no_match_and_stopword_only_query(self) -> None:
+        index = build_spec_index(_specs())
+        assert index.search("xylophone") == []
+        assert index.search("show the plot") == []
+
+    def test_limit(self) -> None:
+        index = build_spec_index(_specs())
+        assert len(index.search("basic numeric categorical", limit=1)) == 1
+
+    def test_title_match(self) -> None:
+        index = build_spec_index(_specs())
+        assert index.search("heatmap")[0][0] == "heatmap-correlation"
+        assert [d for d, _ in index.search("matrix")] == ["heatmap-correlation"]
+
+    def test_add_replaces_and_remove(self) -> None:
+        index = SearchIndex()
+        index.add("a", "scatter")
+        index.add("a", "histogram")
+        assert index.search("scatter") == []
+        assert [d for d, _ in index.search("histogram")] == ["a"]
+
+        assert index.remove("a") is True
+        assert index.remove("a") is False
+        assert len(index) == 0
+        assert index.postings == {}
+
+    def test_save_load_roundtrip(self, tmp_path) -> None:
+        index = build_spec_index(_specs())
+        path = tmp_path / "nested" / "specs.json"
+        index.save(path)
+
+        loaded = SearchIndex.load(path)
+        assert len(loaded) == len(index)
+        assert loaded.search("correlation") == index.search("correlation")
+        assert loaded.meta["bar-basic"]["title"] == "Basic Bar Chart"
+
+    def test_where_filters_on_meta(self) -> None:
+        index = build_spec_index(_specs())
+        results = index.search("basic", where=lambda meta: meta["title"].startswith("Basic Bar"))
+        assert [d for d, _ in results] == ["bar-basic"]
+
+    def test_spec_document_includes_data_and_notes(self) -> None:
+        text = spec_document({"title": "T", "data": ["latitude column"], "notes": ["use a log scale"]})
+        assert "latitude" in tokenize(text)
+        assert "log" in tokenize(text)
+
+
+def _impls() -> list[dict]:
+    return [
+        {
+            "spec_id": "line-dual-axis",
+            "library_id": "matplotlib",
+            "code": "fig, ax = plt.subplots()\nax2 = ax.twinx()\nax2.plot(x, y)",
+            "tags": ["line", "twin-axes"],
+        },
+        {
+            "spec_id": "sankey-basic",
+            "library_id": "plotly",
+            "code": "import plotly.graph_objects as go\nfig = go.Figure(go.Sankey(node=nodes))",
+            "tags": ["sankey"],
+        },
+    ]
+
+
+class TestCodeIndex:
+    def test_search_code_tokens(self) -> None:
+        index = build_code_index(_impls())
+        assert [d for d, _ in index.search("twinx")] == ["line-dual-axis/matplotlib"]
+        assert [d for d, _ in index.search("go.Sankey")] == ["sankey-basic/plotly"]
+
+    def test_search_finds_common_identifiers(self) -> None:
+        index = build_code_index(_impls())
+        assert [d for d, _ in index.search("plot")] == ["line-dual-axis/matplotlib"]
+        assert [d for d, _ in index.search("ax2.plot")][0] == "line-dual-axis/matplotlib"
+        assert highlight_snippet(_impls()[0]["code"], "plot", context_lines=0) == "ax2.<mark>plot</mark>(x, y)"
+
+    def test_tokenizer_is_persisted(self, tmp_path) -> None:
+        build_code_index(_impls()).save(tmp_path / "code.json")
+        loaded = SearchIndex.load(tmp_path / "code.json")
+        assert loaded.tokenizer == "code"
+        assert [d for d, _ in loaded.search("plot")] == ["line-dual-axis/matplotlib"]
+
+    def test_update_requires_code_tokenizer(self) -> None:
+        with pytest.raises(ValueError, match="tokenizer"):
+            update_code_index(SearchIndex(), _impls())
+
+    def test_meta_supports_filters(self) -> None:
+        index = build_code_index(_impls())
+        meta = index.meta["line-dual-axis/matplotlib"]
+        assert meta["spec_id"] == "line-dual-axis"
+        assert meta["library"] == "matplotlib"
+        assert meta["tags"] == ["line", "twin-axes"]
+        assert index.search("twinx", where=lambda m: m["library"] == "plotly") == []
+
+    def test_incremental_update(self) -> None:
+        index = build_code_index(_impls())
+        impls = _impls()
+        impls[0]["code"] = "ax.secondary_yaxis('right')"
+        impls[1]["tags"] = ["sankey", "flow"]
+
+        stats = update_code_index(index, impls)
+        assert stats == {"added": 0, "updated": 1, "unchanged": 1, "removed": 0}
+        assert index.search("twinx") == []
+        assert index.meta["sankey-basic/plotly"]["tags"] == ["sankey", "flow"]
+
+        stats = update_code_index(index, impls[1:])
+        assert stats == {"added": 0, "updated": 0, "unchanged": 1, "removed": 1}
+        assert len(index) == 1
+
+    def test_flatten_tags_dedupes(self) -> None:
+        assert flatten_tags({"plot_type": ["line"], "features": ["basic"]}, {"styling": ["line"]}, None) == [
+            "line",
+            "basic",
+        ]
+
+
+class TestHighlightSnippet:
+    def test_marks_best_line_with_context(self) -> None:
+        code = "import numpy as np\nfig, ax = plt.subplots()\nax2 = ax.twinx()\nax2.plot(y)\nplt.show()"
+        snippet = highlight_snippet(code, "twinx")
+        assert snippet == "fig, ax = plt.subplots()\nax2 = ax.<mark>twinx</mark>()\nax2.plot(y)"
+
+    def test_escapes_html(self) -> None:
+        snippet = highlight_snippet("title = '<b>Sales</b>'", "sales")
+        assert snippet == "title = &#x27;&lt;b&gt;<mark>Sales</mark>&lt;/b&gt;&#x27;"
+
+    def test_empty_text(self) -> None:
+        assert highlight_snippet("", "anything") == ""
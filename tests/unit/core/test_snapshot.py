@@ -0,0 +1,94 @@
+"""Tests for core.snapshot (catalog snapshot for instant API cold starts)."""
+
+from datetime import datetime
+
+import msgpack
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from core.database.models import Impl, Library, Spec
+from core.snapshot import SNAPSHOT_FORMAT, CatalogSnapshot, fingerprint, fingerprint_query
+
+
+def _catalog() -> tuple[list[Spec], list[Library]]:
+    matplotlib = Library(id="matplotlib", name="Matplotlib", version="3.10.0")
+    seaborn = Library(id="seaborn", name="Seaborn", version="0.13.0")
+    spec = Spec(
+        id="scatter-basic",
+        title="Basic Scatter Plot",
+        tags={"plot_type": ["scatter"]},
+        created=datetime(2025, 1, 10, 12, 30),
+        updated_at=datetime(2025, 2, 1, 8, 0),
+    )
+    impl = Impl(
+        spec_id="scatter-basic",
+        language_id="python",
+        library_id="matplotlib",
+        quality_score=92.5,
+        generated_at=datetime(2025, 1, 11),
+    )
+    impl.has_code = True
+    impl.library = matplotlib
+    spec.impls = [impl]
+    return [spec], [matplotlib, seaborn]
+
+
+class TestCatalogSnapshot:
+    def test_roundtrip_restores_columns_relationships_and_datetimes(self, tmp_path) -> None:
+        specs, libraries = _catalog()
+        path = tmp_path / "nested" / "catalog.msgpack"
+        CatalogSnapshot.from_orm(specs, libraries, {"specs": 1}).save(path)
+
+        loaded = CatalogSnapshot.load(path)
+
+        assert loaded.fingerprint == {"specs": 1}
+        assert [library.id for library in loaded.libraries] == ["matplotlib", "seaborn"]
+        spec = loaded.specs[0]
+        assert spec.title == "Basic Scatter Plot"
+        assert spec.tags == {"plot_type": ["scatter"]}
+        assert spec.created == datetime(2025, 1, 10, 12, 30)
+        assert spec.updated_at == datetime(2025, 2, 1, 8, 0)
+        impl = spec.impls[0]
+        assert impl.quality_score == 92.5
+        assert impl.generated_at == datetime(2025, 1, 11)
+        assert impl.has_code is True
+        assert impl.library is loaded.libraries[0]
+        assert list(tmp_path.glob("nested/*.tmp")) == []
+
+    def test_deferred_code_is_not_stored(self) -> None:
+        specs, libraries = _catalog()
+        specs[0].impls[0].code = "plt.plot()"
+
+        payload = msgpack.unpackb(CatalogSnapshot.from_orm(specs, libraries, {}).dumps())
+
+        assert "code" not in payload["specs"][0]["impls"][0]
+        assert payload["format"] == SNAPSHOT_FORMAT
+
+    @pytest.mark.parametrize("payload", [[1, 2], 3, "catalog", None])
+    def test_non_map_payload_raises_value_error(self, payload) -> None:
+        with pytest.raises(ValueError, match="not a map"):
+            CatalogSnapshot.loads(msgpack.packb(payload))
+
+    def test_unknown_format_raises(self) -> None:
+        data = msgpack.packb({"format": SNAPSHOT_FORMAT + 1, "specs": [], "libraries": []})
+
+        with pytest.raises(ValueError, match="format"):
+            CatalogSnapshot.loads(data)
+
+
+class TestFingerprint:
+    async def test_matches_until_the_catalog_changes(self, test_db_with_data) -> None:
+        session = test_db_with_data
+        before = fingerprint((await session.execute(fingerprint_query())).one())
+
+        assert before["specs"] == 2
+        assert before["libraries"] == 2
+        assert before["impls"] > 0
+        assert before == fingerprint((await session.execute(fingerprint_query())).one())
+
+        result = await session.execute(select(Spec).options(selectinload(Spec.impls)).where(Spec.id == "bar-grouped"))
+        await session.delete(result.scalar_one())
+        await session.commit()
+
+        assert fingerprint((await session.execute(fingerprint_query())).one()) != before
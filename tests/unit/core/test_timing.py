@@ -0,0 +1,77 @@
+"""Tests for core.timing (per-request stage timings)."""
+
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core import timing
+from core.database.connection import create_session_factory
+
+
+class TestStages:
+    def test_noop_outside_request(self) -> None:
+        assert timing.current() is None
+        timing.add("db", 1.0)
+        with timing.span("cache"):
+            pass
+        assert timing.current() is None
+
+    def test_add_and_span_accumulate(self) -> None:
+        token = timing.begin()
+        try:
+            timing.add("db", 1.5)
+            timing.add("db", 0.5)
+            with timing.span("gzip"):
+                pass
+            timings = timing.current()
+            assert timings["db"] == 2.0
+            assert timings["gzip"] >= 0.0
+        finally:
+            timing.end(token)
+        assert timing.current() is None
+
+    async def test_detach_only_affects_the_task(self) -> None:
+        token = timing.begin()
+        try:
+
+            async def background() -> None:
+                timing.detach()
+                timing.add("db", 5.0)
+
+            await asyncio.create_task(background())
+            assert "db" not in timing.current()
+        finally:
+            timing.end(token)
+
+
+class TestEngineInstrumentation:
+    async def test_records_db_and_query_stages(self) -> None:
+        timing.instrument_engines()
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        token = timing.begin()
+        try:
+            async with create_session_factory(engine)() as session:
+                await session.execute(text("SELECT 1"))
+            timings = timing.current()
+            assert timings["db"] > 0
+            assert timings["query"] >= timings["db"]
+        finally:
+            timing.end(token)
+            await engine.dispose()
+
+    async def test_failed_statement_is_counted_once(self) -> None:
+        timing.instrument_engines()
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        token = timing.begin()
+        try:
+            async with engine.connect() as conn:
+                try:
+                    await conn.execute(text("SELECT * FROM missing_table"))
+                except Exception:
+                    pass
+                assert conn.sync_connection.info.get("timing_start") == []
+            assert timing.current()["db"] > 0
+        finally:
+            timing.end(token)
+            await engine.dispose()
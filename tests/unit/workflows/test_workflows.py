@@ -391,3 +391,74 @@ class TestWorkflowTriggers:
                 assert "push" in on_trigger or "pull_request" in on_trigger, (
                     f"CI workflow {filename} should trigger on push or PR"
                 )
+
+
+# API artifacts: setting -> path relative to the published api-artifacts directory
+API_ARTIFACTS = {
+    "SEARCH_INDEX_DIR": "search",
+    "CODE_STORE_DIR": "code-store",
+    "CATALOG_SNAPSHOT_PATH": "catalog.msgpack",
+}
+CLOUDBUILD_FILE = WORKFLOWS_DIR.parent.parent / "api" / "cloudbuild.yaml"
+ARTIFACTS_MOUNT = "/mnt/api-artifacts"
+
+
+def get_step(job: dict[str, Any], name: str) -> tuple[int, dict[str, Any]]:
+    """Find a job step by name, returning its position and definition."""
+    for position, step in enumerate(job["steps"]):
+        if step.get("name") == name:
+            return position, step
+    raise AssertionError(f"Step {name!r} not found")
+
+
+def get_deploy_args() -> list[str]:
+    """Arguments of the `gcloud run deploy` step in api/cloudbuild.yaml."""
+    with open(CLOUDBUILD_FILE) as f:
+        config = yaml.safe_load(f)
+    return next(step["args"] for step in config["steps"] if step.get("id") == "deploy")
+
+
+class TestApiArtifacts:
+    """The sync job publishes the files the API reads instead of the DB, and the API mounts them."""
+
+    @pytest.fixture
+    def job(self) -> dict[str, Any]:
+        return load_workflow("sync-postgres.yml")["jobs"]["sync"]
+
+    @pytest.mark.parametrize("setting,relative", API_ARTIFACTS.items())
+    def test_sync_writes_artifact_into_published_dir(self, job: dict[str, Any], setting: str, relative: str) -> None:
+        _, sync = get_step(job, "Sync plots to database")
+
+        assert job["env"]["API_ARTIFACTS_DIR"] == "${{ github.workspace }}/.api-artifacts"
+        assert sync["env"][setting] == f"{job['env']['API_ARTIFACTS_DIR']}/{relative}"
+
+    def test_sync_downloads_and_publishes_before_cache_invalidation(self, job: dict[str, Any]) -> None:
+        download, download_step = get_step(job, "Download API artifacts")
+        sync, _ = get_step(job, "Sync plots to database")
+        publish, publish_step = get_step(job, "Publish API artifacts")
+        invalidate, _ = get_step(job, "Invalidate API cache")
+
+        assert job["env"]["API_ARTIFACTS_URL"].endswith("/api-artifacts")
+        assert '"${API_ARTIFACTS_URL}" "${API_ARTIFACTS_DIR}"' in download_step["run"]
+        assert '"${API_ARTIFACTS_DIR}" "${API_ARTIFACTS_URL}"' in publish_step["run"]
+        assert download < sync < publish < invalidate
+
+    def test_deploy_mounts_published_artifacts(self) -> None:
+        args = get_deploy_args()
+        volume = next(arg for arg in args if arg.startswith("--add-volume="))
+
+        assert "type=cloud-storage" in volume
+        assert "bucket=anyplot-images" in volume
+        assert "readonly=true" in volume
+        assert "only-dir=api-artifacts" in volume
+        assert f"--add-volume-mount=volume=api-artifacts,mount-path={ARTIFACTS_MOUNT}" in args
+
+    @pytest.mark.parametrize("setting,relative", API_ARTIFACTS.items())
+    def test_deploy_points_setting_at_mounted_artifact(self, setting: str, relative: str) -> None:
+        value = next(arg for arg in get_deploy_args() if arg.startswith("--set-env-vars=")).split("=", 1)[1]
+        delimiter = ","
+        if value.startswith("^"):  # gcloud alternate delimiter: ^<delimiter>^KEY=VALUE<delimiter>...
+            _, delimiter, value = value.split("^", 2)
+        env = dict(item.split("=", 1) for item in value.split(delimiter))
+
+        assert env[setting] == f"{ARTIFACTS_MOUNT}/{relative}"